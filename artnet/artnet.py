@@ -1,14 +1,27 @@
 import socket
+from typing import Dict, Optional
 
 ARTNET_PORT = 6454
+HEADER_LEN = 18  # entête OpDmx
+
+# ArtSync (OpSync 0x5200) : les contrôleurs en mode synchro n'affichent les
+# univers reçus qu'à réception de ce paquet → frame multi-univers sans déchirure
+ARTSYNC_PACKET = b'Art-Net\x00' + bytes([0x00, 0x52, 0x00, 0x0E, 0x00, 0x00])  # ID, OpSync, ProtVer 14, Aux1, Aux2
 
 class ArtNetSender:
-    def __init__(self, target_ip: str, port: int = ARTNET_PORT):
+    def __init__(self, target_ip: str, port: int = ARTNET_PORT, sock: Optional[socket.socket] = None):
         self.addr = (target_ip, port)
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.sequence = 0  # peut rester à 0 si non utilisé
+        # socket partagée possible (pool de artnet_batch) ; sinon socket dédiée
+        self._own_sock = sock is None
+        self.sock = sock if sock is not None else socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # un paquet préconstruit (entête + 512 octets) et un compteur Sequence PAR univers
+        self._packets: Dict[int, bytearray] = {}
+        self._views: Dict[int, memoryview] = {}
+        self._lengths: Dict[int, int] = {}
+        self.sequence: Dict[int, int] = {}
+        self.sync_packet = bytearray(ARTSYNC_PACKET)
 
-    def _build_header(self, universe: int, length: int = 512) -> bytearray:
+    def _build_header(self, universe: int, length: int = 512, sequence: int = 0) -> bytearray:
         """
         Construit l'entête Art-Net OpDmx (0x5000).
         Universe est codé LSB puis MSB (SubUni, Net).
@@ -17,26 +30,67 @@ class ArtNetSender:
         pb = bytearray(b'Art-Net\x00')          # ID
         pb += bytearray([0x00, 0x50])           # OpOutput/OpDmx (LE: 0x5000)
         pb += bytearray([0x00, 0x0E])           # ProtVer 14
-        pb += bytearray([self.sequence & 0xFF]) # Sequence
+        pb += bytearray([sequence & 0xFF])      # Sequence
         pb += bytearray([0x00])                 # Physical
         pb += bytearray([universe & 0xFF, (universe >> 8) & 0xFF])  # SubUni, Net
         pb += bytearray([(length >> 8) & 0xFF, length & 0xFF])      # Length (big-endian)
         return pb
 
-    def send_dmx(self, universe: int, dmx512: bytes):
+    def _template(self, universe: int) -> memoryview:
+        """Paquet 530 octets de l'univers : entête écrit une seule fois, réutilisé à chaque envoi."""
+        view = self._views.get(universe)
+        if view is None:
+            pkt = bytearray(HEADER_LEN + 512)
+            pkt[:HEADER_LEN] = self._build_header(universe, 512)
+            self._packets[universe] = pkt
+            self._lengths[universe] = 512
+            view = self._views[universe] = memoryview(pkt)
+        return view
+
+    def build_packet(self, universe: int, dmx512: bytes, length: Optional[int] = None) -> int:
         """
-        Envoie un paquet DMX512 (512 octets) sur l'univers donné.
+        Prépare le paquet de l'univers sans allocation et retourne sa taille totale:
+        le payload (bytes, bytearray ou memoryview du framebuffer) est copié dans
+        le paquet préconstruit de l'univers, seul l'octet Sequence change.
+        Longueur = len(dmx512) (ou `length`), arrondie au pair supérieur (2..512)
+        → un univers partiellement utilisé peut envoyer moins de 512 octets.
         """
-        if len(dmx512) != 512:
-            raise ValueError("Le payload DMX doit faire exactement 512 octets.")
-        pkt = self._build_header(universe, 512) + dmx512
+        n = len(dmx512) if length is None else int(length)
+        if not 1 <= n <= 512 or n > len(dmx512):
+            raise ValueError("Le payload DMX doit faire entre 1 et 512 octets.")
+        pkt = self._template(universe)
+        pkt[HEADER_LEN:HEADER_LEN + n] = dmx512[:n] if n < len(dmx512) else dmx512
+        if n & 1:                                # Art-Net : longueur paire
+            pkt[HEADER_LEN + n] = 0
+            n += 1
+        if self._lengths[universe] != n:
+            pkt[16] = (n >> 8) & 0xFF
+            pkt[17] = n & 0xFF
+            self._lengths[universe] = n
+        # Sequence 1..255 par univers (0 = "pas de séquence" pour le récepteur)
+        seq = self.sequence.get(universe, 0) % 255 + 1
+        self.sequence[universe] = seq
+        pkt[12] = seq
+        return HEADER_LEN + n
+
+    def send_dmx(self, universe: int, dmx512: bytes, length: Optional[int] = None):
+        """Envoie un paquet DMX sur l'univers donné (voir build_packet)."""
+        size = self.build_packet(universe, dmx512, length)
         try:
-            self.sock.sendto(pkt, self.addr)
+            self.sock.sendto(self._views[universe][:size], self.addr)
         except Exception as e:
             print(f"❌ Erreur sendto: {e}")
-        self.sequence = (self.sequence + 1) % 256
+
+    def send_sync(self):
+        """Envoie un ArtSync : le contrôleur affiche d'un coup les univers reçus depuis le précédent."""
+        try:
+            self.sock.sendto(self.sync_packet, self.addr)
+        except Exception as e:
+            print(f"❌ Erreur sendto (ArtSync): {e}")
 
     def close(self):
+        if not self._own_sock:
+            return
         try:
             self.sock.close()
         except:
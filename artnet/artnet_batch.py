@@ -0,0 +1,248 @@
+# artnet/artnet_batch.py
+import ctypes, errno, socket, sys
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from artnet import ArtNetSender, ARTNET_PORT
+
+DROP_ERRNOS = (errno.EAGAIN, errno.EWOULDBLOCK, errno.ENOBUFS)
+MSG_DONTWAIT = getattr(socket, "MSG_DONTWAIT", 0x40)
+
+# ---------------- sendmmsg (Linux) via ctypes ----------------
+class _IoVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+class _SockAddrIn(ctypes.Structure):
+    _fields_ = [("sin_family", ctypes.c_ushort), ("sin_port", ctypes.c_uint16),
+                ("sin_addr", ctypes.c_ubyte * 4), ("sin_zero", ctypes.c_ubyte * 8)]
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [("msg_name", ctypes.c_void_p), ("msg_namelen", ctypes.c_uint32),
+                ("msg_iov", ctypes.POINTER(_IoVec)), ("msg_iovlen", ctypes.c_size_t),
+                ("msg_control", ctypes.c_void_p), ("msg_controllen", ctypes.c_size_t),
+                ("msg_flags", ctypes.c_int)]
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+SYNC_SLOT = -1  # "univers" des slots ArtSync
+
+# vue NumPy d'un tableau de _IoVec (pour fixer toutes les longueurs d'un coup)
+_IOV_DTYPE = np.dtype([("base", np.uintp), ("len", np.uintp)])
+
+def _load_sendmmsg():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        fn = libc.sendmmsg
+    except (OSError, AttributeError):
+        return None
+    fn.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int]
+    fn.restype = ctypes.c_int
+    return fn
+
+_sendmmsg = _load_sendmmsg()
+
+class ArtNetTransmitter:
+    """
+    Backend d'émission ArtNet "par frame":
+      - paquets préparés dans les buffers préconstruits d'ArtNetSender (1 par IP)
+      - petit pool partagé de sockets UDP non bloquantes (SO_SNDBUF réglé),
+        les IP contrôleurs sont réparties sur le pool
+      - une frame complète = UN appel sendmmsg par socket (Linux, ctypes),
+        sinon boucle sendto serrée
+      - EAGAIN / ENOBUFS comptés comme pertes (pas de print dans la boucle d'envoi)
+      - ArtSync optionnel en fin de frame, dans le même lot que les univers DMX
+    Côté sendmmsg, chaque (ip, univers) a un "slot" mmsghdr permanent (adresse +
+    iovec pointant sur son paquet préconstruit) : une frame ne fait que recopier
+    les slots concernés dans le tableau d'envoi (gather NumPy) et fixer les longueurs.
+    """
+    def __init__(self, pool_size: int = 2, sndbuf: int = 1 << 20, port: int = ARTNET_PORT,
+                 use_sendmmsg: bool = True):
+        self.port = port
+        self.socks: List[socket.socket] = []
+        for _ in range(max(1, int(pool_size))):
+            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            if sndbuf:
+                try:
+                    s.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, int(sndbuf))
+                except OSError:
+                    pass
+            s.setblocking(False)
+            self.socks.append(s)
+        self.batched = bool(use_sendmmsg and _sendmmsg is not None)
+
+        self.senders: Dict[str, ArtNetSender] = {}          # ip -> constructeur de paquets
+        self.addrs: Dict[str, Tuple[str, int]] = {}         # ip -> destination réelle
+        self._sock_of: Dict[str, int] = {}                  # ip -> index socket du pool
+
+        # slots sendmmsg (ip, univers) -> index ; tableaux ctypes agrandis à la demande
+        self._slot: Dict[Tuple[str, int], int] = {}
+        self._slot_keys: List[Tuple[str, int]] = []
+        self._cap = 0
+        self._grow(64)
+
+        self.sent = 0
+        self.drops = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+
+    # ---------- destinations ----------
+    def redirect(self, ip: str, dest_ip: str, port: int = ARTNET_PORT):
+        """Envoie les univers du contrôleur `ip` vers une autre adresse (ex: PC + ArtNet monitor)."""
+        self.addrs[ip] = (dest_ip, port)
+        if ip in self.senders:
+            self.senders[ip].addr = self.addrs[ip]
+        for i, key in enumerate(self._slot_keys):
+            if key[0] == ip:
+                self._fill_name(i)
+
+    def _sender(self, ip: str) -> ArtNetSender:
+        snd = self.senders.get(ip)
+        if snd is None:
+            k = len(self.senders) % len(self.socks)
+            addr = self.addrs.setdefault(ip, (ip, self.port))
+            snd = self.senders[ip] = ArtNetSender(addr[0], addr[1], sock=self.socks[k])
+            self._sock_of[ip] = k
+        return snd
+
+    # ---------- slots sendmmsg ----------
+    def _grow(self, cap: int):
+        old_iov, old_n = (self._iov_np.copy(), self._cap) if self._cap else (None, 0)
+        self._cap = cap
+        self._hdrs = (_MMsgHdr * cap)()
+        self._out = (_MMsgHdr * cap)()
+        self._iov = (_IoVec * cap)()
+        self._names = (_SockAddrIn * cap)()
+        hsize = ctypes.sizeof(_MMsgHdr)
+        self._hdrs_np = np.frombuffer(self._hdrs, dtype=np.uint8).reshape(cap, hsize)
+        self._out_np = np.frombuffer(self._out, dtype=np.uint8).reshape(cap, hsize)
+        self._iov_np = np.frombuffer(self._iov, dtype=_IOV_DTYPE)
+        self._slot_sock = np.zeros(cap, dtype=np.intp)
+        if old_iov is not None:
+            self._iov_np[:old_n] = old_iov
+        for i in range(len(self._slot_keys)):
+            self._slot_sock[i] = self._sock_of[self._slot_keys[i][0]]
+            self._fill_name(i)
+            self._link(i)
+
+    def _link(self, i: int):
+        h = self._hdrs[i].msg_hdr
+        h.msg_name = ctypes.addressof(self._names[i])
+        h.msg_namelen = ctypes.sizeof(_SockAddrIn)
+        h.msg_iov = ctypes.pointer(self._iov[i])
+        h.msg_iovlen = 1
+
+    def _fill_name(self, i: int):
+        host, port = self.addrs[self._slot_keys[i][0]]
+        sa = self._names[i]
+        sa.sin_family = socket.AF_INET
+        sa.sin_port = socket.htons(port)
+        sa.sin_addr[:] = socket.inet_aton(socket.gethostbyname(host))
+
+    def _add_slot(self, ip: str, universe: int, snd: ArtNetSender) -> int:
+        """Slot permanent pour (ip, univers) ; univers SYNC_SLOT = paquet ArtSync de l'IP."""
+        i = len(self._slot_keys)
+        if i == self._cap:
+            self._grow(self._cap * 2)
+        self._slot[(ip, universe)] = i
+        self._slot_keys.append((ip, universe))
+        # buffer fixe : adresse stable
+        pkt = snd.sync_packet if universe == SYNC_SLOT else snd._packets[universe]
+        self._iov[i].iov_base = ctypes.addressof((ctypes.c_char * len(pkt)).from_buffer(pkt))
+        self._slot_sock[i] = self._sock_of[ip]
+        self._fill_name(i)
+        self._link(i)
+        return i
+
+    # ---------- émission ----------
+    def send_frame(self, items: Iterable[Tuple[str, int, bytes]], sync_ips: Iterable[str] = ()):
+        """
+        Émet une frame: items = (ip, univers, payload DMX) ; un seul appel système par socket.
+        sync_ips: contrôleurs qui reçoivent un ArtSync après leurs univers (même socket → ordre garanti).
+        """
+        if not self.batched:
+            self._send_loop(items, sync_ips)
+            return
+        slots: List[int] = []
+        sizes: List[int] = []
+        for ip, uni, dmx in items:
+            snd = self._sender(ip)
+            sizes.append(snd.build_packet(uni, dmx))
+            i = self._slot.get((ip, uni))
+            slots.append(self._add_slot(ip, uni, snd) if i is None else i)
+        for ip in sync_ips:
+            snd = self._sender(ip)
+            sizes.append(len(snd.sync_packet))
+            i = self._slot.get((ip, SYNC_SLOT))
+            slots.append(self._add_slot(ip, SYNC_SLOT, snd) if i is None else i)
+        if not slots:
+            return
+        idx = np.array(slots, dtype=np.intp)
+        self._iov_np["len"][idx] = sizes
+        if len(self.socks) == 1:
+            self._sendmmsg(self.socks[0], idx)
+            return
+        owner = self._slot_sock[idx]
+        for k, sock in enumerate(self.socks):
+            sel = idx[owner == k]
+            if sel.size:
+                self._sendmmsg(sock, sel)
+
+    def _sendmmsg(self, sock: socket.socket, idx: np.ndarray):
+        n = len(idx)
+        self._out_np[:n] = self._hdrs_np[idx]
+        fd = sock.fileno()
+        base = ctypes.addressof(self._out)
+        size = ctypes.sizeof(_MMsgHdr)
+        i = 0
+        while i < n:
+            r = _sendmmsg(fd, ctypes.cast(base + i * size, ctypes.POINTER(_MMsgHdr)), n - i, MSG_DONTWAIT)
+            if r > 0:
+                self.sent += r
+                i += r
+                continue
+            err = ctypes.get_errno()
+            if err == errno.EINTR:
+                continue
+            # le message i n'est pas parti : compté, on passe au suivant
+            if err in DROP_ERRNOS:
+                self.drops += 1
+            else:
+                self.errors += 1
+                self.last_error = errno.errorcode.get(err, str(err))
+            i += 1
+
+    def _send_loop(self, items: Iterable[Tuple[str, int, bytes]], sync_ips: Iterable[str] = ()):
+        packets = []
+        for ip, uni, dmx in items:
+            snd = self._sender(ip)
+            size = snd.build_packet(uni, dmx)
+            packets.append((snd, snd._views[uni][:size]))
+        for ip in sync_ips:
+            snd = self._sender(ip)
+            packets.append((snd, snd.sync_packet))
+        for snd, pkt in packets:
+            try:
+                snd.sock.sendto(pkt, snd.addr)
+                self.sent += 1
+            except OSError as e:
+                if e.errno in DROP_ERRNOS:
+                    self.drops += 1
+                else:
+                    self.errors += 1
+                    self.last_error = str(e)
+
+    def stats(self) -> str:
+        mode = "sendmmsg" if self.batched else "sendto"
+        s = f"tx[{mode} x{len(self.socks)}] pertes={self.drops} erreurs={self.errors}"
+        if self.last_error:
+            s += f" ({self.last_error})"
+        return s
+
+    def close(self):
+        for s in self.socks:
+            try:
+                s.close()
+            except OSError:
+                pass
@@ -0,0 +1,40 @@
+# common/bench_startup.py
+import argparse, os, statistics, subprocess, sys, time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# (nom, dossier, code exécuté dans un interpréteur neuf : import + chargement du mapping)
+ENTRIES = [
+    ("router_lookup",            "receiver", "import router_lookup as m; m.LookupRouter(X)"),
+    ("router_all_bands_stable",  "receiver", "import router_all_bands_stable as m; m.StableRouter(X)"),
+    ("router_all_bands",         "receiver", "import router_all_bands as m; m.load_all_from_excel(X)"),
+    ("router_one_band",          "receiver", "import router_one_band, config_loader as m; m.load_band_from_excel(X, 0)"),
+    ("animator",                 "faker",    "import animator as m; m.load_entities_from_excel(X)"),
+    ("image_player",             "faker",    "import image_player as m; m.load_columns_from_excel(X)"),
+    ("stars_player",             "faker",    "import stars_player as m; m.load_columns_from_excel(X)"),
+    ("send_update_fill_all",     "faker",    "import send_update_fill_all as m; m.load_all_entities(X)"),
+    ("send_update_fill_band",    "faker",    "import send_update_fill_band as m; m.load_band_range(X, 0)"),
+]
+
+def run_once(folder: str, code: str, excel: str) -> float:
+    prog = f"import sys; sys.path.insert(0, {folder!r}); X = {excel!r}; {code}"
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", prog], cwd=ROOT, check=True,
+                   stdout=subprocess.DEVNULL)
+    return (time.perf_counter() - t0) * 1000.0
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(
+        description="Temps de démarrage (processus neuf: imports + chargement du mapping) de chaque point d'entrée"
+    )
+    ap.add_argument("--excel", default="faker/Ecran (2).xlsx")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--only", nargs="+", help="noms des points d'entrée à mesurer")
+    args = ap.parse_args()
+
+    print(f"{'point d entrée':<26} {'médiane':>9} {'min':>9}")
+    for name, folder, code in ENTRIES:
+        if args.only and name not in args.only:
+            continue
+        runs = [run_once(folder, code, args.excel) for _ in range(max(1, args.repeat))]
+        print(f"{name:<26} {statistics.median(runs):7.0f} ms {min(runs):7.0f} ms")
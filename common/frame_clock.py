@@ -0,0 +1,161 @@
+# common/frame_clock.py
+import time
+from typing import Dict, Optional
+import numpy as np
+
+LATE_POLICIES = ("skip", "catchup")
+
+class FrameScheduler:
+    """
+    Cadenceur de frames à FPS fixe, partagé par le routeur et les fakers:
+      - échéances ABSOLUES sur time.monotonic_ns() (deadline = t0 + n * période)
+        → pas de dérive cumulée, insensible aux sauts de l'horloge murale
+      - attente hybride: time.sleep() jusqu'à `spin_us` avant l'échéance,
+        puis boucle active courte (le sleep de l'OS dépasse souvent de 0.1..1 ms) ;
+        la boucle cède le GIL à chaque tour (sleep(0)) : un thread de réception du même
+        processus continue d'avancer. Compromis : plus `spin_us` est grand, plus le
+        réveil est précis et plus la boucle coûte de CPU (spin_us=0 → sleep seul)
+      - frame en retard de plus d'une période:
+          "skip"    → les ticks manqués sont sautés, on se recale sur la grille
+          "catchup" → les ticks manqués sont enchaînés sans attente (rattrapage), au plus
+                      `max_catchup` ; au-delà (longue pause), le surplus est sauté et compté
+                      comme en "skip" (pas de centaines de frames d'affilée après un blocage)
+      - jitter (réveil réel - échéance) mémorisé sur les `window` derniers ticks
+    Usage:
+        clock = FrameScheduler(40)
+        while ...:
+            ...travail de la frame...
+            clock.wait()
+    """
+    def __init__(self, fps: float, late_policy: str = "skip", spin_us: float = 1500.0,
+                 window: int = 1024, report_every: float = 10.0, max_catchup: int = 4):
+        if late_policy not in LATE_POLICIES:
+            raise ValueError(f"late_policy doit être l'une de {LATE_POLICIES}")
+        self.fps = max(1e-3, float(fps))
+        self.period_ns = int(round(1e9 / self.fps))
+        self.late_policy = late_policy
+        self.max_catchup = max(0, int(max_catchup))
+        self.spin_ns = int(spin_us * 1000)
+        self.report_every = float(report_every)
+
+        self._jitter = np.zeros(max(1, int(window)), dtype=np.int64)  # ns, ring buffer
+        self.ticks = 0          # ticks effectivement servis
+        self.late = 0           # ticks réveillés après une période complète de retard
+        self.skipped = 0        # ticks sautés (politique "skip")
+        self.start()
+
+    def start(self, epoch_ns: Optional[int] = None):
+        """
+        (Re)démarre la grille d'échéances (et la fenêtre de jitter).
+        epoch_ns: origine commune (time.monotonic_ns(), horloge du système, identique
+        d'un processus à l'autre) → plusieurs processus tiquent sur la MÊME grille ;
+        par défaut la grille part de maintenant.
+        """
+        now = time.monotonic_ns()
+        self._n_jitter = 0
+        self.t0_ns = now if epoch_ns is None else int(epoch_ns)
+        # prochain point de la grille strictement futur
+        self.next_ns = self.t0_ns + ((now - self.t0_ns) // self.period_ns + 1) * self.period_ns
+        # échéance du tick en cours (point de la grille le plus récent) : même valeur d'un
+        # processus à l'autre pour un même tick → sert d'horodatage commun (instantanés partagés)
+        self.deadline_ns = self.next_ns - self.period_ns
+        self._t_report_ns = now
+        self._ticks_report = self.ticks
+
+    @property
+    def elapsed(self) -> float:
+        """Secondes écoulées depuis start() (horloge monotone, pour les animations)."""
+        return (time.monotonic_ns() - self.t0_ns) / 1e9
+
+    def wait(self) -> int:
+        """
+        Attend l'échéance du prochain tick et retourne le nombre de ticks sautés
+        (0 en régime normal ; en "catchup", seulement au-delà de max_catchup ticks de retard).
+        """
+        deadline = self.next_ns
+        now = time.monotonic_ns()
+        remaining = deadline - now
+        if remaining > self.spin_ns:
+            time.sleep((remaining - self.spin_ns) / 1e9)
+        while True:
+            now = time.monotonic_ns()
+            if now >= deadline:
+                break
+            time.sleep(0)  # rend le GIL (et le CPU) aux autres threads pendant l'attente active
+        return self._tick(now)
+
+    def delay(self) -> float:
+        """Secondes restantes avant l'échéance du prochain tick (<= 0 : déjà dû)."""
+        return (self.next_ns - time.monotonic_ns()) / 1e9
+
+    def tick(self) -> int:
+        """
+        Pour les boucles qui attendent elles-mêmes (asyncio: await asyncio.sleep(clock.delay())) :
+        enregistre le réveil du tick courant et avance l'échéance, comme la fin de wait().
+        """
+        return self._tick(time.monotonic_ns())
+
+    def _tick(self, now: int) -> int:
+        deadline = self.next_ns
+        lateness = now - deadline
+        self._jitter[self._n_jitter % len(self._jitter)] = lateness
+        self._n_jitter += 1
+        self.ticks += 1
+        self.deadline_ns = deadline
+
+        skipped = 0
+        self.next_ns = deadline + self.period_ns
+        if lateness >= self.period_ns:
+            self.late += 1
+            backlog = lateness // self.period_ns  # ticks manqués en plus de celui-ci
+            if self.late_policy == "skip":
+                # recalage sur la grille : prochaine échéance strictement future
+                skipped = backlog
+            else:
+                # rattrapage borné : les max_catchup derniers ticks manqués sont enchaînés
+                skipped = max(0, backlog - self.max_catchup)
+            self.next_ns += skipped * self.period_ns
+            self.skipped += skipped
+        return skipped
+
+    # ---------- statistiques ----------
+    def jitter_ms(self, q: float) -> float:
+        """Percentile q (0..100) du jitter de réveil sur la fenêtre, en ms."""
+        n = min(self._n_jitter, len(self._jitter))
+        if n == 0:
+            return 0.0
+        return float(np.percentile(self._jitter[:n], q)) / 1e6
+
+    def achieved_fps(self) -> float:
+        """FPS réellement tenus depuis le dernier report() (ou start())."""
+        dt = (time.monotonic_ns() - self._t_report_ns) / 1e9
+        return (self.ticks - self._ticks_report) / dt if dt > 0 else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "fps": self.achieved_fps(),
+            "target_fps": self.fps,
+            "jitter_p50_ms": self.jitter_ms(50),
+            "jitter_p99_ms": self.jitter_ms(99),
+            "late": self.late,
+            "skipped": self.skipped,
+        }
+
+    def summary(self) -> str:
+        """Ligne de stats: FPS tenus vs cible, jitter p50/p99, ticks en retard / sautés."""
+        s = self.stats()
+        line = (f"⏱️ {s['fps']:.1f}/{s['target_fps']:g} fps, jitter p50={s['jitter_p50_ms']:.2f} ms "
+                f"p99={s['jitter_p99_ms']:.2f} ms")
+        if self.late:
+            line += f", en retard={self.late} sautées={self.skipped}"
+        return line
+
+    def report(self) -> Optional[str]:
+        """summary() toutes les `report_every` s (None sinon) ; remet la mesure de FPS à zéro."""
+        now = time.monotonic_ns()
+        if self.report_every <= 0 or (now - self._t_report_ns) / 1e9 < self.report_every:
+            return None
+        line = self.summary()
+        self._t_report_ns = now
+        self._ticks_report = self.ticks
+        return line
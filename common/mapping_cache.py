@@ -0,0 +1,245 @@
+# common/mapping_cache.py
+import argparse, hashlib, os, time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+SHEET = "eHuB"
+CACHE_VERSION = 1            # à incrémenter si le format ou les règles de compilation changent
+CACHE_DIR = ".mapping_cache" # à côté de l'Excel
+LED_UNIVERSES = (0, 127)     # univers LEDs (200 = projecteur, ignoré par les tables LEDs)
+BAND_HEAD = 170              # entités d'une bande envoyées sur l'univers U (le reste sur U+1)
+GRID = 128                   # mur 128 x 128
+
+Target = Tuple[str, int]                    # (ip, universe)
+SheetRow = Tuple[str, int, int, str, int]   # (name, entity_start, entity_end, ip, universe)
+
+COLUMNS = {
+    "Name": "name",
+    "Entity Start": "entity_start",
+    "Entity End": "entity_end",
+    "ArtNet IP": "ip",
+    "ArtNet Universe": "universe",
+}
+
+# ---------------- lecture Excel (uniquement à la compilation) ----------------
+def read_sheet(xlsx_path: str) -> List[SheetRow]:
+    """Lit la feuille eHuB avec openpyxl (read_only), sans pandas ; lignes incomplètes ignorées."""
+    from openpyxl import load_workbook
+    wb = load_workbook(xlsx_path, read_only=True, data_only=True)
+    try:
+        it = wb[SHEET].iter_rows(values_only=True)
+        header = next(it, ())
+        col = {COLUMNS[h]: i for i, h in enumerate(header) if h in COLUMNS}
+        rows: List[SheetRow] = []
+        for v in it:
+            cells = {k: (v[i] if i < len(v) else None) for k, i in col.items()}
+            if any(cells.get(k) is None for k in ("entity_start", "entity_end", "ip", "universe")):
+                continue
+            rows.append((str(cells.get("name")), int(cells["entity_start"]), int(cells["entity_end"]),
+                         str(cells["ip"]), int(cells["universe"])))
+    finally:
+        wb.close()
+    return rows
+
+def _span(a: int, b: int) -> List[int]:
+    """Plage contiguë d'entités (start > end toléré)."""
+    return list(range(min(a, b), max(a, b) + 1))
+
+def _is_led(uni: int) -> bool:
+    return LED_UNIVERSES[0] <= uni <= LED_UNIVERSES[1]
+
+# ---------------- compilation ----------------
+def _bands(rows: List[SheetRow]) -> List[Tuple[str, int, List[int]]]:
+    """
+    Bandes physiques LAPS: 2 univers consécutifs (U pair, U+1) d'une même IP,
+    entités de U puis de U+1 ; parcours par IP puis univers croissants.
+    """
+    by_ip: Dict[str, List[SheetRow]] = {}
+    for r in sorted((r for r in rows if _is_led(r[4])), key=lambda r: (r[3], r[4])):
+        by_ip.setdefault(r[3], []).append(r)
+    bands: List[Tuple[str, int, List[int]]] = []
+    for ip, g in by_ip.items():
+        first: Dict[int, SheetRow] = {}
+        for r in g:
+            first.setdefault(r[4], r)
+        for _, _, _, _, u in g:
+            if u % 2 != 0:
+                continue
+            a, b = first[u], first.get(u + 1)
+            ids = _span(a[1], a[2]) + (_span(b[1], b[2]) if b is not None else [])
+            bands.append((ip, u, ids))
+    return bands
+
+def _columns(bands: List[Tuple[str, int, List[int]]]) -> List[List[int]]:
+    """2 colonnes visibles de 128 LED par bande: montée (band[1:129], inversée) puis descente (band[130:258])."""
+    columns: List[List[int]] = []
+    for _, _, band in bands:
+        if len(band) < 200:
+            continue
+        col0 = list(reversed(band[1:1 + GRID]))
+        col1 = band[130:130 + GRID]
+        if len(col0) < GRID: col0 = (col0 + [col0[-1]] * GRID)[:GRID]
+        if len(col1) < GRID: col1 = (col1 + [col1[-1]] * GRID)[:GRID]
+        columns.append(col0)
+        columns.append(col1)
+    return columns
+
+def compile_mapping(rows: List[SheetRow]) -> Dict[str, np.ndarray]:
+    """Feuille eHuB → tableaux de l'artefact (lignes brutes, lookup, grille, bandes)."""
+    bands = _bands(rows)
+
+    # lookup entité → (univers DMX, offset) : 170 premières entités sur U, le reste sur U+1
+    targets: Dict[Target, int] = {}
+    lookup: Dict[int, Tuple[int, int]] = {}
+    for ip, u, ids in bands:
+        head, tail = ids[:BAND_HEAD], ids[BAND_HEAD:]
+        ta = targets.setdefault((ip, u), len(targets))
+        if tail:
+            tb = targets.setdefault((ip, u + 1), len(targets))
+        for i, eid in enumerate(head):
+            lookup[eid] = (ta, i * 3)
+        for i, eid in enumerate(tail):
+            lookup[eid] = (tb, i * 3)
+
+    columns = _columns(bands)
+    ptr = np.cumsum([0] + [len(ids) for _, _, ids in bands])
+    return {
+        "version": np.array(CACHE_VERSION),
+        "row_name": np.array([r[0] for r in rows], dtype=str),
+        "row_start": np.array([r[1] for r in rows], dtype=np.int32),
+        "row_end": np.array([r[2] for r in rows], dtype=np.int32),
+        "row_ip": np.array([r[3] for r in rows], dtype=str),
+        "row_uni": np.array([r[4] for r in rows], dtype=np.int32),
+        "target_ip": np.array([t[0] for t in targets], dtype=str),
+        "target_uni": np.array([t[1] for t in targets], dtype=np.int32),
+        "lut_eid": np.fromiter(lookup.keys(), dtype=np.int32, count=len(lookup)),
+        "lut_target": np.array([v[0] for v in lookup.values()], dtype=np.int32),
+        "lut_off": np.array([v[1] for v in lookup.values()], dtype=np.int32),
+        "grid": np.array(columns, dtype=np.int32).reshape(len(columns), GRID),
+        "band_ip": np.array([b[0] for b in bands], dtype=str),
+        "band_uni": np.array([b[1] for b in bands], dtype=np.int32),
+        "band_ptr": ptr.astype(np.int32),
+        "band_eids": np.array([e for _, _, ids in bands for e in ids], dtype=np.int32),
+    }
+
+# ---------------- artefact ----------------
+class Mapping:
+    """
+    Mapping compilé, lu depuis l'artefact .npz (chargement paresseux: un tableau
+    n'est décompressé qu'au premier accès). Chaque loader historique n'utilise
+    que la table dont il a besoin.
+    """
+    def __init__(self, arrays, path: Optional[str] = None, compiled: bool = False):
+        self._arrays = arrays
+        self._cache: Dict[str, object] = {}
+        self.path = path          # artefact utilisé (None = compilé en mémoire seulement)
+        self.compiled = compiled  # True si l'Excel vient d'être (re)compilé
+
+    def _a(self, key: str) -> np.ndarray:
+        arr = self._cache.get(key)
+        if arr is None:
+            arr = self._cache[key] = self._arrays[key]
+        return arr
+
+    def rows(self) -> List[SheetRow]:
+        """Toutes les lignes de la feuille (projecteur compris), ordre Excel."""
+        return list(zip(self._a("row_name").tolist(), self._a("row_start").tolist(), self._a("row_end").tolist(),
+                        self._a("row_ip").tolist(), self._a("row_uni").tolist()))
+
+    def led_rows(self) -> List[SheetRow]:
+        """Lignes des univers LEDs 0..127, ordre Excel."""
+        return [r for r in self.rows() if _is_led(r[4])]
+
+    def row(self, universe: int) -> Optional[SheetRow]:
+        """1re ligne de l'univers demandé (None si absent)."""
+        hit = np.flatnonzero(self._a("row_uni") == universe)
+        return self.rows()[hit[0]] if hit.size else None
+
+    def led_entities(self) -> List[int]:
+        """Ids d'entités LEDs, uniques et triés."""
+        return sorted({e for _, a, b, _, _ in self.led_rows() for e in _span(a, b)})
+
+    def targets(self) -> List[Target]:
+        """Univers DMX alloués par le lookup (ordre de première apparition des bandes)."""
+        return list(zip(self._a("target_ip").tolist(), self._a("target_uni").tolist()))
+
+    def lookup(self) -> Dict[int, Tuple[Target, int]]:
+        """entité → ((ip, univers), offset DMX), découpage 170 / reste par bande."""
+        targets = self.targets()
+        return {eid: (targets[t], off) for eid, t, off in
+                zip(self._a("lut_eid").tolist(), self._a("lut_target").tolist(), self._a("lut_off").tolist())}
+
+    @property
+    def grid(self) -> np.ndarray:
+        """Colonnes visibles (n_colonnes x 128) → entity_id, x = colonne, y = LED."""
+        return self._a("grid")
+
+    def columns(self, n: int = GRID) -> List[List[int]]:
+        """columns[x][y] → entity_id: grid tronquée à `n` colonnes, complétée en répétant la dernière."""
+        cols = self.grid[:n].tolist()
+        while 0 < len(cols) < n:
+            cols.append(cols[-1])
+        # fallback: grille vide (mieux que crash)
+        return cols or [[0] * GRID for _ in range(n)]
+
+    def bands(self) -> List[Tuple[Target, List[int]]]:
+        """Entités de chaque bande physique ((ip, U pair), entités de U puis U+1)."""
+        ptr = self._a("band_ptr").tolist()
+        eids = self._a("band_eids")
+        return [((ip, u), eids[ptr[i]:ptr[i + 1]].tolist())
+                for i, (ip, u) in enumerate(zip(self._a("band_ip").tolist(), self._a("band_uni").tolist()))]
+
+def file_digest(path: str) -> str:
+    """Empreinte du CONTENU de l'Excel (une copie ou un touch ne recompile pas)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def cache_path(xlsx_path: str, digest: str, cache_dir: Optional[str] = None) -> str:
+    folder = cache_dir or os.path.join(os.path.dirname(os.path.abspath(xlsx_path)), CACHE_DIR)
+    stem = os.path.splitext(os.path.basename(xlsx_path))[0]
+    return os.path.join(folder, f"{stem}.v{CACHE_VERSION}.{digest[:16]}.npz")
+
+def load_mapping(xlsx_path: str, cache_dir: Optional[str] = None, rebuild: bool = False) -> Mapping:
+    """
+    Mapping de l'Excel via l'artefact compilé `<dossier Excel>/.mapping_cache/<nom>.v<N>.<sha256>.npz`.
+    Absent (Excel modifié, 1er lancement) ou rebuild=True → compilation puis écriture atomique.
+    Dossier non inscriptible → mapping compilé utilisé en mémoire.
+    """
+    path = cache_path(xlsx_path, file_digest(xlsx_path), cache_dir)
+    if not rebuild and os.path.isfile(path):
+        try:
+            arrays = np.load(path, allow_pickle=False)
+            if int(arrays["version"]) == CACHE_VERSION:
+                return Mapping(arrays, path)
+        except (OSError, ValueError, KeyError):
+            pass  # artefact illisible → recompilation
+    arrays = compile_mapping(read_sheet(xlsx_path))
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"⚠️ cache mapping non écrit ({e}), mapping compilé en mémoire")
+        path = None
+    return Mapping(arrays, path, compiled=True)
+
+# ---------------- CLI ----------------
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Compile la feuille eHuB de l'Excel en artefact mapping (.npz)")
+    ap.add_argument("--excel", default="faker/Ecran (2).xlsx")
+    ap.add_argument("--cache-dir", help="dossier des artefacts (défaut: .mapping_cache à côté de l'Excel)")
+    ap.add_argument("--rebuild", action="store_true", help="recompiler même si l'artefact existe")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    m = load_mapping(args.excel, args.cache_dir, args.rebuild)
+    dt = (time.perf_counter() - t0) * 1000.0
+    state = "compilé" if m.compiled else "déjà à jour"
+    print(f"🗂️ {m.path or '(mémoire)'} — {state} en {dt:.1f} ms")
+    print(f"   {len(m.rows())} lignes, {len(m.lookup())} entités → {len(m.targets())} univers DMX, "
+          f"grille {m.grid.shape[0]}x{GRID}, {len(m.bands())} bandes")
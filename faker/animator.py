@@ -1,49 +1,23 @@
 # faker/animator.py
-import struct, gzip, socket, time, math, argparse
+import math, argparse, os, sys
 from typing import List, Tuple
-import pandas as pd
-
-MAGIC = b"eHuB"
-
-def pack_update(universe: int, entities: List[Tuple[int,int,int,int,int]]) -> bytes:
-    payload = bytearray()
-    for eid, r, g, b, w in entities:
-        payload += struct.pack("<HBBBB", eid, r, g, b, w)
-    comp = gzip.compress(bytes(payload))
-    header = bytearray()
-    header += MAGIC
-    header += bytes([2])                       # type UPDATE
-    header += bytes([universe & 0xFF])         # eHuB universe (on reste sur 0 pour tout router)
-    header += struct.pack("<H", len(entities))
-    header += struct.pack("<H", len(comp))
-    return bytes(header) + comp
-
-def send_udp(packet: bytes, host="127.0.0.1", port=50000):
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.sendto(packet, (host, port))
+import numpy as np
+
+# cadenceur partagé (common/frame_clock.py) + mapping Excel compilé (common/mapping_cache.py)
+HERE = os.path.dirname(__file__)
+COMMON_DIR = os.path.abspath(os.path.join(HERE, "..", "common"))
+if COMMON_DIR not in sys.path:
+    sys.path.insert(0, COMMON_DIR)
+from frame_clock import FrameScheduler
+from mapping_cache import load_mapping
+from ehub_proto import UpdateEncoder, UdpTransport, GZIP_LEVEL
 
 def load_entities_from_excel(xlsx_path: str) -> List[int]:
     """
     Charge toutes les entités LEDs (univers 0..127) depuis la feuille eHuB.
     Retourne une liste unique triée d’entity_ids.
     """
-    df = pd.read_excel(xlsx_path, sheet_name="eHuB")
-    df = df.rename(columns={
-        "Entity Start": "entity_start",
-        "Entity End": "entity_end",
-        "ArtNet IP": "ip",
-        "ArtNet Universe": "universe",
-        "Name": "name",
-    })
-    df = df[(df["universe"] >= 0) & (df["universe"] <= 127)].copy()
-    ent: List[int] = []
-    for _, r in df.iterrows():
-        a, b = int(r["entity_start"]), int(r["entity_end"])
-        if a <= b:
-            ent.extend(range(a, b+1))
-        else:
-            ent.extend(range(b, a+1))
-    return sorted(set(ent))
+    return load_mapping(xlsx_path).led_entities()
 
 def clamp(v: int) -> int:
     return max(0, min(255, v))
@@ -55,9 +29,51 @@ def color_tuple(s: str) -> Tuple[int,int,int]:
 def lerp(a: int, b: int, t: float) -> int:
     return clamp(int(a + (b - a) * t))
 
+def lerp_np(a, b, t) -> np.ndarray:
+    """lerp() sur des tableaux (t ou a/b vectoriels), même arrondi (troncature) puis bornes 0..255."""
+    return np.clip((a + (b - a) * t).astype(np.int64), 0, 255)
+
+def render_animation(mode: str, out: np.ndarray, t: float, frame: int, fps: float, speed: float,
+                     c1: Tuple[int,int,int], c2: Tuple[int,int,int], norm: np.ndarray):
+    """
+    Couleurs de la frame écrites en place dans `out` (tableau ENTITY_DTYPE, ids déjà posés,
+    ordre de ent_ids) ; norm = position normalisée [0..1] de chaque entité.
+    """
+    N = len(out)
+    if mode == "blink":
+        # alterne color1 / color2 chaque 0.5/speed secondes
+        phase = int((t * speed) % 2)  # 0 ou 1
+        rgb = [np.full(N, v) for v in (c1 if phase == 0 else c2)]
+
+    elif mode == "chase":
+        # "comète" de largeur W qui se déplace
+        width = max(8, int(0.03 * N))          # ~3% de la longueur
+        head = int((t * speed * 10) % N)       # vitesse
+        # distance circulaire, intensité décroissante
+        d = (np.arange(N) - head) % N
+        k = np.maximum(0.0, 1.0 - d / width)
+        rgb = [lerp_np(0, v, k) for v in c1]
+
+    elif mode == "wave":
+        # onde sinusoïdale sur toute la longueur (palette color1)
+        s = 0.5 + 0.5 * np.sin(2 * math.pi * (norm * 1.0 - t * speed))
+        rgb = [lerp_np(0, v, s) for v in c1]
+
+    elif mode == "gradient":
+        # dégradé fixe color1 → color2 sur la hauteur, petit fade-in 1s
+        k = min(1.0, frame / max(1, fps))
+        rgb = [lerp_np(0, lerp_np(a, b, norm), k) for a, b in zip(c1, c2)]
+
+    else:
+        # défaut : plein color1
+        rgb = [np.full(N, v) for v in c1]
+
+    out["r"], out["g"], out["b"] = rgb
+
 def run_animation(mode: str, excel: str, host: str, port: int,
                   seconds: float, fps: float,
-                  color1: str, color2: str, speed: float):
+                  color1: str, color2: str, speed: float, level: int = GZIP_LEVEL,
+                  budget: int = 0, pace: float = 0.5):
     ent_ids = load_entities_from_excel(excel)
     if not ent_ids:
         print("⚠️ aucune entité trouvée dans l'Excel (univers 0..127)")
@@ -65,62 +81,32 @@ def run_animation(mode: str, excel: str, host: str, port: int,
 
     r1, g1, b1 = color_tuple(color1)
     r2, g2, b2 = color_tuple(color2)
-    dt = 1.0 / max(1e-3, fps)
-    t_end = time.time() + seconds
+    clock = FrameScheduler(fps)
+    # budget = 0 (défaut) : un seul UPDATE de toute la frame sur l'univers 0, comme avant ;
+    # budget > 0 : paquets sur les univers 0..k-1 (routeur --assemble uniquement : le routeur
+    # applique sinon chaque paquet à la table CONFIG de son univers)
+    encoder = UpdateEncoder(0xFFFF, level, budget=budget)
+    transport = UdpTransport(host, port, pace)
     print(f"🎬 mode={mode} seconds={seconds} fps={fps} entities={len(ent_ids)}")
 
     # Pour les effets positionnels, on normalise l’index [0..1]
     N = len(ent_ids)
-    norm = [i / max(1, N-1) for i in range(N)]
+    norm = np.arange(N) / max(1, N-1)
+    # frame rendue en place dans le buffer de l'encodeur (ids posés une fois)
+    ents = encoder.buffer(N)
+    ents["id"] = ent_ids
 
     frame = 0
-    while time.time() < t_end:
-        t = time.time()
-        ents: List[Tuple[int,int,int,int,int]] = []
-
-        if mode == "blink":
-            # alterne color1 / color2 chaque 0.5/speed secondes
-            phase = int((t * speed) % 2)  # 0 ou 1
-            cr, cg, cb = (r1, g1, b1) if phase == 0 else (r2, g2, b2)
-            for eid in ent_ids:
-                ents.append((eid, cr, cg, cb, 0))
-
-        elif mode == "chase":
-            # "comète" de largeur W qui se déplace
-            width = max(8, int(0.03 * N))          # ~3% de la longueur
-            head = int((t * speed * 10) % N)       # vitesse
-            for i, eid in enumerate(ent_ids):
-                # distance circulaire
-                d = (i - head) % N
-                # intensité décroissante
-                k = max(0.0, 1.0 - d / width)
-                cr = lerp(0, r1, k); cg = lerp(0, g1, k); cb = lerp(0, b1, k)
-                ents.append((eid, cr, cg, cb, 0))
-
-        elif mode == "wave":
-            # onde sinusoïdale sur toute la longueur (palette color1)
-            for i, eid in enumerate(ent_ids):
-                s = 0.5 + 0.5 * math.sin(2 * math.pi * (norm[i] * 1.0 - t * speed))
-                cr = lerp(0, r1, s); cg = lerp(0, g1, s); cb = lerp(0, b1, s)
-                ents.append((eid, cr, cg, cb, 0))
-
-        elif mode == "gradient":
-            # dégradé fixe color1 → color2 sur la hauteur, sans animation
-            k = min(1.0, frame / max(1, fps))  # fade-in 1s
-            for i, eid in enumerate(ent_ids):
-                r = lerp(r1, r2, norm[i])
-                g = lerp(g1, g2, norm[i])
-                b = lerp(b1, b2, norm[i])
-                # petit fade-in (optionnel)
-                ents.append((eid, lerp(0, r, k), lerp(0, g, k), lerp(0, b, k), 0))
-
-        else:
-            # défaut : plein color1
-            for eid in ent_ids:
-                ents.append((eid, r1, g1, b1, 0))
-
-        pkt = pack_update(universe=0, entities=ents)
-        send_udp(pkt, host, port)
+    clock.start()
+    while clock.elapsed < seconds:
+        t = clock.elapsed
+        render_animation(mode, ents, t, frame, fps, speed, (r1, g1, b1), (r2, g2, b2), norm)
+
+        transport.send_frame(encoder.encode(ents), clock.delay())
         frame += 1
-        # cadence
-        time.sleep(dt)
+        # cadence (échéances monotones, sans dérive)
+        clock.wait()
+    transport.close()
+    print(clock.summary())
+    print(encoder.summary())
+    print(transport.summary())
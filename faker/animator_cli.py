@@ -1,6 +1,7 @@
 # faker/animator_cli.py
 import argparse
 from animator import run_animation
+from ehub_proto import GZIP_LEVEL, MTU_BUDGET
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser(description="Animations eHuB (blink/chase/wave/gradient)")
@@ -13,7 +14,15 @@ if __name__ == "__main__":
     ap.add_argument("--color1", default="255,0,0", help="R,G,B (ex: 255,0,0)")
     ap.add_argument("--color2", default="0,0,255", help="R,G,B (ex: 0,0,255) pour gradient/blink")
     ap.add_argument("--speed", type=float, default=1.0, help="vitesse de l’animation")
+    ap.add_argument("--gzip-level", type=int, default=GZIP_LEVEL, choices=range(1, 10), metavar="1..9",
+                    help="niveau de compression gzip (9 = paquets identiques à l'historique, 1 = plus rapide)")
+    ap.add_argument("--mtu-budget", type=int, default=0,
+                    help=f"taille max d'un paquet eHuB en octets, découpe adaptative sur les univers 0..k-1 "
+                         f"(ex: {MTU_BUDGET}, routeur --assemble) ; 0 = un seul paquet par frame, univers 0")
+    ap.add_argument("--pace", type=float, default=0.5,
+                    help="fraction du temps restant avant le prochain tick sur laquelle étaler les paquets (0 = rafale)")
     args = ap.parse_args()
 
     run_animation(args.mode, args.excel, args.host, args.port,
-                  args.seconds, args.fps, args.color1, args.color2, args.speed)
+                  args.seconds, args.fps, args.color1, args.color2, args.speed, args.gzip_level,
+                  args.mtu_budget, args.pace)
@@ -0,0 +1,80 @@
+# faker/bench_encoder.py
+import argparse, gzip, os, struct, sys, time
+import numpy as np
+
+HERE = os.path.dirname(__file__)
+COMMON_DIR = os.path.abspath(os.path.join(HERE, "..", "common"))
+if COMMON_DIR not in sys.path:
+    sys.path.insert(0, COMMON_DIR)
+from mapping_cache import load_mapping
+from ehub_proto import MAGIC, UpdateEncoder, as_entities
+
+def legacy_pack_update(universe: int, entities) -> bytes:
+    """Ancien pack_update des players (struct.pack par entité, gzip niveau 9), référence du format."""
+    payload = bytearray()
+    for eid, r, g, b, w in entities:
+        payload += struct.pack("<HBBBB", eid, r, g, b, w)
+    comp = gzip.compress(bytes(payload))
+    header = bytearray()
+    header += MAGIC
+    header += bytes([2])
+    header += bytes([universe & 0xFF])
+    header += struct.pack("<H", len(entities))
+    header += struct.pack("<H", len(comp))
+    return bytes(header) + comp
+
+def legacy_encode(ents, chunk: int):
+    return [legacy_pack_update(u, ents[i:i + chunk]) for u, i in enumerate(range(0, len(ents), chunk))]
+
+def same_wire(a, b) -> bool:
+    """Paquets identiques octet pour octet, au champ mtime de l'entête gzip près (octets 4..7 du flux gzip)."""
+    strip = lambda p: p[:14] + p[18:]
+    return len(a) == len(b) and all(strip(x) == strip(y) for x, y in zip(a, b))
+
+def best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Débit d'encodage eHuB d'une frame 128x128 complète")
+    ap.add_argument("--excel", default="faker/Ecran (2).xlsx")
+    ap.add_argument("--chunk", type=int, default=3000)
+    ap.add_argument("--levels", type=int, nargs="+", default=[9, 6, 1])
+    ap.add_argument("--workers", type=int, nargs="+", default=[0, 2, 4])
+    ap.add_argument("--repeat", type=int, default=10)
+    args = ap.parse_args()
+
+    columns = load_mapping(args.excel).columns(128)
+    # image type : dégradés (ids croissants + couleurs lisses, comme une image ou une anim)
+    xs, ys = np.meshgrid(np.arange(128), np.arange(128), indexing="ij")
+    rgb = np.stack([xs * 2, ys * 2, (xs + ys) & 0xFF], axis=-1).astype(np.uint8)
+    ents = [(columns[x][y], *map(int, rgb[x, y]), 0) for x in range(128) for y in range(128)]
+
+    ref = legacy_encode(ents, args.chunk)
+    t_ref = best_ms(lambda: legacy_encode(ents, args.chunk), args.repeat)
+    print(f"⏱️ frame {len(ents)} entités, paquets de {args.chunk} ({len(ref)} paquets), {os.cpu_count()} CPU")
+    print(f"  {'ancien pack_update':<26} {t_ref:7.2f} ms/frame  {1000.0 / t_ref:6.0f} frames/s  "
+          f"{sum(map(len, ref)) // 1024} Ko")
+
+    enc = UpdateEncoder(args.chunk)
+    assert same_wire(enc.encode(ents), ref), "sortie différente de l'ancien pack_update"
+    buf = enc.buffer(len(ents))
+    buf[:] = as_entities(ents)
+    assert same_wire(enc.encode(buf), ref), "sortie différente depuis le buffer préalloué"
+    t = best_ms(lambda: enc.encode(ents), args.repeat)
+    print(f"  {'liste de tuples, niveau 9':<26} {t:7.2f} ms/frame  {1000.0 / t:6.0f} frames/s  x{t_ref / t:.1f}  (identique)")
+    enc.close()
+
+    for level in args.levels:
+        for w in args.workers:
+            enc = UpdateEncoder(args.chunk, level, w)
+            out = enc.encode(buf)
+            t = best_ms(lambda: enc.encode(buf), args.repeat)
+            label = f"buffer, niveau {level}, {w or 'inline'}" + (" threads" if w else "")
+            print(f"  {label:<26} {t:7.2f} ms/frame  {1000.0 / t:6.0f} frames/s  x{t_ref / t:.1f}  "
+                  f"{sum(map(len, out)) // 1024} Ko" + ("  (identique)" if level == 9 and same_wire(out, ref) else ""))
+            enc.close()
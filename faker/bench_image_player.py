@@ -0,0 +1,60 @@
+# faker/bench_image_player.py
+import argparse, os, socket, time
+from image_player import (apply_brightness_gamma, brightness_gamma_lut, image_to_entities,
+                          load_and_resize_image, load_columns_from_excel, load_grid_from_excel)
+from ehub_proto import UdpTransport, UpdateEncoder, MTU_BUDGET
+
+def legacy_frame(px, columns, brightness: float, gamma: float, encoder: UpdateEncoder):
+    """Ancienne boucle de stream_image_to_ehub : px[x, y] + apply_brightness_gamma par pixel, ré-encodage."""
+    ents = []
+    for x in range(128):
+        col = columns[x]
+        for y in range(128):
+            r, g, b = apply_brightness_gamma(px[x, y], brightness, gamma)
+            ents.append((col[y], r, g, b, 0))
+    return ents, encoder.encode(ents)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="CPU par frame d'une image fixe : boucle par pixel vs pipeline NumPy + paquets en cache")
+    ap.add_argument("--excel", default="faker/Ecran (2).xlsx")
+    ap.add_argument("--image", default="assets/ryu.png")
+    ap.add_argument("--brightness", type=float, default=0.7)
+    ap.add_argument("--gamma", type=float, default=2.0)
+    ap.add_argument("--frames", type=int, default=50)
+    ap.add_argument("--port", type=int, default=50992)
+    args = ap.parse_args()
+
+    columns = load_columns_from_excel(args.excel)
+    grid = load_grid_from_excel(args.excel)
+    img = load_and_resize_image(args.image, 128, "cover", False)
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)  # routeur muet : les paquets s'accumulent puis sont jetés
+    sink.bind(("127.0.0.1", args.port))
+    tx = UdpTransport("127.0.0.1", args.port, pace=0.0)
+
+    # avant : tout est refait à chaque frame
+    enc = UpdateEncoder(budget=MTU_BUDGET)
+    px = img.load()
+    ents_ref, _ = legacy_frame(px, columns, args.brightness, args.gamma, enc)
+    c0 = time.process_time()
+    for _ in range(args.frames):
+        tx.send_frame(legacy_frame(px, columns, args.brightness, args.gamma, enc)[1])
+    old = (time.process_time() - c0) / args.frames * 1000.0
+
+    # après : conversion + encodage une fois, puis envois seuls
+    enc = UpdateEncoder(budget=MTU_BUDGET)
+    c0 = time.process_time()
+    ents = image_to_entities(img, grid, brightness_gamma_lut(args.brightness, args.gamma))
+    packets = enc.encode_still(ents)
+    prep = (time.process_time() - c0) * 1000.0
+    assert ents.tolist() == ents_ref, "entités différentes de l'ancienne boucle"
+    c0 = time.process_time()
+    for _ in range(args.frames):
+        tx.send_frame(packets)
+    new = (time.process_time() - c0) * 1000.0 / args.frames
+
+    print(f"⏱️ {os.path.basename(args.image)}, {len(packets)} paquets/frame (budget {MTU_BUDGET} o), CPU process_time")
+    print(f"  avant : {old:7.2f} ms CPU/frame (boucle par pixel + gzip à chaque frame)")
+    print(f"  après : {new:7.2f} ms CPU/frame (envoi des paquets en cache), préparation unique {prep:.1f} ms  x{old / new:.0f}")
+    print(f"  entités identiques à l'ancienne boucle : oui ; {tx.summary()}")
+    tx.close()
+    sink.close()
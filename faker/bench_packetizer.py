@@ -0,0 +1,61 @@
+# faker/bench_packetizer.py
+import argparse, math, os, sys
+import numpy as np
+
+HERE = os.path.dirname(__file__)
+for d in ("common", "receiver"):
+    p = os.path.abspath(os.path.join(HERE, "..", d))
+    if p not in sys.path:
+        sys.path.insert(0, p)
+from mapping_cache import load_mapping
+from udp_ingest import UdpIngest, UNFRAGMENTED_MAX
+from ehub_proto import ENTITY_DTYPE, UdpTransport, UpdateEncoder, MTU_BUDGET
+from stars_player import build_starfield, render_stars_frame
+
+def scenes(columns, frames: int):
+    """Frames (tableaux ENTITY_DTYPE) de trois contenus types du mur 128x128."""
+    ids = np.array([columns[x][y] for x in range(128) for y in range(128)])
+    xs, ys = np.divmod(np.arange(len(ids)), 128)
+    img = np.zeros(len(ids), dtype=ENTITY_DTYPE)
+    img["id"], img["r"], img["g"], img["b"] = ids, xs * 2, ys * 2, (xs + ys) & 0xFF
+    stars = build_starfield(columns, density=0.01, seed=42)
+
+    def wave(f):
+        e = np.zeros(len(ids), dtype=ENTITY_DTYPE)
+        e["id"] = ids
+        e["b"] = (127.5 + 127.5 * np.sin(2 * math.pi * (xs / 128.0 - f / 30.0))).astype(np.uint8)
+        return e
+
+    yield "image fixe", [img] * frames
+    yield "ciel étoilé (fond)", [render_stars_frame(columns, stars, f / 20.0, (4, 8, 16)) for f in range(frames)]
+    yield "vague", [wave(f) for f in range(frames)]
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Paquets eHuB par frame et part fragmentée (> 1472 o), découpe fixe vs budget MTU")
+    ap.add_argument("--excel", default="faker/Ecran (2).xlsx")
+    ap.add_argument("--frames", type=int, default=40)
+    ap.add_argument("--port", type=int, default=50991)
+    args = ap.parse_args()
+
+    columns = load_mapping(args.excel).columns(128)
+    ingest = UdpIngest("127.0.0.1", args.port, ring=512)  # côté routeur : compte les datagrammes > 1472 o
+    tx = UdpTransport("127.0.0.1", args.port, pace=0.0)
+    print(f"⏱️ {args.frames} frames par contenu, mesuré à la réception (UdpIngest, > {UNFRAGMENTED_MAX} o = fragmenté)")
+    for name, frames in scenes(columns, args.frames):
+        for label, enc in (("2048 entités (image)", UpdateEncoder(2048)),
+                           ("3000 entités (étoiles)", UpdateEncoder(3000)),
+                           (f"budget {MTU_BUDGET} o", UpdateEncoder(budget=MTU_BUDGET))):
+            p0, o0 = ingest.packets, ingest.oversize
+            octets = 0
+            for f in frames:
+                pkts = enc.encode(f)
+                octets += sum(map(len, pkts))
+                tx.send_frame(pkts)
+                while len(ingest.recv_batch(0.05)) == 512:
+                    pass
+            n, big = ingest.packets - p0, ingest.oversize - o0
+            print(f"  {name:<20} {label:<24} {n / len(frames):5.1f} paquets/frame, "
+                  f"{100.0 * big / max(1, n):3.0f}% fragmentés, {octets / len(frames) / 1024:5.1f} Ko/frame"
+                  + (f", {enc.resplits} redécoupes" if enc.resplits else ""))
+    tx.close()
+    ingest.close()
@@ -0,0 +1,73 @@
+# faker/bench_sequence.py
+import argparse, math, os, socket, tempfile, time
+import numpy as np
+from PIL import Image
+from image_player import (brightness_gamma_lut, fit_image, image_to_entities,
+                          iter_source_frames, load_grid_from_excel, play_sequence)
+from ehub_proto import UpdateEncoder, MTU_BUDGET
+
+def make_gif(path: str, frames: int, size: int, duration_ms: int):
+    """GIF synthétique : dégradé qui défile + disque qui tourne (palette différente à chaque frame)."""
+    ys, xs = np.mgrid[0:size, 0:size]
+    imgs = []
+    for f in range(frames):
+        a = 2 * math.pi * f / frames
+        rgb = np.zeros((size, size, 3), dtype=np.uint8)
+        rgb[..., 0] = (xs * 2 + f * 8) & 0xFF
+        rgb[..., 1] = (ys * 2) & 0xFF
+        cx, cy = size / 2 + size / 3 * math.cos(a), size / 2 + size / 3 * math.sin(a)
+        rgb[(xs - cx) ** 2 + (ys - cy) ** 2 < (size / 8) ** 2] = (255, 255, 255)
+        imgs.append(Image.fromarray(rgb))
+    imgs[0].save(path, save_all=True, append_images=imgs[1:], duration=duration_ms, loop=0)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Lecture d'animation : coût du décodage, retards de décodage et relecture en cache")
+    ap.add_argument("--excel", default="faker/Ecran (2).xlsx")
+    ap.add_argument("--gif", default="", help="GIF/APNG/dossier à jouer (défaut : GIF synthétique)")
+    ap.add_argument("--frames", type=int, default=48)
+    ap.add_argument("--size", type=int, default=160, help="taille du GIF synthétique (redimensionné en 128x128)")
+    ap.add_argument("--fps", type=float, default=30.0)
+    ap.add_argument("--seconds", type=float, default=4.0)
+    ap.add_argument("--port", type=int, default=50993)
+    args = ap.parse_args()
+
+    path = args.gif
+    if not path:
+        path = os.path.join(tempfile.mkdtemp(), "bench.gif")
+        make_gif(path, args.frames, args.size, int(1000 / args.fps))
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)  # routeur muet
+    sink.bind(("127.0.0.1", args.port))
+
+    # 1) coût par frame du producteur (ce que l'ancien chemin aurait dû faire dans le tick)
+    grid = load_grid_from_excel(args.excel)
+    lut = brightness_gamma_lut(0.7, 2.0)
+    enc = UpdateEncoder(budget=MTU_BUDGET)
+    t_dec = t_map = t_enc = 0.0
+    n = 0
+    t0 = time.perf_counter()
+    for img, _ in iter_source_frames(path, 1.0 / args.fps):
+        t1 = time.perf_counter()
+        img = fit_image(img, 128, "cover", False)
+        t2 = time.perf_counter()
+        ents = image_to_entities(img, grid, lut)
+        t3 = time.perf_counter()
+        enc.encode(ents)
+        t4 = time.perf_counter()
+        t_dec += t2 - t0; t_map += t3 - t2; t_enc += t4 - t3
+        n += 1
+        t0 = time.perf_counter()
+    enc.close()
+    per = (t_dec + t_map + t_enc) / n * 1000.0
+    print(f"⏱️ {os.path.basename(path)} : {n} frames, budget {MTU_BUDGET} o")
+    print(f"  producteur : décodage+resize {t_dec / n * 1000:.1f} ms, mapping+gamma {t_map / n * 1000:.1f} ms, "
+          f"encodage {t_enc / n * 1000:.1f} ms = {per:.1f} ms/frame ({1000.0 / per:.0f} frames/s, tick {1000.0 / args.fps:.1f} ms)")
+
+    # 2) lecture réelle : 1re passe (décodage en thread, cache miss) puis relecture (cache hit)
+    for label in ("1re lecture (décodage)", "relecture (cache)"):
+        print(f"  --- {label}")
+        c0 = time.process_time()
+        play_sequence(path, args.excel, "127.0.0.1", args.port, args.seconds, args.fps,
+                      brightness=0.7, gamma=2.0)
+        cpu = (time.process_time() - c0) / (args.seconds * args.fps) * 1000.0
+        print(f"  => {cpu:.2f} ms CPU/tick (tous threads)")
+    sink.close()
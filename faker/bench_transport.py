@@ -0,0 +1,94 @@
+# faker/bench_transport.py
+import argparse, multiprocessing as mp, os, socket, sys, time
+import numpy as np
+
+HERE = os.path.dirname(__file__)
+COMMON_DIR = os.path.abspath(os.path.join(HERE, "..", "common"))
+if COMMON_DIR not in sys.path:
+    sys.path.insert(0, COMMON_DIR)
+from frame_clock import FrameScheduler
+from ehub_proto import ENTITY_DTYPE, UdpTransport, UpdateEncoder
+
+def legacy_send_udp(packet: bytes, host="127.0.0.1", port=50000):
+    """Ancien send_udp des players : une socket neuve par paquet."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.sendto(packet, (host, port))
+
+def slow_receiver(port: int, rcvbuf: int, work_ms: float, ready, stop, received):
+    """
+    Routeur simulé (processus à part) : SO_RCVBUF donné, `work_ms` de décodage par
+    paquet pendant lesquels la socket n'est pas lue.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    if rcvbuf:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    sock.bind(("127.0.0.1", port))
+    sock.settimeout(0.2)
+    ready.set()
+    while not stop.is_set():
+        try:
+            sock.recv(65535)
+        except socket.timeout:
+            continue
+        received.value += 1
+        time.sleep(work_ms / 1000.0)
+
+def frame_packets(chunk: int):
+    """Frame plein mur peu compressible (~16 Ko par chunk de 3000 entités)."""
+    rng = np.random.default_rng(0)
+    ents = np.zeros(128 * 128, dtype=ENTITY_DTYPE)
+    ents["id"] = np.arange(len(ents))
+    for c in ("r", "g", "b"):
+        ents[c] = rng.integers(0, 256, len(ents))
+    return UpdateEncoder(chunk).encode(ents)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Transport UDP des fakers : coût d'envoi et pertes côté routeur (rafale vs étalé)")
+    ap.add_argument("--port", type=int, default=50990)
+    ap.add_argument("--chunk", type=int, default=3000)
+    ap.add_argument("--fps", type=float, default=20.0)
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--work-ms", type=float, default=4.0, help="décodage simulé par paquet côté routeur")
+    ap.add_argument("--rcvbuf", type=int, default=32 << 10,
+                    help="SO_RCVBUF du routeur simulé, plus petit qu'une frame (0 = défaut système)")
+    ap.add_argument("--sends", type=int, default=20000)
+    args = ap.parse_args()
+
+    pkts = frame_packets(args.chunk)
+    print(f"⏱️ frame = {len(pkts)} paquets, {sum(map(len, pkts)) // 1024} Ko")
+
+    # 1) coût d'envoi par paquet (personne n'écoute : pas de file qui déborde)
+    small = pkts[-1][:512]
+    t0 = time.perf_counter()
+    for _ in range(args.sends):
+        legacy_send_udp(small, "127.0.0.1", args.port + 1)
+    t_old = (time.perf_counter() - t0) / args.sends * 1e6
+    tr = UdpTransport("127.0.0.1", args.port + 1)
+    t0 = time.perf_counter()
+    for _ in range(args.sends):
+        tr.send(small)
+    t_new = (time.perf_counter() - t0) / args.sends * 1e6
+    print(f"  envoi : socket par paquet {t_old:.1f} µs/paquet, socket connectée {t_new:.1f} µs/paquet "
+          f"(x{t_old / t_new:.1f}) ; {tr.errors} erreurs comptées (ICMP port fermé)")
+    tr.close()
+
+    # 2) pertes côté routeur lent, rafale vs paquets étalés sur la frame
+    print(f"  routeur simulé : SO_RCVBUF={args.rcvbuf // 1024} Ko demandés, {args.work_ms:g} ms de décodage/paquet")
+    for label, pace in (("rafale (ancien)", 0.0), ("étalé 50%", 0.5), ("étalé 90%", 0.9)):
+        ready, stop, received = mp.Event(), mp.Event(), mp.Value("i", 0)
+        rx = mp.Process(target=slow_receiver, args=(args.port, args.rcvbuf, args.work_ms, ready, stop, received))
+        rx.start(); ready.wait()
+        tr = UdpTransport("127.0.0.1", args.port, pace)
+        clock = FrameScheduler(args.fps)
+        frames = 0
+        clock.start()
+        while clock.elapsed < args.seconds:
+            tr.send_frame(pkts, clock.delay())
+            frames += 1
+            clock.wait()
+        time.sleep(0.5)  # laisse vider la file
+        stop.set(); rx.join()
+        sent = frames * len(pkts)
+        print(f"  {label:<16} {received.value}/{sent} paquets reçus ({100.0 * received.value / sent:5.1f}%), "
+              f"{tr.rate() / 1024:.0f} Ko/s")
+        tr.close()
@@ -1,8 +1,21 @@
 # faker/ehub_proto.py
-import struct, gzip, socket
+import struct, gzip, socket, time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 
 MAGIC = b"eHuB"
 
+# entité UPDATE sur le fil : <HBBBB (id u16, R, G, B, W), 6 octets, sans padding
+ENTITY_DTYPE = np.dtype([("id", "<u2"), ("r", "u1"), ("g", "u1"), ("b", "u1"), ("w", "u1")])
+GZIP_LEVEL = 9  # niveau par défaut de gzip.compress : paquets identiques aux anciens pack_update
+HEADER_LEN = 10      # MAGIC + type + universe + count u16 + comp_len u16
+_GZIP_OVERHEAD = 18  # entête (10) + CRC32/taille (8) de gzip.compress
+MTU_BUDGET = 1472    # charge UDP max sans fragmentation IP sur Ethernet (MTU 1500 - 20 IP - 8 UDP)
+PACE_MAX_SPREAD = 0.02  # s max d'étalement d'une frame : bien sous le frame_timeout du routeur (0.05 s)
+
 def pack_config(universe: int, ranges):
     payload = bytearray()
     for s_idx, s_eid, e_idx, e_eid in ranges:
@@ -17,6 +30,250 @@ def pack_config(universe: int, ranges):
     header += struct.pack("<H", len(comp))
     return bytes(header) + comp
 
-def send_udp(packet: bytes, host="127.0.0.1", port=50000):
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.sendto(packet, (host, port))
+def as_entities(entities) -> np.ndarray:
+    """
+    Tableau structuré ENTITY_DTYPE à partir de :
+      - un tableau ENTITY_DTYPE (retourné tel quel, sans copie)
+      - un tableau (N, 5) d'entiers ou une liste de tuples (entity_id, r, g, b, w)
+    ValueError si un id sort de 0..65535 ou une couleur de 0..255 (pas de troncature silencieuse).
+    """
+    if isinstance(entities, np.ndarray):
+        if entities.dtype == ENTITY_DTYPE:
+            return entities
+        arr = entities.reshape(-1, 5)
+        out = np.empty(len(arr), dtype=ENTITY_DTYPE)
+        for k, name in enumerate(ENTITY_DTYPE.names):
+            col = arr[:, k]
+            hi = np.iinfo(ENTITY_DTYPE[name]).max
+            if col.size and (col.min() < 0 or col.max() > hi):
+                raise ValueError(f"entités: '{name}' hors de 0..{hi}")
+            out[name] = col
+        return out
+    # liste : UN struct.pack pour toute la liste (format "<HBBBB" x N mis en cache), puis vue NumPy
+    try:
+        packed = _entities_struct(len(entities)).pack(*chain.from_iterable(entities))
+    except struct.error as e:
+        raise ValueError(f"entités: {e}") from e
+    return np.frombuffer(packed, dtype=ENTITY_DTYPE)
+
+@lru_cache(maxsize=32)
+def _entities_struct(n: int) -> struct.Struct:
+    return struct.Struct("<" + "HBBBB" * n)
+
+def _header(universe: int, count: int, comp_len: int) -> bytes:
+    return MAGIC + bytes([2, universe & 0xFF]) + struct.pack("<HH", count, comp_len)
+
+def pack_update(universe: int, entities, level: int = GZIP_LEVEL) -> bytes:
+    """
+    entities = tableau ENTITY_DTYPE, tableau (N, 5) ou liste de tuples (entity_id, r, g, b, w), 0..255.
+    Charge utile = un seul tobytes() du tableau structuré (plus de struct.pack par entité).
+    """
+    ents = as_entities(entities)
+    comp = gzip.compress(ents.tobytes(), compresslevel=level)
+    return _header(universe, len(ents), len(comp)) + comp
+
+class UpdateEncoder:
+    """
+    Encodeur de frames complètes : découpe en paquets UPDATE (universe eHuB = index
+    du paquet 0..k-1, comme les players) et compresse les paquets en parallèle sur
+    `workers` threads (zlib relâche le GIL ; 0 = inline).
+      - budget = 0 : paquets de `chunk_size` entités (taille sur le fil selon la compression)
+      - budget > 0 : paquets d'au plus `budget` octets (1472 = MTU Ethernet sans
+        fragmentation IP) ; nb de paquets déduit du taux de compression de la frame
+        précédente, entités réparties également. Un paquet hors budget → la frame
+        est redécoupée plus fin. Le nb de paquets ne fait que croître pendant un flux
+        (jamais de baisse) : le FrameAssembler du routeur apprend le nb de chunks/frame
+        et valide chaque frame à son dernier chunk.
+    buffer(n) donne un tableau ENTITY_DTYPE préalloué à remplir en place
+    (ids posés une fois, seules les couleurs changent d'une frame à l'autre).
+    """
+    MAX_PACKETS = 256  # l'index de paquet tient dans l'octet universe
+
+    def __init__(self, chunk_size: int = 3000, level: int = GZIP_LEVEL, workers: int = 0, budget: int = 0):
+        self.chunk_size = max(1, int(chunk_size))
+        self.level = int(level)
+        self.budget = max(0, int(budget))
+        self.pool: Optional[ThreadPoolExecutor] = (
+            ThreadPoolExecutor(max_workers=int(workers), thread_name_prefix="ehub-gzip") if workers > 0 else None
+        )
+        self._buf = np.zeros(0, dtype=ENTITY_DTYPE)
+        self._ratio = 0.5   # octets gzip (hors entête/pied gzip) / octets bruts, pire paquet de la frame précédente
+        self._k = 0         # nb de paquets des frames du flux (ne fait que croître)
+        # stats (summary)
+        self.frames = 0
+        self.packets = 0
+        self.oversize = 0   # paquets > budget (ou > MTU_BUDGET sans budget) : fragmentés en IP
+        self.resplits = 0   # frames redécoupées (compression moins bonne que prévu)
+
+    def buffer(self, n: int) -> np.ndarray:
+        if len(self._buf) < n:
+            self._buf = np.zeros(n, dtype=ENTITY_DTYPE)
+        return self._buf[:n]
+
+    def _compress(self, payload: bytes) -> bytes:
+        return gzip.compress(payload, compresslevel=self.level)
+
+    def _pack(self, parts: List[np.ndarray]) -> List[bytes]:
+        payloads = [p.tobytes() for p in parts]
+        if self.pool is not None and len(payloads) > 1:
+            comps = list(self.pool.map(self._compress, payloads))
+        else:
+            comps = [self._compress(p) for p in payloads]
+        return [_header(u, len(p), len(c)) + c for u, (p, c) in enumerate(zip(parts, comps))]
+
+    def _split(self, ents: np.ndarray, k: int) -> List[np.ndarray]:
+        bounds = np.linspace(0, len(ents), k + 1).astype(np.int64)
+        return [ents[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def _estimate(self, n: int) -> int:
+        """Nb de paquets pour n entités d'après le taux de compression de la frame précédente (marge 10%)."""
+        room = 0.9 * (self.budget - HEADER_LEN - _GZIP_OVERHEAD)
+        per = max(1, int(room / (ENTITY_DTYPE.itemsize * max(self._ratio, 1e-3))))
+        return -(-n // per)
+
+    def encode(self, entities) -> List[bytes]:
+        """Paquets UPDATE de la frame, dans l'ordre (universe 0, 1, ...)."""
+        ents = as_entities(entities)
+        if not self.budget:
+            pkts = self._pack([ents[i:i + self.chunk_size] for i in range(0, len(ents), self.chunk_size)])
+            return self._account(pkts, MTU_BUDGET)
+
+        n_max = max(1, min(self.MAX_PACKETS, len(ents)))
+        # jamais moins de paquets que les frames précédentes : une frame plus courte que
+        # celles apprises par le routeur attendrait le chunk 0 suivant pour être validée
+        k = max(1, min(n_max, max(self._k, self._estimate(len(ents)))))
+        while True:
+            parts = self._split(ents, k)
+            pkts = self._pack(parts)
+            worst = max(map(len, pkts))
+            if worst <= self.budget or k >= n_max:
+                break
+            self.resplits += 1
+            k = min(n_max, max(k + 1, -(-k * worst // self.budget)))
+        self._ratio = max((len(p) - HEADER_LEN - _GZIP_OVERHEAD) / max(1, part.nbytes) for p, part in zip(pkts, parts))
+        self._k = k
+        return self._account(pkts, self.budget)
+
+    def encode_still(self, entities) -> List[bytes]:
+        """
+        Paquets d'une frame fixe, à mettre en cache et renvoyer tels quels : avec un
+        budget, 2e passe découpée d'après le taux mesuré à la 1re, le découpage le plus
+        court des deux est gardé (seul compté dans les stats). Seulement en début de flux :
+        ensuite, le nb de paquets déjà envoyé par frame est un minimum.
+        """
+        first = self._k == 0
+        pkts = self.encode(entities)
+        if self.budget and first:
+            self._k = 0
+            again = self.encode(entities)
+            keep, drop = (again, pkts) if len(again) < len(pkts) else (pkts, again)
+            self.frames -= 1
+            self.packets -= len(drop)
+            self.oversize -= sum(len(p) > self.budget for p in drop)
+            self._k = len(keep)
+            pkts = keep
+        return pkts
+
+    def _account(self, pkts: List[bytes], limit: int) -> List[bytes]:
+        self.frames += 1
+        self.packets += len(pkts)
+        self.oversize += sum(len(p) > limit for p in pkts)
+        return pkts
+
+    def summary(self) -> str:
+        limit = self.budget or MTU_BUDGET
+        mode = f"budget {self.budget} o" if self.budget else f"{self.chunk_size} entités/paquet"
+        line = (f"📦 {self.packets / max(1, self.frames):.1f} paquets/frame ({mode}), "
+                f"{100.0 * self.oversize / max(1, self.packets):.0f}% > {limit} o (fragmentés)")
+        if self.resplits:
+            line += f", {self.resplits} frames redécoupées"
+        return line
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+class UdpTransport:
+    """
+    Envoi eHuB vers UNE destination par une socket UDP connectée, ouverte une fois
+    (au lieu d'une socket par paquet, jamais fermée).
+      - send_frame(): les paquets d'une frame sont espacés régulièrement sur
+        `pace` x le temps restant avant le prochain tick (0 = rafale) : 6 chunks de
+        16 Ko d'affilée remplissent le buffer de réception du routeur ; un rendu
+        lent réduit l'étalement au lieu de mettre la frame suivante en retard.
+        Plafonné à `max_spread` s : à bas FPS (12 fps → 41 ms), une frame étalée
+        dépasserait le timeout d'assemblage du routeur et arriverait coupée
+      - compteurs : paquets, octets (→ Ko/s), erreurs d'envoi (ex: ECONNREFUSED
+        remonté par ICMP quand le routeur n'écoute pas) sans interrompre le player
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 50000, pace: float = 0.5,
+                 max_spread: float = PACE_MAX_SPREAD):
+        self.addr = (host, int(port))
+        self.pace = max(0.0, min(1.0, float(pace)))
+        self.max_spread = max(0.0, float(max_spread))
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.connect(self.addr)  # route résolue une fois ; send() sans adresse
+        self.packets = 0
+        self.bytes = 0
+        self.errors = 0
+        self.last_error: Optional[OSError] = None
+        self._t0 = time.monotonic()
+
+    def send(self, packet: bytes) -> bool:
+        try:
+            self.sock.send(packet)
+        except OSError as e:
+            self.errors += 1
+            self.last_error = e
+            return False
+        self.packets += 1
+        self.bytes += len(packet)
+        return True
+
+    def send_frame(self, packets: List[bytes], window: float = 0.0):
+        """
+        Envoie les paquets d'une frame, le k-ième à t0 + k x (étalement / nb paquets),
+        étalement = min(pace x window, max_spread) ;
+        window = secondes disponibles (FrameScheduler.delay() : jusqu'au prochain tick).
+        """
+        spread = min(self.pace * window, self.max_spread)
+        gap = spread / len(packets) if packets and spread > 0 else 0.0
+        t0 = time.monotonic()
+        for k, pkt in enumerate(packets):
+            if k and gap:
+                delay = t0 + k * gap - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            self.send(pkt)
+
+    def rate(self) -> float:
+        """Octets/s envoyés depuis l'ouverture."""
+        return self.bytes / max(1e-9, time.monotonic() - self._t0)
+
+    def summary(self) -> str:
+        line = (f"📤 {self.packets} paquets vers {self.addr[0]}:{self.addr[1]}, "
+                f"{self.rate() / 1024:.0f} Ko/s, pacing {self.pace:.0%} du temps restant par frame "
+                f"(max {self.max_spread * 1000:.0f} ms)")
+        if self.errors:
+            line += f", {self.errors} erreurs d'envoi (dernière : {self.last_error})"
+        return line
+
+    def close(self):
+        self.sock.close()
+
+_TRANSPORTS: Dict[Tuple[str, int], UdpTransport] = {}
+
+def get_transport(host: str = "127.0.0.1", port: int = 50000) -> UdpTransport:
+    """Transport partagé par destination (une seule socket par (host, port) dans le processus)."""
+    key = (host, int(port))
+    if key not in _TRANSPORTS:
+        _TRANSPORTS[key] = UdpTransport(host, port)
+    return _TRANSPORTS[key]
+
+def send_udp(packet: bytes, host="127.0.0.1", port=50000) -> bool:
+    """Envoi d'un paquet ; un échec est compté par le transport et signalé (sans interrompre l'appelant)."""
+    tr = get_transport(host, port)
+    if tr.send(packet):
+        return True
+    print(f"⚠️ envoi UDP vers {host}:{port} impossible : {tr.last_error} ({tr.errors} erreur(s))")
+    return False
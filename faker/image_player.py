@@ -1,32 +1,18 @@
 # faker/image_player.py
-import struct, gzip, socket, time, math, os
-from typing import List, Tuple
-import pandas as pd
-from PIL import Image
-
-MAGIC = b"eHuB"
-
-# ---------------- eHuB helpers ----------------
-def pack_update(universe: int, entities: List[Tuple[int,int,int,int,int]]) -> bytes:
-    payload = bytearray()
-    for eid, r, g, b, w in entities:
-        payload += struct.pack("<HBBBB", eid, r, g, b, w)
-    comp = gzip.compress(bytes(payload))
-    header = bytearray()
-    header += MAGIC
-    header += bytes([2])                       # UPDATE
-    header += bytes([universe & 0xFF])         # eHuB "universe" (index du paquet, pas ArtNet)
-    header += struct.pack("<H", len(entities))
-    header += struct.pack("<H", len(comp))
-    return bytes(header) + comp
-
-def send_udp(packet: bytes, host="127.0.0.1", port=50000):
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.sendto(packet, (host, port))
-
-def chunked(seq, n):
-    for i in range(0, len(seq), n):
-        yield seq[i:i+n]
+import hashlib, math, os, sys, queue, threading
+from collections import OrderedDict
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
+from PIL import Image, ImageSequence
+
+# cadenceur partagé (common/frame_clock.py) + mapping Excel compilé (common/mapping_cache.py)
+HERE = os.path.dirname(__file__)
+COMMON_DIR = os.path.abspath(os.path.join(HERE, "..", "common"))
+if COMMON_DIR not in sys.path:
+    sys.path.insert(0, COMMON_DIR)
+from frame_clock import FrameScheduler
+from mapping_cache import file_digest, load_mapping
+from ehub_proto import ENTITY_DTYPE, UpdateEncoder, UdpTransport, GZIP_LEVEL, MTU_BUDGET
 
 def clamp8(x: float) -> int:
     return max(0, min(255, int(round(x))))
@@ -38,66 +24,19 @@ def load_columns_from_excel(xlsx_path: str) -> List[List[int]]:
     Hypothèse LAPS: chaque bande = 2 univers (U, U+1) => 2 colonnes visibles de 128 LED.
     On assemble par IP puis par univers croissant.
     """
-    df = pd.read_excel(xlsx_path, sheet_name="eHuB")
-    df = df.rename(columns={
-        "Entity Start": "entity_start",
-        "Entity End": "entity_end",
-        "ArtNet IP": "ip",
-        "ArtNet Universe": "universe",
-        "Name": "name",
-    })
-    df = df[(df["universe"] >= 0) & (df["universe"] <= 127)].copy()
-    df = df.sort_values(["ip", "universe"]).reset_index(drop=True)
-
-    columns: List[List[int]] = []
-    for ip, g in df.groupby("ip"):
-        g = g.sort_values("universe")
-        uv = list(g["universe"].astype(int))
-        for u in uv:
-            if u % 2 != 0:
-                continue
-            rowA = g[g["universe"] == u]
-            if rowA.empty: 
-                continue
-            rowA = rowA.iloc[0]
-            rowB = g[g["universe"] == (u+1)]
-            rowB = (None if rowB.empty else rowB.iloc[0])
-
-            a0, a1 = int(rowA["entity_start"]), int(rowA["entity_end"])
-            listA = list(range(min(a0, a1), max(a0, a1) + 1))
-
-            listB: List[int] = []
-            if rowB is not None:
-                b0, b1 = int(rowB["entity_start"]), int(rowB["entity_end"])
-                listB = list(range(min(b0, b1), max(b0, b1) + 1))
-
-            band = listA + listB
-            if len(band) < 200:
-                continue
-
-            up_visible   = band[1:1+128]
-            down_visible = band[130:130+128]
-
-            col0 = list(reversed(up_visible))
-            col1 = down_visible
-
-            if len(col0) < 128: col0 = (col0 + [col0[-1]]*128)[:128]
-            if len(col1) < 128: col1 = (col1 + [col1[-1]]*128)[:128]
-
-            columns.append(col0)
-            columns.append(col1)
-
-    if len(columns) >= 128:
-        return columns[:128]
-    while len(columns) < 128 and len(columns) > 0:
-        columns.append(columns[-1])
-    if not columns:
-        columns = [[0]*128 for _ in range(128)]
-    return columns
+    # grille précompilée (bandes < 200 entités ignorées, colonnes manquantes complétées)
+    return load_mapping(xlsx_path).columns(128)
+
+def load_grid_from_excel(xlsx_path: str, size: int = 128) -> np.ndarray:
+    """Même table que load_columns_from_excel, en tableau (size x size) : grid[x, y] → entity_id."""
+    return np.array(load_mapping(xlsx_path).columns(size), dtype=np.uint16)
 
 # ---------------- image → LEDs ----------------
 def load_and_resize_image(path: str, size: int = 128, fit_mode: str = "cover", flip_y: bool = False) -> Image.Image:
-    img = Image.open(path).convert("RGBA")
+    return fit_image(Image.open(path).convert("RGBA"), size, fit_mode, flip_y)
+
+def fit_image(img: Image.Image, size: int = 128, fit_mode: str = "cover", flip_y: bool = False) -> Image.Image:
+    """Image RGBA → size x size (cover : étirée ; fit : centrée sur fond transparent)."""
     if img.width != size or img.height != size:
         if fit_mode == "cover":
             img = img.resize((size, size), Image.LANCZOS)
@@ -123,31 +62,377 @@ def apply_brightness_gamma(pixel: Tuple[int,int,int,int], brightness: float, gam
         b = clamp8((b/255.0)**inv*255.0)
     return r,g,b
 
+def brightness_gamma_lut(brightness: float, gamma: float) -> np.ndarray:
+    """
+    Table 256 entrées : valeur (déjà multipliée par alpha) → valeur envoyée, mêmes
+    arrondis que apply_brightness_gamma (calculée une fois par ses fonctions scalaires).
+    """
+    lut = np.empty(256, dtype=np.uint8)
+    for v in range(256):
+        c = clamp8(v*brightness)
+        if gamma != 1.0:
+            c = clamp8((c/255.0)**(1.0/gamma)*255.0)
+        lut[v] = c
+    return lut
+
+def image_to_entities(img: Image.Image, grid: np.ndarray, lut: np.ndarray) -> np.ndarray:
+    """
+    Image RGBA (taille de grid) → tableau ENTITY_DTYPE dans l'ordre des players (x puis y),
+    sans boucle Python : alpha prémultiplié en entier, brightness/gamma via `lut`.
+    """
+    px = np.asarray(img.convert("RGBA"), dtype=np.uint16).transpose(1, 0, 2)  # [y, x] → [x, y] comme px[x, y]
+    rgb = px[..., :3] * px[..., 3:4] // 255
+    ents = np.zeros(grid.size, dtype=ENTITY_DTYPE)
+    ents["id"] = grid.ravel()
+    ents["r"], ents["g"], ents["b"] = (lut[rgb[..., c].ravel()] for c in range(3))
+    return ents
+
 def stream_image_to_ehub(img_path: str, excel: str, host: str, port: int,
                          seconds: float, fps: float,
                          brightness: float = 0.8, gamma: float = 2.2,
                          fit_mode: str = "cover", flip_y: bool = False,
-                         chunk_size: int = 2048):
-    columns = load_columns_from_excel(excel)
+                         chunk_size: int = 2048, level: int = GZIP_LEVEL, workers: int = 0,
+                         pace: float = 0.5, budget: int = MTU_BUDGET):
+    grid = load_grid_from_excel(excel)
     img = load_and_resize_image(img_path, 128, fit_mode, flip_y)
-    px = img.load()
-    dt = 1.0/max(1e-3,fps)
-    t_end = time.time()+seconds
-
-    print(f"🖼️ projecting {os.path.basename(img_path)} for {seconds}s @ {fps} fps")
-
-    while time.time()<t_end:
-        ents: List[Tuple[int,int,int,int,int]] = []
-        for x in range(128):
-            col = columns[x]
-            for y in range(128):
-                eid = col[y]
-                r,g,b = apply_brightness_gamma(px[x,y], brightness, gamma)
-                ents.append((eid,r,g,b,0))
-        # découpage
-        u=0
-        for chunk in chunked(ents,chunk_size):
-            pkt=pack_update(universe=u,entities=chunk)
-            send_udp(pkt,host,port)
-            u+=1
-        time.sleep(dt)
+    encoder = UpdateEncoder(chunk_size, level, workers, budget)
+    transport = UdpTransport(host, port, pace)
+
+    # image fixe : conversion, découpage et compression faits UNE fois, paquets renvoyés tels quels
+    ents = image_to_entities(img, grid, brightness_gamma_lut(brightness, gamma))
+    packets = encoder.encode_still(ents)
+    clock = FrameScheduler(fps)
+
+    print(f"🖼️ projecting {os.path.basename(img_path)} for {seconds}s @ {fps} fps ({len(packets)} paquets/frame)")
+
+    clock.start()
+    while clock.elapsed<seconds:
+        # envoi étalé jusqu'au prochain tick (universe eHuB = index du paquet)
+        transport.send_frame(packets, clock.delay())
+        clock.wait()
+    encoder.close()
+    transport.close()
+    print(clock.summary())
+    print(encoder.summary())
+    print(transport.summary())
+
+# ---------------- animations (GIF / APNG / dossier d'images) ----------------
+SEQ_EXTS = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp")
+EncodedFrame = Tuple[List[bytes], float]  # (paquets eHuB de la frame, durée d'affichage en s)
+
+def is_sequence(path: str) -> bool:
+    """Dossier d'images ou fichier animé (GIF/APNG/WebP multi-frames) ?"""
+    if os.path.isdir(path):
+        return True
+    with Image.open(path) as im:
+        return bool(getattr(im, "is_animated", False))
+
+def iter_source_frames(path: str, default_duration: float) -> Iterator[Tuple[Image.Image, float]]:
+    """
+    Frames RGBA et leur durée : durée propre à chaque frame du GIF/APNG (info["duration"], ms),
+    `default_duration` pour les frames sans durée et pour un dossier (fichiers triés par nom).
+    """
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.lower().endswith(SEQ_EXTS):
+                with Image.open(os.path.join(path, name)) as im:
+                    yield im.convert("RGBA"), default_duration
+        return
+    with Image.open(path) as im:
+        for frame in ImageSequence.Iterator(im):
+            ms = frame.info.get("duration") or 0
+            yield frame.convert("RGBA"), (ms / 1000.0 if ms > 0 else default_duration)
+
+def source_signature(path: str) -> tuple:
+    """
+    Version du contenu source pour la clé de cache : (mtime, taille) du fichier, ou de CHAQUE
+    image d'un dossier (une frame réécrite en place ne change pas le mtime du dossier).
+    """
+    if os.path.isdir(path):
+        sig = []
+        for name in sorted(os.listdir(path)):
+            if name.lower().endswith(SEQ_EXTS):
+                st = os.stat(os.path.join(path, name))
+                sig.append((name, st.st_mtime_ns, st.st_size))
+        return tuple(sig)
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+LOOP_CACHE_VERSION = 1         # à incrémenter si le format des artefacts change
+LOOP_CACHE_DIR = ".loop_cache" # à côté de l'animation source
+LOOP_CACHE_DISK_MAX = 256 << 20  # octets d'artefacts par dossier ; au-delà, les moins récemment lus sont supprimés
+
+def loop_cache_path(key: tuple) -> str:
+    """
+    Artefact disque d'une boucle encodée : `<dossier source>/.loop_cache/<nom>.v<N>.<sha256>.npz`,
+    empreinte de la clé complète (source + signature, chemin + empreinte du mapping, réglages).
+    """
+    src = os.path.normpath(key[0])
+    digest = hashlib.sha256(repr(key).encode()).hexdigest()
+    stem = os.path.splitext(os.path.basename(src))[0]
+    return os.path.join(os.path.dirname(src), LOOP_CACHE_DIR, f"{stem}.v{LOOP_CACHE_VERSION}.{digest[:16]}.npz")
+
+def save_loop(path: str, frames: List[EncodedFrame]):
+    """Écriture atomique (tmp + rename) : paquets bout à bout + tailles + nb de paquets et durée par frame."""
+    pkts = [p for frame, _ in frames for p in frame]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, version=np.int64(LOOP_CACHE_VERSION),
+                 data=np.frombuffer(b"".join(pkts), dtype=np.uint8),
+                 lens=np.array([len(p) for p in pkts], dtype=np.int64),
+                 counts=np.array([len(frame) for frame, _ in frames], dtype=np.int64),
+                 durations=np.array([d for _, d in frames], dtype=np.float64))
+    os.replace(tmp, path)
+    prune_loops(os.path.dirname(path), LOOP_CACHE_DISK_MAX)
+
+def prune_loops(folder: str, max_bytes: int):
+    """Supprime les artefacts les moins récemment lus/écrits (mtime) au-delà de `max_bytes`."""
+    files = []
+    for entry in os.scandir(folder):
+        if entry.name.endswith(".npz"):
+            try:
+                st = entry.stat()
+            except OSError:
+                continue  # supprimé entre-temps par un autre lecteur
+            files.append((st.st_mtime_ns, st.st_size, entry.path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files)[:-1]:  # jamais le plus récent (celui qu'on vient d'écrire)
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+def load_loop(path: str) -> Optional[List[EncodedFrame]]:
+    """Boucle relue depuis l'artefact, None si absent ou illisible."""
+    if not os.path.isfile(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as z:
+            if int(z["version"]) != LOOP_CACHE_VERSION:
+                return None
+            data, lens, counts, durations = z["data"], z["lens"], z["counts"], z["durations"]
+    except (OSError, ValueError, KeyError):
+        return None  # artefact illisible → boucle redécodée (et réécrite)
+    try:
+        os.utime(path)  # LRU disque (prune_loops)
+    except OSError:
+        pass
+    ends = np.cumsum(lens).tolist()
+    pkts = [data[e - n:e].tobytes() for e, n in zip(ends, lens.tolist())]
+    firsts = np.concatenate(([0], np.cumsum(counts))).tolist()
+    return [(pkts[a:b], d) for a, b, d in zip(firsts[:-1], firsts[1:], durations.tolist())]
+
+class LoopCache:
+    """
+    LRU des boucles déjà encodées (clé = fichier + réglages de rendu/encodage), bornée
+    en octets de paquets : rejouer une animation (boucle suivante, playlist) ne décode rien.
+    Chaque boucle gardée est aussi écrite sur disque (loop_cache_path, comme les artefacts
+    du mapping) : un nouveau processus (web UI : un lecteur par lecture) la relit sans décoder.
+    Dossier non inscriptible → cache en mémoire seulement.
+    """
+    def __init__(self, max_bytes: int = 64 << 20, disk: bool = True):
+        self.max_bytes = int(max_bytes)
+        self.disk = disk
+        self._loops: "OrderedDict[tuple, List[EncodedFrame]]" = OrderedDict()
+        self._sizes = {}
+        self.bytes = 0
+        self.hits = 0
+        self.disk_hits = 0  # hits relus depuis le disque (compris dans hits)
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[List[EncodedFrame]]:
+        frames = self._loops.get(key)
+        if frames is None and self.disk:
+            frames = load_loop(loop_cache_path(key))
+            if frames is not None:
+                self.disk_hits += 1
+                self._keep(key, frames)
+        if frames is None:
+            self.misses += 1
+            return None
+        self._loops.move_to_end(key)
+        self.hits += 1
+        return frames
+
+    def put(self, key: tuple, frames: List[EncodedFrame]):
+        if not self._keep(key, frames) or not self.disk:
+            return
+        path = loop_cache_path(key)
+        try:
+            save_loop(path, frames)
+        except OSError as e:
+            print(f"⚠️ cache boucle non écrit ({e}), boucle gardée en mémoire")
+
+    def _keep(self, key: tuple, frames: List[EncodedFrame]) -> bool:
+        size = sum(len(p) for pkts, _ in frames for p in pkts)
+        if size > self.max_bytes:
+            return False  # boucle plus grosse que tout le cache : rejouée en streaming
+        if key in self._loops:
+            self.bytes -= self._sizes.pop(key)
+            del self._loops[key]
+        self._loops[key] = frames
+        self._sizes[key] = size
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            old, _ = self._loops.popitem(last=False)
+            self.bytes -= self._sizes.pop(old)
+        return True
+
+LOOP_CACHE = LoopCache()
+
+class SequenceDecoder(threading.Thread):
+    """
+    Producteur : décode les frames, les met à la taille du mur, applique alpha/brightness/gamma
+    (LUT), les range dans l'ordre des entités et les encode en paquets eHuB, d'avance, dans une
+    file bornée (`prefetch` frames). None dans la file = fin de la boucle ; `frames` garde la
+    boucle complète pour le cache, tant qu'elle tient dans `max_bytes` (au-delà : None, la
+    boucle sera redécodée). `ready` : file pleine (ou décodage fini), la lecture peut partir.
+    """
+    def __init__(self, path: str, grid: np.ndarray, lut: np.ndarray, encoder: UpdateEncoder,
+                 fit_mode: str, flip_y: bool, default_duration: float, prefetch: int = 16,
+                 max_bytes: int = 64 << 20):
+        super().__init__(name="seq-decode", daemon=True)
+        self.path = path
+        self.grid = grid
+        self.lut = lut
+        self.encoder = encoder
+        self.fit_mode = fit_mode
+        self.flip_y = flip_y
+        self.default_duration = default_duration
+        self.queue: "queue.Queue[Optional[EncodedFrame]]" = queue.Queue(maxsize=max(1, int(prefetch)))
+        self.frames: Optional[List[EncodedFrame]] = []
+        self.count = 0      # frames décodées
+        self.bytes = 0      # octets de paquets gardés dans `frames`
+        self.max_bytes = int(max_bytes)
+        self.error: Optional[Exception] = None
+        self.ready = threading.Event()
+        self._stop = threading.Event()
+
+    def _put(self, item: Optional[EncodedFrame]):
+        while not self._stop.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                self.ready.set()
+
+    def run(self):
+        try:
+            size = self.grid.shape[0]
+            for img, duration in iter_source_frames(self.path, self.default_duration):
+                if self._stop.is_set():
+                    return
+                ents = image_to_entities(fit_image(img, size, self.fit_mode, self.flip_y), self.grid, self.lut)
+                item = (self.encoder.encode(ents), duration)
+                self.count += 1
+                if self.frames is not None:
+                    self.bytes += sum(map(len, item[0]))
+                    if self.bytes > self.max_bytes:
+                        self.frames = None  # séquence trop longue pour être gardée : mémoire bornée
+                    else:
+                        self.frames.append(item)
+                self._put(item)
+        except Exception as e:  # remonté au lecteur (fichier illisible, format inconnu...)
+            self.error = e
+        finally:
+            self._put(None)
+            self.ready.set()
+
+    def stop(self):
+        self._stop.set()
+
+def play_sequence(path: str, excel: str, host: str, port: int,
+                  seconds: float, fps: float,
+                  brightness: float = 0.8, gamma: float = 2.2,
+                  fit_mode: str = "cover", flip_y: bool = False,
+                  chunk_size: int = 2048, level: int = GZIP_LEVEL, workers: int = 0,
+                  pace: float = 0.5, budget: int = MTU_BUDGET,
+                  seq_fps: float = 0.0, prefetch: int = 16):
+    """
+    Joue une animation en boucle pendant `seconds` : ticks d'envoi à `fps`, chaque frame
+    source affichée pendant sa durée (échéances absolues, sans dérive ; une frame plus courte
+    qu'un tick est sautée). 1re boucle : frames prises dans la file du SequenceDecoder ;
+    boucles suivantes (et relectures du même fichier, même d'un autre processus) : paquets rejoués
+    depuis LOOP_CACHE (mémoire puis disque).
+    Séquence plus grosse que le cache : chaque boucle est redécodée (mémoire bornée).
+    seq_fps: cadence des frames sans durée (dossier d'images), 0 = fps.
+    """
+    grid = load_grid_from_excel(excel)
+    lut = brightness_gamma_lut(brightness, gamma)
+    encoder = UpdateEncoder(chunk_size, level, workers, budget)
+    transport = UdpTransport(host, port, pace)
+    # clé : source (contenu de chaque image), mapping (chemin + empreinte du contenu), réglages
+    key = (os.path.abspath(path), source_signature(path), os.path.abspath(excel), file_digest(excel),
+           brightness, gamma, fit_mode, flip_y, chunk_size, level, budget, seq_fps or fps)
+
+    def start_decoder() -> SequenceDecoder:
+        dec = SequenceDecoder(path, grid, lut, encoder, fit_mode, flip_y, 1.0 / (seq_fps or fps),
+                              prefetch, LOOP_CACHE.max_bytes)
+        dec.start()
+        return dec
+
+    loop = LOOP_CACHE.get(key)
+    decoder = None
+    n_loop = 0        # frames par boucle (connu à la fin de la 1re)
+    if loop is None:
+        decoder = start_decoder()
+        decoder.ready.wait()  # file pleine (ou animation entière décodée) avant la 1re frame
+    print(f"🎞️ playing {os.path.basename(os.path.normpath(path))} for {seconds}s @ {fps} fps "
+          f"({'cache' if decoder is None else f'décodage, prefetch {decoder.queue.maxsize}'})")
+
+    clock = FrameScheduler(fps)
+    cur: Optional[EncodedFrame] = None
+    i = -1            # index dans la boucle en cache
+    t_next = 0.0      # échéance (s depuis le départ) de la frame source suivante
+    loops = underruns = shown = 0
+    clock.start()
+    while clock.elapsed < seconds:
+        now = clock.elapsed
+        while now >= t_next:
+            if loop is not None:
+                i = (i + 1) % len(loop)
+                loops += i == 0 and cur is not None
+                item = loop[i]
+            else:
+                try:
+                    item = decoder.queue.get_nowait()
+                except queue.Empty:
+                    underruns += 1  # décodage en retard : la frame courante est renvoyée
+                    break
+                if item is None:  # fin de la boucle décodée
+                    if decoder.error is not None:
+                        raise decoder.error
+                    if not decoder.count:
+                        raise ValueError(f"aucune image dans {path}")
+                    n_loop = decoder.count
+                    if decoder.frames is None:
+                        loops += 1
+                        decoder = start_decoder()  # trop grosse pour être gardée : boucle suivante redécodée
+                        continue
+                    loop = decoder.frames
+                    LOOP_CACHE.put(key, loop)
+                    i = -1
+                    continue
+            cur = item
+            shown += 1
+            t_next += item[1]
+        if cur is not None:
+            transport.send_frame(cur[0], clock.delay())
+        clock.wait()
+
+    if decoder is not None:
+        decoder.stop()
+    encoder.close()
+    transport.close()
+    print(clock.summary())
+    n = len(loop) if loop is not None else (n_loop or decoder.count)
+    print(f"🎞️ {n} frames/boucle, {shown} frames affichées, {loops} boucle(s) complète(s), "
+          f"{underruns} retards de décodage, cache {LOOP_CACHE.bytes // 1024} Ko "
+          f"({LOOP_CACHE.hits} hits dont {LOOP_CACHE.disk_hits} disque / {LOOP_CACHE.misses} misses)")
+    if decoder is not None:  # relecture en cache : rien d'encodé
+        print(encoder.summary())
+    print(transport.summary())
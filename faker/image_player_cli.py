@@ -1,10 +1,12 @@
 # faker/image_player_cli.py
 import argparse
-from image_player import stream_image_to_ehub
+from image_player import is_sequence, play_sequence, stream_image_to_ehub
+from ehub_proto import GZIP_LEVEL, MTU_BUDGET
 
 if __name__ == "__main__":
-    ap = argparse.ArgumentParser(description="Projeter une image 128x128 sur le mur via eHuB")
-    ap.add_argument("--image", required=True, help="Chemin PNG/JPG (ex: assets/ryu.png)")
+    ap = argparse.ArgumentParser(description="Projeter une image ou une animation 128x128 sur le mur via eHuB")
+    ap.add_argument("--image", required=True, nargs="+",
+                    help="PNG/JPG fixe, GIF/APNG animé ou dossier d'images (ex: assets/ryu.png) ; plusieurs = playlist")
     ap.add_argument("--excel", default="faker/Ecran (2).xlsx")
     ap.add_argument("--host", default="127.0.0.1")
     ap.add_argument("--port", type=int, default=50000)
@@ -14,10 +16,21 @@ if __name__ == "__main__":
     ap.add_argument("--gamma", type=float, default=2.0)
     ap.add_argument("--fit", choices=["fit","cover"], default="cover")
     ap.add_argument("--flip-y", action="store_true", help="inverser verticalement si besoin")
+    ap.add_argument("--chunk", type=int, default=2048, help="entités par paquet eHuB si --mtu-budget 0")
+    ap.add_argument("--mtu-budget", type=int, default=MTU_BUDGET,
+                    help="taille max d'un paquet eHuB en octets, découpe adaptative (0 = --chunk entités fixes)")
+    ap.add_argument("--gzip-level", type=int, default=GZIP_LEVEL, choices=range(1, 10), metavar="1..9",
+                    help="niveau de compression gzip (9 = paquets identiques à l'historique, 1 = plus rapide)")
+    ap.add_argument("--gzip-workers", type=int, default=0, help="threads de compression des paquets (0 = inline)")
+    ap.add_argument("--seq-fps", type=float, default=0.0,
+                    help="cadence des frames d'un dossier d'images / GIF sans durées (0 = --fps)")
+    ap.add_argument("--prefetch", type=int, default=16, help="frames d'animation décodées d'avance")
+    ap.add_argument("--cycles", type=int, default=1, help="nombre de passages sur la playlist")
+    ap.add_argument("--pace", type=float, default=0.5,
+                    help="fraction du temps restant avant le prochain tick sur laquelle étaler les paquets (0 = rafale)")
     args = ap.parse_args()
 
-    stream_image_to_ehub(
-        img_path=args.image,
+    common = dict(
         excel=args.excel,
         host=args.host,
         port=args.port,
@@ -26,5 +39,17 @@ if __name__ == "__main__":
         brightness=args.brightness,
         gamma=args.gamma,
         fit_mode=args.fit,
-        flip_y=args.flip_y
+        flip_y=args.flip_y,
+        level=args.gzip_level,
+        workers=args.gzip_workers,
+        pace=args.pace,
+        chunk_size=args.chunk,
+        budget=args.mtu_budget
     )
+    for _ in range(max(1, args.cycles)):
+        for path in args.image:
+            if is_sequence(path):
+                # animations rejouées depuis le cache des boucles encodées à partir du 2e passage
+                play_sequence(path, seq_fps=args.seq_fps, prefetch=args.prefetch, **common)
+            else:
+                stream_image_to_ehub(img_path=path, **common)
@@ -1,25 +1,6 @@
 # faker/send_update_color.py
 import argparse
-import struct, gzip, socket
-
-MAGIC = b"eHuB"
-
-def pack_update(universe: int, entities):
-    payload = bytearray()
-    for eid, r, g, b, w in entities:
-        payload += struct.pack("<HBBBB", eid, r, g, b, w)
-    comp = gzip.compress(bytes(payload))
-    header = bytearray()
-    header += MAGIC
-    header += bytes([2])                    # type UPDATE
-    header += bytes([universe & 0xFF])      # eHuB universe (1 octet)
-    header += struct.pack("<H", len(entities))
-    header += struct.pack("<H", len(comp))
-    return bytes(header) + comp
-
-def send_udp(packet: bytes, host="127.0.0.1", port=50000):
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.sendto(packet, (host, port))
+from ehub_proto import pack_update, send_udp
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser(description="Send one UPDATE with a single entity/color")
@@ -1,44 +1,17 @@
 # faker/send_update_fill_all_5s.py
-import argparse, struct, gzip, socket, pandas as pd, time
+import argparse, time, os, sys
 
-MAGIC = b"eHuB"
-
-def pack_update(universe: int, entities):
-    payload = bytearray()
-    for eid, r, g, b, w in entities:
-        payload += struct.pack("<HBBBB", eid, r, g, b, w)
-    comp = gzip.compress(bytes(payload))
-    header = bytearray()
-    header += MAGIC
-    header += bytes([2])
-    header += bytes([universe & 0xFF])
-    header += struct.pack("<H", len(entities))
-    header += struct.pack("<H", len(comp))
-    return bytes(header) + comp
-
-def send_udp(packet: bytes, host="127.0.0.1", port=50000):
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.sendto(packet, (host, port))
+# mapping Excel compilé (common/mapping_cache.py)
+HERE = os.path.dirname(__file__)
+COMMON_DIR = os.path.abspath(os.path.join(HERE, "..", "common"))
+if COMMON_DIR not in sys.path:
+    sys.path.insert(0, COMMON_DIR)
+from mapping_cache import load_mapping
+from ehub_proto import pack_update, send_udp
 
 def load_all_entities(xlsx_path: str):
-    df = pd.read_excel(xlsx_path, sheet_name="eHuB")
-    df = df.rename(columns={
-        "Entity Start": "entity_start",
-        "Entity End": "entity_end",
-        "ArtNet IP": "ip",
-        "ArtNet Universe": "universe",
-        "Name": "name",
-    })
-    df = df[(df["universe"] >= 0) & (df["universe"] <= 127)].copy()
-    entities = []
-    for _, r in df.iterrows():
-        a, b = int(r["entity_start"]), int(r["entity_end"])
-        if a <= b:
-            rng = range(a, b+1)
-        else:
-            rng = range(b, a+1)
-        entities.extend(rng)
-    return sorted(set(entities))
+    # entités LEDs (univers 0..127), uniques et triées
+    return load_mapping(xlsx_path).led_entities()
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser(description="Send UPDATE filling ALL entities for N seconds")
@@ -1,39 +1,19 @@
 # faker/send_update_fill_band.py
-import argparse, struct, gzip, socket, pandas as pd
+import argparse, os, sys
 
-MAGIC = b"eHuB"
-
-def pack_update(universe: int, entities):
-    payload = bytearray()
-    for eid, r, g, b, w in entities:
-        payload += struct.pack("<HBBBB", eid, r, g, b, w)
-    comp = gzip.compress(bytes(payload))
-    header = bytearray()
-    header += MAGIC
-    header += bytes([2])                    # type UPDATE
-    header += bytes([universe & 0xFF])      # eHuB universe (1 byte)
-    header += struct.pack("<H", len(entities))
-    header += struct.pack("<H", len(comp))
-    return bytes(header) + comp
-
-def send_udp(packet: bytes, host="127.0.0.1", port=50000):
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.sendto(packet, (host, port))
+# mapping Excel compilé (common/mapping_cache.py)
+HERE = os.path.dirname(__file__)
+COMMON_DIR = os.path.abspath(os.path.join(HERE, "..", "common"))
+if COMMON_DIR not in sys.path:
+    sys.path.insert(0, COMMON_DIR)
+from mapping_cache import load_mapping
+from ehub_proto import pack_update, send_udp
 
 def load_band_range(xlsx_path: str, universe: int):
-    df = pd.read_excel(xlsx_path, sheet_name="eHuB")
-    df = df.rename(columns={
-        "Entity Start": "entity_start",
-        "Entity End": "entity_end",
-        "ArtNet IP": "ip",
-        "ArtNet Universe": "universe",
-        "Name": "name",
-    })
-    row = df[df["universe"] == universe].head(1)
-    if row.empty:
+    row = load_mapping(xlsx_path).row(universe)
+    if row is None:
         raise ValueError(f"Aucune ligne Excel pour l'univers {universe}")
-    r = row.iloc[0]
-    return int(r["entity_start"]), int(r["entity_end"])
+    return row[1], row[2]
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser(description="Send UPDATE filling one band from Excel")
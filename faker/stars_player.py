@@ -1,31 +1,16 @@
 # faker/stars_player.py
-import struct, gzip, socket, time, math, random, argparse, os
-from typing import List, Tuple
-import pandas as pd
-
-MAGIC = b"eHuB"
-
-# ---------------- eHuB helpers ----------------
-def pack_update(universe: int, entities: List[Tuple[int,int,int,int,int]]) -> bytes:
-    payload = bytearray()
-    for eid, r, g, b, w in entities:
-        payload += struct.pack("<HBBBB", eid, r, g, b, w)
-    comp = gzip.compress(bytes(payload))
-    header = bytearray()
-    header += MAGIC
-    header += bytes([2])                       # UPDATE
-    header += bytes([universe & 0xFF])         # eHuB "universe" (index du paquet, pas ArtNet)
-    header += struct.pack("<H", len(entities))
-    header += struct.pack("<H", len(comp))
-    return bytes(header) + comp
-
-def send_udp(packet: bytes, host="127.0.0.1", port=50000):
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.sendto(packet, (host, port))
-
-def chunked(seq, n):
-    for i in range(0, len(seq), n):
-        yield seq[i:i+n]
+import math, random, argparse, os, sys
+from typing import List, Optional, Tuple
+import numpy as np
+
+# cadenceur partagé (common/frame_clock.py) + mapping Excel compilé (common/mapping_cache.py)
+HERE = os.path.dirname(__file__)
+COMMON_DIR = os.path.abspath(os.path.join(HERE, "..", "common"))
+if COMMON_DIR not in sys.path:
+    sys.path.insert(0, COMMON_DIR)
+from frame_clock import FrameScheduler
+from mapping_cache import load_mapping
+from ehub_proto import ENTITY_DTYPE, UpdateEncoder, UdpTransport, GZIP_LEVEL, MTU_BUDGET
 
 # ---------------- mapping 128x128 -> entity_id ----------------
 def load_columns_from_excel(xlsx_path: str) -> List[List[int]]:
@@ -36,64 +21,8 @@ def load_columns_from_excel(xlsx_path: str) -> List[List[int]]:
       - up_visible   : band[1:1+128]   (montée visibles)  -> inversée (y=0 en haut)
       - down_visible : band[130:130+128] (descente visibles) -> telle quelle
     """
-    df = pd.read_excel(xlsx_path, sheet_name="eHuB")
-    df = df.rename(columns={
-        "Entity Start": "entity_start",
-        "Entity End": "entity_end",
-        "ArtNet IP": "ip",
-        "ArtNet Universe": "universe",
-        "Name": "name",
-    })
-    df = df[(df["universe"] >= 0) & (df["universe"] <= 127)].copy()
-    df = df.sort_values(["ip", "universe"]).reset_index(drop=True)
-
-    columns: List[List[int]] = []
-    for ip, g in df.groupby("ip"):
-        g = g.sort_values("universe")
-        uv = list(g["universe"].astype(int))
-        for u in uv:
-            if u % 2 != 0:
-                continue
-            rowA = g[g["universe"] == u]
-            if rowA.empty: 
-                continue
-            rowA = rowA.iloc[0]
-            rowB = g[g["universe"] == (u+1)]
-            rowB = (None if rowB.empty else rowB.iloc[0])
-
-            a0, a1 = int(rowA["entity_start"]), int(rowA["entity_end"])
-            listA = list(range(min(a0, a1), max(a0, a1) + 1))
-
-            listB: List[int] = []
-            if rowB is not None:
-                b0, b1 = int(rowB["entity_start"]), int(rowB["entity_end"])
-                listB = list(range(min(b0, b1), max(b0, b1) + 1))
-
-            band = listA + listB
-            if len(band) < 200:
-                continue
-
-            up_visible   = band[1:1+128]
-            down_visible = band[130:130+128]
-
-            col0 = list(reversed(up_visible))
-            col1 = down_visible
-
-            if len(col0) < 128: col0 = (col0 + [col0[-1]]*128)[:128]
-            if len(col1) < 128: col1 = (col1 + [col1[-1]]*128)[:128]
-
-            columns.append(col0)
-            columns.append(col1)
-
-    if len(columns) >= 128:
-        return columns[:128]
-    # pad au besoin
-    while len(columns) < 128 and len(columns) > 0:
-        columns.append(columns[-1])
-    if not columns:
-        # fallback: grille vide (mieux que crash)
-        columns = [[0]*128 for _ in range(128)]
-    return columns
+    # grille précompilée (bandes < 200 entités ignorées, colonnes manquantes complétées)
+    return load_mapping(xlsx_path).columns(128)
 
 # ---------------- ciel étoilé ----------------
 class Star:
@@ -131,43 +60,69 @@ def build_starfield(columns: List[List[int]], density: float, seed: int,
         stars.append(Star(x,y,phase,speed,base,color))
     return stars
 
-def render_stars_frame(columns: List[List[int]], stars: List[Star], t: float,
-                       bg: Tuple[int,int,int]) -> List[Tuple[int,int,int,int,int]]:
+class StarfieldRenderer:
     """
-    Construit la liste (entity_id, r,g,b,0) pour cette frame:
-      - fond = bg (faible bleu nuit)
-      - étoiles = couleur * twinkle(t)
+    Rendu NumPy du ciel étoilé dans un tableau ENTITY_DTYPE (le buffer de l'encodeur) :
+    ids posés une fois par buffer(), seules les couleurs sont recalculées à chaque frame.
+      - fond non noir : une entité par pixel du mur (x puis y), étoiles écrites par-dessus
+      - fond noir     : une entité par étoile (comme la liste historique)
     """
-    ents: List[Tuple[int,int,int,int,int]] = []
-
-    # fond (optionnel) : on met un léger bleu nuit sur tout le mur
-    if bg != (0,0,0):
-        for x in range(128):
-            col = columns[x]
-            for y in range(128):
-                eid = col[y]
-                ents.append((eid, bg[0], bg[1], bg[2], 0))
-
-    # étoiles qui scintillent
-    for st in stars:
-        eid = columns[st.x][st.y]
-        # twinkle: sinus 0..1 autour de la base
-        osc = 0.5*(1.0 + math.sin(st.phase + t*math.tau*st.speed))  # 0..1
-        k = min(1.0, st.base + 0.7*osc)   # boost scintillement
-        r = min(255, int(st.color[0]*k))
-        g = min(255, int(st.color[1]*k))
-        b = min(255, int(st.color[2]*k))
-        ents.append((eid, r, g, b, 0))
+    def __init__(self, columns: List[List[int]], stars: List[Star], bg: Tuple[int,int,int]):
+        self.bg = tuple(bg)
+        xs = np.array([st.x for st in stars], dtype=np.intp)
+        ys = np.array([st.y for st in stars], dtype=np.intp)
+        self.phase = np.array([st.phase for st in stars])
+        self.speed = np.array([st.speed for st in stars])
+        self.base = np.array([st.base for st in stars])
+        self.color = np.array([st.color for st in stars], dtype=np.float64).reshape(-1, 3)
+        grid = np.asarray(columns, dtype=np.uint16)  # grid[x, y] = entity_id
+        if self.bg != (0,0,0):
+            self.ids = grid.reshape(-1)
+            self.pos = xs * grid.shape[1] + ys   # index de l'entité de chaque étoile
+        else:
+            self.ids = grid[xs, ys]
+            self.pos = np.arange(len(stars))
+
+    def buffer(self, encoder: Optional[UpdateEncoder] = None) -> np.ndarray:
+        """Tableau d'entités de la frame (buffer préalloué de l'encodeur si fourni), ids posés."""
+        out = encoder.buffer(len(self.ids)) if encoder is not None else np.zeros(len(self.ids), dtype=ENTITY_DTYPE)
+        out["id"] = self.ids
+        return out
+
+    def render(self, t: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Couleurs de la frame à l'instant t, écrites en place dans `out` (buffer()) :
+          - fond = bg (faible bleu nuit)
+          - étoiles = couleur * twinkle(t)
+        """
+        if out is None:
+            out = self.buffer()
+        if self.bg != (0,0,0):
+            out["r"], out["g"], out["b"] = self.bg
+        # twinkle: sinus 0..1 autour de la base, boost scintillement
+        osc = 0.5 * (1.0 + np.sin(self.phase + t * math.tau * self.speed))
+        k = np.minimum(1.0, self.base + 0.7 * osc)
+        rgb = np.minimum(255, (self.color * k[:, None]).astype(np.int64))
+        for c, name in enumerate(("r", "g", "b")):
+            out[name][self.pos] = rgb[:, c]
+        return out
 
-    return ents
+def render_stars_frame(columns: List[List[int]], stars: List[Star], t: float,
+                       bg: Tuple[int,int,int]) -> np.ndarray:
+    """Frame isolée (tableau ENTITY_DTYPE) ; en boucle, garder un StarfieldRenderer et son buffer."""
+    return StarfieldRenderer(columns, stars, bg).render(t)
 
 def play_starfield(excel: str, host: str, port: int,
                    seconds: float, fps: float,
                    density: float, seed: int,
-                   bg: str, chunk_size: int):
+                   bg: str, chunk_size: int, level: int = GZIP_LEVEL, workers: int = 0,
+                   pace: float = 0.5, budget: int = MTU_BUDGET):
     """
     bg: '0,0,0' (fond noir) ou '4,8,16' (bleu nuit doux recommandé).
-    chunk_size: nb d'entités par paquet eHuB (sécurité UDP).
+    chunk_size: nb d'entités par paquet eHuB si budget = 0.
+    budget: taille max d'un paquet en octets (1472 = pas de fragmentation IP), découpe adaptative.
+    level/workers: niveau gzip (1..9) et threads de compression (0 = inline).
+    pace: paquets d'une frame étalés sur cette fraction du temps restant avant le tick suivant (0 = rafale).
     """
     columns = load_columns_from_excel(excel)
     # parse bg
@@ -180,22 +135,24 @@ def play_starfield(excel: str, host: str, port: int,
     stars = build_starfield(columns, density=density, seed=seed, white_bias=0.8)
     print(f"🌌 Starfield: {len(stars)} étoiles | bg={bg_rgb} | fps={fps} | seconds={seconds}")
 
-    dt = 1.0 / max(1e-3, fps)
-    t0 = time.time()
-    t_end = t0 + seconds
-
-    while time.time() < t_end:
-        t = time.time() - t0
-        ents = render_stars_frame(columns, stars, t, bg_rgb)
+    clock = FrameScheduler(fps)
+    encoder = UpdateEncoder(chunk_size, level, workers, budget)
+    transport = UdpTransport(host, port, pace)
+    renderer = StarfieldRenderer(columns, stars, bg_rgb)
+    ents = renderer.buffer(encoder)  # rendu en place, aucune liste par frame
+    while clock.elapsed < seconds:
+        t = clock.elapsed
+        renderer.render(t, ents)
 
         # chunking eHuB (au cas où le fond non noir => ~16k entités)
-        u = 0
-        for chunk in chunked(ents, chunk_size):
-            pkt = pack_update(universe=u, entities=chunk)
-            send_udp(pkt, host, port)
-            u += 1
+        transport.send_frame(encoder.encode(ents), clock.delay())
 
-        time.sleep(dt)
+        clock.wait()
+    encoder.close()
+    transport.close()
+    print(clock.summary())
+    print(encoder.summary())
+    print(transport.summary())
 
 # ---------------- CLI ----------------
 if __name__ == "__main__":
@@ -208,10 +165,18 @@ if __name__ == "__main__":
     ap.add_argument("--density", type=float, default=0.01, help="fraction de pixels en étoiles (ex 0.01 = ~163)")
     ap.add_argument("--seed", type=int, default=42, help="aléa reproductible")
     ap.add_argument("--bg", default="4,8,16", help="couleur de fond R,G,B (ex 0,0,0 ou 4,8,16)")
-    ap.add_argument("--chunk", type=int, default=3000, help="taille paquet eHuB (entités/paquet)")
+    ap.add_argument("--chunk", type=int, default=3000, help="taille paquet eHuB (entités/paquet) si --mtu-budget 0")
+    ap.add_argument("--mtu-budget", type=int, default=MTU_BUDGET,
+                    help="taille max d'un paquet eHuB en octets, découpe adaptative (0 = --chunk entités fixes)")
+    ap.add_argument("--gzip-level", type=int, default=GZIP_LEVEL, choices=range(1, 10), metavar="1..9",
+                    help="niveau de compression gzip (9 = paquets identiques à l'historique, 1 = plus rapide)")
+    ap.add_argument("--gzip-workers", type=int, default=0, help="threads de compression des paquets (0 = inline)")
+    ap.add_argument("--pace", type=float, default=0.5,
+                    help="fraction du temps restant avant le prochain tick sur laquelle étaler les paquets (0 = rafale)")
     args = ap.parse_args()
 
     # sécurité des bornes
     density = max(0.001, min(0.2, args.density))   # 0.1% .. 20% max
     play_starfield(args.excel, args.host, args.port, args.seconds, args.fps,
-                   density, args.seed, args.bg, args.chunk)
+                   density, args.seed, args.bg, args.chunk, args.gzip_level, args.gzip_workers,
+                   args.pace, args.mtu_budget)
@@ -1,14 +1,21 @@
 # receiver/artnet_monitor.py
-import socket
-from typing import Tuple
+import socket, time
+from typing import Dict, Tuple
 
 ARTNET_PORT = 6454
 ARTNET_ID = b"Art-Net\x00"
 OP_OUTPUT = 0x5000  # OpDmx
+OP_SYNC = 0x5200    # OpSync (ArtSync)
 
 def _u16le(b: bytes) -> int:
     return b[0] | (b[1] << 8)
 
+def artnet_opcode(pkt: bytes) -> int | None:
+    """OpCode d'un paquet Art-Net, None si ce n'est pas de l'Art-Net."""
+    if len(pkt) < 10 or pkt[:8] != ARTNET_ID:
+        return None
+    return _u16le(pkt[8:10])
+
 def parse_artnet_packet(pkt: bytes) -> Tuple[int, int, bytes] | None:
     """
     Retourne (universe, length, dmx_payload) si paquet OpDmx valide, sinon None.
@@ -41,20 +48,58 @@ def parse_artnet_packet(pkt: bytes) -> Tuple[int, int, bytes] | None:
     universe = (net << 8) | subuni
     return (universe, length, dmx)
 
+def parse_artsync(pkt: bytes) -> bool:
+    """
+    True si paquet OpSync (ArtSync) valide.
+    Format: "Art-Net\0", OpCode 0x5200 (LE), ProtVer (BE), Aux1, Aux2 → 14 octets.
+    """
+    return len(pkt) >= 14 and artnet_opcode(pkt) == OP_SYNC
+
+class SyncTracker:
+    """
+    Par émetteur: horodate le 1er et le dernier univers OpDmx reçus depuis le
+    dernier ArtSync → étalement (ms) de chaque frame synchronisée.
+    Une frame sans ArtSync depuis `stale` s est oubliée (univers non synchronisés).
+    """
+    def __init__(self, stale: float = 1.0):
+        self.stale = stale
+        self._frames: Dict[str, Tuple[float, float, int]] = {}  # ip -> (t_premier, t_dernier, n univers)
+
+    def on_dmx(self, src: str, t: float):
+        first, last, n = self._frames.get(src, (t, t, 0))
+        if t - last > self.stale:
+            first, n = t, 0
+        self._frames[src] = (first, t, n + 1)
+
+    def on_sync(self, src: str) -> Tuple[int, float]:
+        """Clôt la frame de `src` : retourne (nb univers, étalement en ms)."""
+        first, last, n = self._frames.pop(src, (0.0, 0.0, 0))
+        return n, (last - first) * 1000.0
+
 def run_artnet_monitor(host: str = "0.0.0.0", port: int = ARTNET_PORT,
-                       show_channels: int = 12, only_universe: int | None = None):
+                       show_channels: int = 12, only_universe: int | None = None,
+                       show_dmx: bool = True):
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     sock.bind((host, port))
-    print(f"👂 ArtNet monitor listening on {host}:{port} (OpDmx)")
+    print(f"👂 ArtNet monitor listening on {host}:{port} (OpDmx + OpSync)")
     print(f"   Affiche les {show_channels} premiers canaux. Filtre univers: "
           f"{only_universe if only_universe is not None else 'aucun'}")
 
+    sync = SyncTracker()
     while True:
         data, addr = sock.recvfrom(65535)
+        t = time.perf_counter()
+        if parse_artsync(data):
+            n, spread_ms = sync.on_sync(addr[0])
+            print(f"🔁 ArtSync from {addr[0]}: {n} univers, étalement 1er→dernier {spread_ms:.2f} ms")
+            continue
         res = parse_artnet_packet(data)
         if not res:
             continue
         universe, length, dmx = res
+        sync.on_dmx(addr[0], t)
+        if not show_dmx:
+            continue
         if only_universe is not None and universe != only_universe:
             continue
         n = max(1, min(show_channels, len(dmx)))
@@ -3,10 +3,11 @@ import argparse
 from artnet_monitor import run_artnet_monitor
 
 if __name__ == "__main__":
-    ap = argparse.ArgumentParser(description="ArtNet (OpDmx) monitor")
+    ap = argparse.ArgumentParser(description="ArtNet (OpDmx + OpSync) monitor")
     ap.add_argument("--host", default="0.0.0.0")
     ap.add_argument("--port", type=int, default=6454)
     ap.add_argument("--channels", type=int, default=12, help="Nb de canaux à afficher (début de trame)")
     ap.add_argument("--universe", type=int, help="Filtrer sur un univers (Net<<8|SubUni)", default=None)
+    ap.add_argument("--sync-only", action="store_true", help="N'afficher que les ArtSync (étalement des frames)")
     args = ap.parse_args()
-    run_artnet_monitor(args.host, args.port, args.channels, args.universe)
+    run_artnet_monitor(args.host, args.port, args.channels, args.universe, show_dmx=not args.sync_only)
@@ -0,0 +1,48 @@
+# receiver/bench_all_bands.py
+import argparse
+import numpy as np
+from parser import ENTITY_DTYPE, parse_packet
+from bench_parser import bench, build_full_wall_update
+from router_all_bands import load_all_from_excel, LinearIndex, RangeIndex
+
+def synthetic_rows(n_rows: int, per_row: int, n_ips: int = 8):
+    """Mur fictif: n_rows plages contiguës de per_row entités, réparties sur n_ips contrôleurs."""
+    return [(100 + i * per_row, 100 + (i + 1) * per_row - 1, f"10.0.{i % n_ips}.1", i // n_ips)
+            for i in range(n_rows)]
+
+def run(label: str, mappings, ents: np.ndarray, repeat: int, with_linear: bool):
+    print(f"⏱️ {label}: {len(mappings)} lignes, {len(ents)} entités/UPDATE")
+    rng_idx = RangeIndex(mappings)
+    fr_range = np.zeros((len(rng_idx.targets), 512), dtype=np.uint8)
+    t_range = bench("RangeIndex (contigu)", lambda: rng_idx.apply(ents, fr_range), repeat)
+    shuffled = ents[np.random.default_rng(0).permutation(len(ents))]
+    fr_shuf = np.zeros_like(fr_range)
+    bench("RangeIndex (ordre aléatoire)", lambda: rng_idx.apply(shuffled, fr_shuf), repeat)
+    assert np.array_equal(fr_range, fr_shuf)
+    if with_linear:
+        lin = LinearIndex(mappings)
+        fr_lin = np.zeros_like(fr_range)
+        t_lin = bench("LinearIndex (historique)", lambda: lin.apply(ents, fr_lin), max(1, repeat // 50))
+        assert np.array_equal(fr_range, fr_lin), "RangeIndex != LinearIndex"
+        print(f"  → x{t_lin / max(1e-9, t_range):.0f}, framebuffers identiques")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="router_all_bands: recherche linéaire vs index d'intervalles")
+    ap.add_argument("--excel", default="faker/Ecran (2).xlsx")
+    ap.add_argument("--rows", type=int, default=2048, help="lignes du mur synthétique")
+    ap.add_argument("--per-row", type=int, default=30, help="entités par ligne du mur synthétique")
+    ap.add_argument("--repeat", type=int, default=200)
+    ap.add_argument("--no-linear", action="store_true", help="ne pas mesurer la recherche linéaire (lente)")
+    args = ap.parse_args()
+
+    mappings = load_all_from_excel(args.excel)
+    pkt = build_full_wall_update(max(e for _, e, _, _ in mappings) - 99, 100)
+    f, _ = parse_packet(pkt, as_array=True)
+    run("Excel", mappings, f.entities, args.repeat, not args.no_linear)
+
+    rows = synthetic_rows(args.rows, args.per_row)
+    ents = np.zeros(args.rows * args.per_row, dtype=ENTITY_DTYPE)
+    ents["id"] = 100 + np.arange(len(ents))
+    ents["r"] = np.arange(len(ents)) & 0xFF
+    ents["g"] = 0x55
+    run("mur synthétique", rows, ents, args.repeat, not args.no_linear)
@@ -0,0 +1,61 @@
+# receiver/bench_decode_pool.py
+import argparse, gzip, os, struct, time
+import numpy as np
+from parser import ENTITY_DTYPE, MAGIC
+from router_lookup import LookupRouter
+
+def source_packets(ids: np.ndarray, sources: int, frames: int, chunk: int):
+    """
+    Lots reçus de `sources` sources plein mur entrelacées (contenu différent à chaque
+    frame : ni la dédup ni le cache gzip n'aident).
+    """
+    rng = np.random.default_rng(0)
+    batch = []
+    for f in range(frames):
+        for s in range(sources):
+            ents = np.zeros(len(ids), dtype=ENTITY_DTYPE)
+            ents["id"] = ids
+            ents["r"] = (ids + 17 * f + 5 * s) & 0xFF
+            ents["g"] = rng.integers(0, 4, len(ids), dtype=np.uint8)  # un peu d'entropie
+            for k, i in enumerate(range(0, len(ids), chunk)):
+                comp = gzip.compress(ents[i:i + chunk].tobytes())
+                pkt = MAGIC + bytes([2, k]) + struct.pack("<HH", len(ents[i:i + chunk]), len(comp)) + comp
+                batch.append((memoryview(pkt), (f"10.0.0.{s + 1}", 50001)))
+    return batch
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Passage à l'échelle du pool de décompression eHuB (0 = inline)")
+    ap.add_argument("--excel", default="faker/Ecran (2).xlsx")
+    ap.add_argument("--sources", type=int, default=4)
+    ap.add_argument("--frames", type=int, default=4, help="frames par source")
+    ap.add_argument("--chunk", type=int, default=3000)
+    ap.add_argument("--batch", type=int, default=64, help="datagrammes par lot (rx_batch)")
+    ap.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4, 8])
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    probe = LookupRouter(args.excel)
+    pkts = source_packets(np.array(sorted(probe.lookup)), args.sources, args.frames, args.chunk)
+    batches = [pkts[i:i + args.batch] for i in range(0, len(pkts), args.batch)]
+    print(f"⏱️ {len(pkts)} UPDATE ({args.sources} sources), lots de {args.batch}, {os.cpu_count()} CPU")
+
+    ref = None
+    t_inline = None
+    for w in args.workers:
+        router = LookupRouter(args.excel, dedup=False, decode_workers=w, assemble_frames=True)
+        best = float("inf")
+        for _ in range(max(1, args.repeat)):
+            t0 = time.perf_counter()
+            for b in batches:
+                router._process_batch(b)
+                router.assembler.poll(float("inf"))
+                router._flush_pending()
+            best = min(best, time.perf_counter() - t0)
+        if ref is None:
+            ref = router.fb.frame.copy()
+        assert np.array_equal(ref, router.fb.frame), f"framebuffer différent avec {w} workers"
+        t_inline = t_inline or best
+        label = f"{w} worker(s)" if w else "inline"
+        print(f"  {label:<12} {len(pkts) / best:8.0f} paquets/s  x{t_inline / best:.2f}")
+        if router.decode_pool is not None:
+            router.decode_pool.shutdown()
@@ -0,0 +1,42 @@
+# receiver/bench_dedup.py
+import argparse, gzip, struct
+import numpy as np
+from parser import ENTITY_DTYPE, MAGIC
+from bench_parser import bench
+from router_lookup import LookupRouter
+
+def image_chunks(ids: np.ndarray, chunk: int) -> list:
+    """Image fixe découpée comme image_player (octet universe = index de chunk)."""
+    ents = np.zeros(len(ids), dtype=ENTITY_DTYPE)
+    ents["id"] = ids
+    ents["r"] = (ids * 7) & 0xFF
+    ents["g"] = (ids // 128) & 0xFF
+    ents["b"] = 0x40
+    pkts = []
+    for k, i in enumerate(range(0, len(ents), chunk)):
+        comp = gzip.compress(ents[i:i + chunk].tobytes())
+        pkts.append(MAGIC + bytes([2, k]) + struct.pack("<HH", len(ents[i:i + chunk]), len(comp)) + comp)
+    return pkts
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Réception d'une scène fixe: décodage complet vs dédup des UPDATE identiques")
+    ap.add_argument("--excel", default="faker/Ecran (2).xlsx")
+    ap.add_argument("--chunk", type=int, default=3000, help="entités par UPDATE (comme image_player)")
+    ap.add_argument("--repeat", type=int, default=200)
+    args = ap.parse_args()
+
+    routers = {flag: LookupRouter(args.excel, dedup=flag, assemble_frames=True) for flag in (False, True)}
+    pkts = image_chunks(np.array(sorted(routers[True].lookup)), args.chunk)
+    print(f"⏱️ image fixe: {len(pkts)} UPDATE/frame, {sum(map(len, pkts))} octets")
+
+    def frame(router):
+        for p in pkts:
+            router._handle_packet(p, ("127.0.0.1", 50001))
+        router.assembler.poll(float("inf"))
+        router._flush_pending()
+
+    t_full = bench("sans dédup (gzip + apply)", lambda: frame(routers[False]), args.repeat)
+    t_dedup = bench("dédup (hash seul)", lambda: frame(routers[True]), args.repeat)
+    a, b = routers[False].fb, routers[True].fb
+    assert np.array_equal(a.frame, b.frame), "framebuffers différents"
+    print(f"  → x{t_full / max(1e-9, t_dedup):.0f}, framebuffers identiques — {routers[True].dedup.report()}")
@@ -0,0 +1,121 @@
+# receiver/bench_engines.py
+import argparse, gzip, multiprocessing as mp, os, socket, struct, threading, time
+import numpy as np
+from parser import ENTITY_DTYPE, MAGIC
+from router_lookup import LookupRouter, ENGINES
+
+MARKERS = 16  # frames précompressées ; le canal B de chaque entité porte n % MARKERS
+
+def blaster(ids, port: int, fps: float, seconds: float, chunk: int, sent_ts):
+    """Source plein mur qui change à chaque frame ; sent_ts[n] = instant d'envoi de la frame n."""
+    ents = np.zeros(len(ids), dtype=ENTITY_DTYPE)
+    ents["id"] = ids
+    frames = []
+    for f in range(MARKERS):  # frames précompressées : l'émetteur ne limite pas le débit
+        ents["r"] = (ids + 13 * f) & 0xFF
+        ents["g"] = (ids * f) & 0xFF
+        ents["b"] = f
+        pkts = []
+        for k, i in enumerate(range(0, len(ids), chunk)):
+            comp = gzip.compress(ents[i:i + chunk].tobytes())
+            pkts.append(MAGIC + bytes([2, k]) + struct.pack("<HH", len(ents[i:i + chunk]), len(comp)) + comp)
+        frames.append(pkts)
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    t0 = time.monotonic()
+    n = 0
+    while time.monotonic() - t0 < seconds and n < len(sent_ts):
+        sent_ts[n] = time.monotonic()
+        for p in frames[n % MARKERS]:
+            s.sendto(p, ("127.0.0.1", port))
+        n += 1
+        time.sleep(max(0.0, t0 + n / fps - time.monotonic()))
+
+def cpu_seconds(exclude: int) -> float:
+    """Temps CPU (user+sys) de ce processus et de ses fils (réception en mode process), hors `exclude`."""
+    tck = os.sysconf("SC_CLK_TCK")
+    me = os.getpid()
+    total = 0.0
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit() or int(pid) == exclude:
+            continue
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        # après "(comm)": état=0, ppid=1, ..., utime=11, stime=12
+        if int(pid) == me or int(fields[1]) == me:
+            total += (int(fields[11]) + int(fields[12])) / tck
+    return total
+
+def latencies_ms(seen, sent: np.ndarray) -> np.ndarray:
+    """
+    Pour chaque changement de marqueur en sortie : instant du 1er envoi ArtNet qui le
+    montre - instant d'envoi eHuB de la dernière frame portant ce marqueur.
+    """
+    idx = np.arange(len(sent))
+    out = []
+    prev = None
+    for t_out, marker in seen:
+        if marker == prev:
+            continue
+        prev = marker
+        cand = np.flatnonzero((idx % MARKERS == marker) & (sent <= t_out))
+        if cand.size:
+            out.append((t_out - sent[cand[-1]]) * 1000.0)
+    return np.array(out) if out else np.zeros(1)
+
+def measure(engine: str, args, port: int):
+    params = dict(excel_path=args.excel, listen_ip="127.0.0.1", listen_port=port,
+                  send_fps=args.fps, stats_every=0)
+    router = LookupRouter(**params)
+    target, offset = router.lookup[min(router.lookup)]  # 1re entité : son canal B porte le marqueur
+    row, col = router.fb.index[target], offset + router.order.index("B")
+    seen = []  # (instant de l'envoi ArtNet, marqueur visible dans le front buffer)
+
+    def record(batch, sync_ips):  # pas d'ArtNet sur le réseau : on note ce qui serait parti
+        seen.append((time.monotonic(), int(router.fb.front[row, col])))
+    router.tx.send_frame = record
+
+    runner = {"thread": router.run, "asyncio": router.run_asyncio,
+              "process": lambda: router.run_processes(params)}[engine]
+    threading.Thread(target=runner, daemon=True).start()
+    time.sleep(args.warmup)
+
+    sent_ts = mp.Array("d", int(args.seconds * args.input_fps) + MARKERS, lock=False)
+    tx = mp.Process(target=blaster, args=(np.array(sorted(router.lookup)), port, args.input_fps,
+                                          args.seconds, args.chunk, sent_ts))
+    router.clock.start()  # mesure (FPS, jitter) sur la fenêtre de charge uniquement
+    del seen[:]
+    tx.start()
+    cpu0, t0 = cpu_seconds(tx.pid), time.monotonic()
+    tx.join()
+    cpu = (cpu_seconds(tx.pid) - cpu0) / (time.monotonic() - t0)
+
+    sent = np.frombuffer(sent_ts, dtype=np.float64)
+    lat = latencies_ms(list(seen), sent[sent > 0])
+    c = router.clock
+    print(f"  {engine:<8} {c.achieved_fps():5.1f}/{args.fps:g} fps, jitter p99={c.jitter_ms(99):5.2f} ms "
+          f"max={c.jitter_ms(100):5.2f} ms, retard={c.late} | latence eHuB→ArtNet "
+          f"p50={np.percentile(lat, 50):5.1f} ms p99={np.percentile(lat, 99):5.1f} ms | CPU {100.0 * cpu:5.1f}%")
+    if router.shared is not None:
+        router.shared.shm.unlink()  # le thread d'envoi lit encore le segment jusqu'à la sortie
+        router.shared.owner = False  # run_processes() ne le supprimera pas une 2e fois
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Moteurs du routeur sous charge eHuB : jitter de sortie, latence, CPU")
+    ap.add_argument("--excel", default="faker/Ecran (2).xlsx")
+    ap.add_argument("--engines", nargs="+", default=list(ENGINES), choices=list(ENGINES))
+    ap.add_argument("--fps", type=float, default=40.0, help="FPS de sortie ArtNet")
+    ap.add_argument("--input-fps", type=float, default=120.0, help="frames plein mur/s reçues")
+    ap.add_argument("--chunk", type=int, default=3000)
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--warmup", type=float, default=3.0, help="s avant la charge (démarrage du processus de réception)")
+    args = ap.parse_args()
+
+    print(f"⏱️ sortie {args.fps:g} fps, entrée {args.input_fps:g} frames plein mur/s pendant {args.seconds:g} s "
+          f"({os.cpu_count()} CPU)")
+    for k, engine in enumerate(args.engines):
+        ctx = mp.get_context("spawn")
+        p = ctx.Process(target=measure, args=(engine, args, 50400 + k))  # routeur neuf par moteur
+        p.start(); p.join()
@@ -0,0 +1,83 @@
+# receiver/bench_ingest.py
+import argparse, multiprocessing as mp, socket, time
+import numpy as np
+from parser import parse_packet, UpdateFrame
+from bench_dedup import image_chunks
+from router_lookup import LookupRouter
+from udp_ingest import UdpIngest, udp_socket_stats
+
+PORT = 50321
+
+def blaster(pkts, bursts: int, gap: float, port: int):
+    """Rafales de chunks envoyés d'affilée (comme image_player / stars_player), `gap` s entre rafales."""
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    for _ in range(bursts):
+        for p in pkts:
+            s.sendto(p, ("127.0.0.1", port))
+        time.sleep(gap)
+
+def run_legacy(router: LookupRouter, sock: socket.socket, idle: float) -> int:
+    """Boucle historique : recvfrom bloquant, parse, 1 prise de verrou par paquet."""
+    n = 0
+    sock.settimeout(idle)
+    while True:
+        try:
+            data, _ = sock.recvfrom(65535)
+        except socket.timeout:
+            return n
+        frame, err = parse_packet(data, as_array=True)
+        if not err and isinstance(frame, UpdateFrame):
+            router._apply_update(frame.entities, frame.universe)
+        n += 1
+
+def run_batched(router: LookupRouter, ingest: UdpIngest, idle: float) -> int:
+    n = 0
+    while True:
+        batch = ingest.recv_batch(idle)
+        if not batch:
+            return n
+        for data, src in batch:
+            router._handle_packet(data, src)
+        router._flush_pending()
+        n += len(batch)
+
+def measure(label: str, router, recv, sock, pkts, args):
+    _, drops0 = udp_socket_stats(sock) or (0, 0)
+    tx = mp.Process(target=blaster, args=(pkts, args.bursts, args.gap, PORT))
+    t0 = time.perf_counter()
+    tx.start()
+    n = recv()
+    tx.join()
+    dt = time.perf_counter() - t0 - 0.5
+    sent = args.bursts * len(pkts)
+    k = udp_socket_stats(sock)
+    drops = f"{k[1] - drops0}" if k else "n/a"
+    print(f"  {label:<34} reçus {n}/{sent} ({100.0 * n / sent:5.1f}%), pertes noyau={drops}, "
+          f"{n / max(1e-9, dt):.0f} paquets/s")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Réception eHuB en rafales: recvfrom par paquet vs lots non bloquants")
+    ap.add_argument("--excel", default="faker/Ecran (2).xlsx")
+    ap.add_argument("--chunk", type=int, default=2048, help="entités par UPDATE")
+    ap.add_argument("--bursts", type=int, default=300)
+    ap.add_argument("--gap", type=float, default=0.002, help="s entre deux rafales")
+    ap.add_argument("--rcvbuf", type=int, default=4 << 20)
+    args = ap.parse_args()
+
+    router = LookupRouter(args.excel, dedup=False, assemble_frames=False)
+    ids = np.array(sorted(router.lookup))
+    # contenu différent à chaque chunk/rafale n'a pas d'importance ici (dédup désactivée)
+    pkts = image_chunks(ids, args.chunk)
+    print(f"⏱️ {args.bursts} rafales de {len(pkts)} UPDATE ({sum(map(len, pkts))} octets), {args.gap * 1000:g} ms entre rafales")
+
+    legacy = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    legacy.bind(("127.0.0.1", PORT))
+    measure("recvfrom/paquet, rcvbuf par défaut", router, lambda: run_legacy(router, legacy, 0.5), legacy, pkts, args)
+    legacy.close()
+
+    for rcvbuf in (0, args.rcvbuf):
+        ingest = UdpIngest("127.0.0.1", PORT, rcvbuf)
+        label = f"lots, rcvbuf={ingest.rcvbuf // 1024} Ko"
+        measure(label, router, lambda: run_batched(router, ingest, 0.5), ingest.sock, pkts, args)
+        print(f"    {ingest.report()}")
+        ingest.close()
@@ -0,0 +1,57 @@
+# receiver/bench_latency.py
+import argparse, threading, time
+import numpy as np
+import router_lookup
+from bench_parser import build_full_wall_update
+from parser import parse_packet
+
+def percentile(values, q: float) -> float:
+    return float(np.percentile(np.asarray(values), q)) if values else float("nan")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(
+        description="Latence réception→application d'un UPDATE plein mur @ FPS fixe, sender actif"
+    )
+    ap.add_argument("--excel", default="faker/Ecran (2).xlsx")
+    ap.add_argument("--fps", type=float, default=40.0, help="FPS entrée eHuB ET sortie ArtNet")
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--dmx-monitor", action="store_true", help="active l'aperçu DMX à chaque frame")
+    ap.add_argument("--artnet-ip", default="127.0.0.1", help="destination ArtNet réelle des paquets")
+    args = ap.parse_args()
+
+    router = router_lookup.LookupRouter(
+        args.excel, send_fps=args.fps, keepalive=0,
+        monitor_enabled=args.dmx_monitor, monitor_every=1,
+    )
+    # tous les contrôleurs redirigés vers une IP locale : vrais sendto, sans réseau LAPS
+    for ip, _ in router.targets:
+        router.tx.redirect(ip, args.artnet_ip)
+
+    # deux frames plein mur différentes → tous les univers changent à chaque UPDATE
+    pkt = build_full_wall_update(max(router.lookup) + 1, 0)
+    f, _ = parse_packet(pkt, as_array=True)
+    alt = f.entities.copy()
+    alt["r"] ^= 0xFF
+    frames = [f.entities, alt]
+
+    tx = threading.Thread(target=router._sender_loop, daemon=True)
+    tx.start()
+
+    # arrivées à 40 fps en moyenne mais à phase aléatoire par rapport au tick d'envoi
+    rng = np.random.default_rng(1)
+    dt = 1.0 / args.fps
+    lat_ms = []
+    t_end = time.perf_counter() + args.seconds
+    i = 0
+    while time.perf_counter() < t_end:
+        t_rx = time.perf_counter()           # "paquet reçu"
+        parse_packet(pkt, as_array=True)     # coût de décodage inclus
+        router._apply_update(frames[i & 1])
+        lat_ms.append((time.perf_counter() - t_rx) * 1000.0)
+        i += 1
+        time.sleep(max(0.0, rng.uniform(0.5, 1.5) * dt - (time.perf_counter() - t_rx)))
+
+    print(f"⏱️ réception→application, {len(lat_ms)} UPDATE plein mur @ {args.fps:g} fps "
+          f"(monitor={'ON' if args.dmx_monitor else 'OFF'})")
+    print(f"   p50={percentile(lat_ms, 50):.3f} ms  p99={percentile(lat_ms, 99):.3f} ms  "
+          f"max={max(lat_ms):.3f} ms")
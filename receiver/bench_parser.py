@@ -0,0 +1,42 @@
+# receiver/bench_parser.py
+import argparse, gzip, struct, time
+import numpy as np
+from parser import parse_packet, ENTITY_DTYPE, MAGIC
+
+def build_full_wall_update(n_entities: int = 128 * 128, first_id: int = 100) -> bytes:
+    """
+    Paquet UPDATE plein mur (même format que faker/*.pack_update).
+    Contenu type "wave" (animator) : du bruit pur dépasserait la longueur compressée max (u16).
+    """
+    i = np.arange(n_entities)
+    s = 0.5 + 0.5 * np.sin(2 * np.pi * i / n_entities)
+    ents = np.zeros(n_entities, dtype=ENTITY_DTYPE)
+    ents["id"] = first_id + i
+    ents["r"] = (255 * (1.0 - s)).astype(np.uint8)
+    ents["b"] = (255 * s).astype(np.uint8)
+    comp = gzip.compress(ents.tobytes())
+    return MAGIC + bytes([2, 0]) + struct.pack("<H", n_entities) + struct.pack("<H", len(comp)) + comp
+
+def bench(label: str, fn, repeat: int) -> float:
+    fn()  # chauffe
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    ms = (time.perf_counter() - t0) * 1000.0 / repeat
+    print(f"  {label:<28} {ms:8.3f} ms/frame")
+    return ms
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Coût de décodage d'un UPDATE plein mur (liste vs tableau NumPy)")
+    ap.add_argument("--entities", type=int, default=128 * 128)
+    ap.add_argument("--repeat", type=int, default=200)
+    args = ap.parse_args()
+
+    pkt = build_full_wall_update(args.entities)
+    comp = pkt[10:]
+    print(f"⏱️ UPDATE {args.entities} entités, {len(pkt)} octets sur le fil")
+    t_gz = bench("gzip.decompress seul", lambda: gzip.decompress(comp), args.repeat)
+    t_list = bench("parse_packet (liste)", lambda: parse_packet(pkt), args.repeat)
+    t_arr = bench("parse_packet (as_array)", lambda: parse_packet(pkt, as_array=True), args.repeat)
+    print(f"  → décodage hors gzip : {t_list - t_gz:.3f} ms → {max(0.0, t_arr - t_gz):.3f} ms "
+          f"(x{t_list / max(1e-9, t_arr):.1f} au total)")
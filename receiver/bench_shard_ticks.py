@@ -0,0 +1,82 @@
+# receiver/bench_shard_ticks.py
+import argparse, multiprocessing as mp, os, sys, time, zlib
+import numpy as np
+COMMON_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "common"))
+if COMMON_DIR not in sys.path:
+    sys.path.insert(0, COMMON_DIR)
+from frame_clock import FrameScheduler
+from shm_framebuffer import SharedFramebuffer
+
+def writer(shm_name: str, n: int, seconds: float, every_us: float):
+    """Réception simulée : publie une nouvelle frame (tous univers = compteur) toutes les `every_us` µs."""
+    shared = SharedFramebuffer(n, shm_name)
+    frame = np.zeros((n, 512), dtype=np.uint8)
+    dirty = np.zeros(n, dtype=bool)
+    t_end = time.monotonic() + seconds
+    k = 0
+    while time.monotonic() < t_end:
+        k += 1
+        frame[:] = k & 0xFF
+        frame[:, 0] = (k >> 8) & 0xFF
+        dirty[:] = True
+        shared.write(frame, dirty)
+        time.sleep(every_us / 1e6)
+    shared.close()
+
+def shard(shm_name: str, n: int, fps: float, epoch_ns: int, seconds: float, lag_ms: float,
+          as_of: bool, out):
+    """Shard d'envoi simulé : à chaque tick (réveillé `lag_ms` après l'échéance) note le CRC de la frame lue."""
+    shared = SharedFramebuffer(n, shm_name)
+    front = np.zeros((n, 512), dtype=np.uint8)
+    dirty = np.zeros(n, dtype=bool)
+    clock = FrameScheduler(fps, report_every=0)
+    clock.start(epoch_ns)
+    seen = {}
+    t_end = time.monotonic() + seconds
+    while time.monotonic() < t_end:
+        clock.wait()
+        if lag_ms > 0:
+            time.sleep(lag_ms / 1e3)  # shard réveillé plus tard (ordonnanceur, GC, patch lent…)
+        shared.read(front, dirty, clock.deadline_ns if as_of else None)
+        seen[(clock.deadline_ns - epoch_ns) // clock.period_ns] = zlib.crc32(front)
+    out.put((seen, shared.overruns))
+    shared.close()
+
+def run(args, as_of: bool):
+    shared = SharedFramebuffer(args.universes)
+    ctx = mp.get_context("spawn")
+    out = ctx.Queue()
+    epoch_ns = time.monotonic_ns()
+    procs = [ctx.Process(target=writer, args=(shared.name, args.universes, args.seconds + 1.0, args.every_us))]
+    procs += [ctx.Process(target=shard, args=(shared.name, args.universes, args.fps, epoch_ns, args.seconds,
+                                              lag, as_of, out)) for lag in (0.0, args.lag_ms)]
+    for p in procs:
+        p.start()
+    (a, over_a), (b, over_b) = out.get(), out.get()
+    for p in procs:
+        p.join()
+    shared.close()
+    common = sorted(set(a) & set(b))
+    diff = sum(a[t] != b[t] for t in common)
+    mode = "échéance du tick" if as_of else "dernier publié "
+    print(f"  {mode}  {len(common)} ticks communs, {diff} envoyés différents par les 2 shards "
+          f"({over_a + over_b} instantanés perdus)")
+    return diff
+
+def main():
+    ap = argparse.ArgumentParser(description="2 shards sur la même grille : envoient-ils la même frame par tick ?")
+    ap.add_argument("--universes", type=int, default=128)
+    ap.add_argument("--fps", type=float, default=40.0)
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--every-us", type=float, default=500.0, help="Intervalle entre 2 publications de la réception")
+    ap.add_argument("--lag-ms", type=float, default=1.0, help="Retard de réveil du 2e shard")
+    args = ap.parse_args()
+    print(f"🧪 {args.universes} univers, {args.fps:g} fps, une publication toutes les {args.every_us:g} µs, "
+          f"2e shard en retard de {args.lag_ms:g} ms")
+    run(args, as_of=False)
+    diff = run(args, as_of=True)
+    print("✅ mêmes frames sur les deux shards" if diff == 0 else "❌ frames différentes d'un shard à l'autre")
+    sys.exit(1 if diff else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,25 @@
 # receiver/config_loader.py
-import pandas as pd
+import os, sys
+
+HERE = os.path.dirname(__file__)
+COMMON_DIR = os.path.abspath(os.path.join(HERE, "..", "common"))
+if COMMON_DIR not in sys.path:
+    sys.path.insert(0, COMMON_DIR)
+from mapping_cache import load_mapping
 
 def load_band_from_excel(xlsx_path: str, universe: int):
     """
     Charge UNE ligne (bande/univers) depuis l'Excel pour l'univers demandé.
     Retourne un dict: {entity_start, entity_end, ip, universe}.
     """
-    df = pd.read_excel(xlsx_path, sheet_name="eHuB")
-    df = df.rename(columns={
-        "Entity Start": "entity_start",
-        "Entity End": "entity_end",
-        "ArtNet IP": "ip",
-        "ArtNet Universe": "universe",
-        "Name": "name",
-    })
-    row = df[df["universe"] == universe].head(1)
-    if row.empty:
+    row = load_mapping(xlsx_path).row(universe)
+    if row is None:
         raise ValueError(f"Aucune ligne trouvée pour l'univers {universe} dans {xlsx_path}")
-    r = row.iloc[0]
+    name, start, end, ip, uni = row
     return {
-        "entity_start": int(r["entity_start"]),
-        "entity_end": int(r["entity_end"]),
-        "ip": str(r["ip"]),
-        "universe": int(r["universe"]),
-        "name": str(r.get("name", f"universe_{universe}")),
+        "entity_start": start,
+        "entity_end": end,
+        "ip": ip,
+        "universe": uni,
+        "name": name,
     }
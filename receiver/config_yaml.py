@@ -12,6 +12,21 @@ DEFAULTS: Dict[str, Any] = {
     "monitor_every": 20,
     "monitor_channels": 12,
     "patch_csv": None,
+    "keepalive": 1.0,       # s entre 2 ré-émissions d'un univers inchangé (0 = tout envoyer à chaque frame)
+    "stats_every": 10.0,    # s entre 2 lignes de stats débit ArtNet (0 = off)
+    "trim_dmx": True,       # paquets DMX limités aux canaux utilisés (False = toujours 512)
+    "tx_sockets": 2,        # taille du pool de sockets ArtNet partagé
+    "tx_sndbuf": 1048576,   # SO_SNDBUF des sockets ArtNet (octets)
+    "artsync": [],          # IP contrôleurs recevant un ArtSync après chaque frame (["*"] = toutes)
+    "late_policy": "skip",  # tick d'envoi en retard: "skip" (se recaler) ou "catchup" (rattraper)
+    "assemble_frames": False, # chunks UPDATE d'une frame appliqués d'un bloc (fakers : universe = index de chunk 0..k-1)
+    "frame_timeout": 0.05,  # s avant d'appliquer une frame incomplète
+    "dedup": True,          # UPDATE identique au précédent (même source/chunk) ignoré avant gzip
+    "rcvbuf": 4194304,      # SO_RCVBUF de la socket eHuB (octets, plafonné par net.core.rmem_max)
+    "rx_batch": 64,         # datagrammes max lus (et appliqués sous un seul verrou) par réveil
+    "decode_workers": 0,    # threads de décompression gzip (0 = dans le thread de réception)
+    "engine": "thread",     # "thread", "process" (réception et envoi dans 2 processus, mémoire partagée) ou "asyncio"
+    "output_shards": 0,     # engine "process" : envoi ArtNet réparti par IP sur N processus (0 = 1 seul, intégré)
 }
 
 def load_config(path: Optional[str]) -> Dict[str, Any]:
@@ -0,0 +1,198 @@
+# receiver/dmx_framebuffer.py
+import time
+from typing import Dict, List, Tuple, Iterable, Optional
+import numpy as np
+
+Target = Tuple[str, int]  # (ip, universe)
+
+MAX_ENTITY_ID = 0xFFFF  # id eHuB codé sur u16
+
+class DmxFramebuffer:
+    """
+    Mapping compilé une fois au démarrage:
+      - UN framebuffer contigu (n_univers x 512) pour tous les univers DMX
+      - une table dense entité → 3 canaux absolus (R, G, B) dans ce framebuffer,
+        ordre RGB/GRB déjà appliqué
+    Les entités non mappées pointent vers un octet "poubelle" placé après le
+    dernier univers : appliquer un UPDATE = une seule affectation vectorisée.
+    `dirty[i]` passe à True quand une valeur de l'univers i change réellement.
+
+    Double buffer: la réception écrit dans `frame` (back buffer) ; le sender
+    appelle `publish()` sous verrou (simple memcpy) puis émet depuis `front`
+    hors verrou, sans jamais bloquer la réception pendant les sendto.
+
+    Mapping dynamique (CONFIG eHuB): les LEDs du mapping, dans l'ordre du lookup,
+    forment les emplacements physiques 0..N-1 (`slots`). Un CONFIG d'un univers
+    eHuB (plages index ↔ entité) produit une table entité → canaux dédiée à cet
+    univers, échangée d'un bloc ; les UPDATE des univers sans CONFIG gardent
+    la table issue de l'Excel.
+
+    `extra` : cibles supplémentaires (entité, (univers, offset)) d'une entité présente sur
+    plusieurs lignes Excel → la même couleur est écrite sur chacune (table Excel uniquement,
+    hors `slots`).
+    """
+    def __init__(self, targets: Iterable[Target], lookup: Dict[int, Tuple[Target, int]], order: str = "RGB",
+                 extra: Optional[List[Tuple[int, Tuple[Target, int]]]] = None):
+        self.targets: List[Target] = list(dict.fromkeys(targets))  # ordre conservé, sans doublon
+        self.index: Dict[Target, int] = {t: i for i, t in enumerate(self.targets)}
+        self.order = order.upper().strip()
+
+        n = len(self.targets)
+        self.sink = n * 512
+        self._flat = np.zeros(self.sink + 1, dtype=np.uint8)     # +1 = octet poubelle
+        self.frame = self._flat[:self.sink].reshape(n, 512)      # back buffer (univers, canal)
+        self.front = np.zeros((n, 512), dtype=np.uint8)           # copie lue par le sender
+        self._dirty = np.zeros(n + 1, dtype=bool)                 # +1 = ligne "poubelle"
+        self.dirty = self._dirty[:n]
+
+        # ordre des couleurs "cuit" dans les index : position de R, G, B dans le pixel
+        rgb_pos = (1, 0, 2) if self.order == "GRB" else (0, 1, 2)
+        self.channels = np.full((MAX_ENTITY_ID + 1, 3), self.sink, dtype=np.intp)
+        self.lengths = np.full(n, 2, dtype=np.intp)   # canaux utilisés par univers (pair, >= 2)
+        self.slots = np.full((len(lookup), 3), self.sink, dtype=np.intp)  # index physique → canaux
+        for i, (eid, (target, off)) in enumerate(lookup.items()):
+            if off + 2 >= 512:
+                continue
+            row = self.index[target]
+            base = row * 512 + off
+            self.slots[i] = (base + rgb_pos[0], base + rgb_pos[1], base + rgb_pos[2])
+            self.lengths[row] = max(self.lengths[row], off + 3 + (off + 3) % 2)
+            if 0 <= eid <= MAX_ENTITY_ID:
+                self.channels[eid] = self.slots[i]
+
+        # cibles supplémentaires, triées par entité (jointure par searchsorted dans apply)
+        ext = sorted((eid, self.index[t] * 512 + off) for eid, (t, off) in (extra or [])
+                     if off + 2 < 512 and 0 <= eid <= MAX_ENTITY_ID)
+        self.extra_eids = np.array([e for e, _ in ext], dtype=np.intp)
+        self.extra_channels = np.array([(b + rgb_pos[0], b + rgb_pos[1], b + rgb_pos[2]) for _, b in ext],
+                                       dtype=np.intp).reshape(-1, 3)
+        self.has_extra = np.zeros(MAX_ENTITY_ID + 1, dtype=bool)
+        self.has_extra[self.extra_eids] = True
+        for _, b in ext:
+            row, off = divmod(b, 512)
+            self.lengths[row] = max(self.lengths[row], off + 3 + (off + 3) % 2)
+
+        self.mapped = int((self.channels[:, 0] != self.sink).sum())
+        self.tables: Dict[int, np.ndarray] = {}       # univers eHuB → table entité → canaux (CONFIG)
+        self._ranges: Dict[int, Tuple] = {}           # plages du dernier CONFIG appliqué, par univers
+
+    def views(self, trim: bool = False) -> Dict[Target, memoryview]:
+        """
+        Vue (sans copie) de chaque univers du front buffer, pour ArtNetSender.
+        trim=True → vue limitée aux canaux utilisés (paquets DMX plus courts).
+        """
+        return {t: memoryview(self.front[i, :self.lengths[i] if trim else 512])
+                for i, t in enumerate(self.targets)}
+
+    def require(self, channels: np.ndarray):
+        """Étend la longueur utile des univers pour couvrir ces canaux absolus (ex: cibles du patch)."""
+        for ch in np.asarray(channels).tolist():
+            row, off = divmod(ch, 512)
+            if row < len(self.targets):
+                self.lengths[row] = max(self.lengths[row], off + 1 + (off + 1) % 2)
+
+    def publish(self):
+        """Back → front (à appeler sous le verrou de réception ; ~64 Ko copiés)."""
+        np.copyto(self.front, self.frame)
+
+    def configure(self, universe: int, ranges: Iterable[Tuple[int, int, int, int]]) -> Optional[int]:
+        """
+        Applique un CONFIG: plages (s_idx, s_eid, e_idx, e_eid), index s_idx..e_idx ↔ entités s_eid..e_eid.
+        La nouvelle table est construite à part puis remplace l'ancienne d'une seule affectation
+        (les UPDATE en cours voient l'ancienne OU la nouvelle, jamais un mélange).
+        Retourne le nombre d'entités mappées, ou None si le CONFIG est identique au précédent.
+        Aucune plage → retour à la table Excel pour cet univers.
+        """
+        key = tuple(tuple(int(v) for v in r) for r in ranges)
+        if self._ranges.get(universe) == key:
+            return None
+        if not key:
+            self.tables.pop(universe, None)
+            self._ranges.pop(universe, None)
+            return self.mapped
+        table = np.full_like(self.channels, self.sink)
+        for s_idx, s_eid, e_idx, e_eid in key:
+            count = min(e_idx - s_idx, e_eid - s_eid) + 1
+            if count <= 0:
+                continue
+            idx = np.arange(s_idx, s_idx + count)
+            eid = np.arange(s_eid, s_eid + count)
+            ok = (idx < len(self.slots)) & (eid <= MAX_ENTITY_ID)
+            table[eid[ok]] = self.slots[idx[ok]]
+        self.tables[universe] = table
+        self._ranges[universe] = key
+        return int((table[:, 0] != self.sink).sum())
+
+    def apply(self, ents: np.ndarray, universe: Optional[int] = None):
+        """
+        Scatter d'un tableau ENTITY_DTYPE (parser.decode_entities) dans le framebuffer.
+        universe: univers eHuB de l'UPDATE → table du CONFIG reçu pour cet univers s'il y en a un.
+        """
+        if len(ents) == 0:
+            return
+        table = self.tables.get(universe, self.channels) if self.tables else self.channels
+        ids = ents["id"]
+        ch = table[ids]                                               # (n, 3)
+        vals = np.stack((ents["r"], ents["g"], ents["b"]), axis=1)
+        if table is self.channels and len(self.extra_eids):
+            sel = np.flatnonzero(self.has_extra[ids])
+            if sel.size:
+                # entités sur plusieurs lignes Excel : une ligne (canaux, valeurs) de plus par cible
+                lo = np.searchsorted(self.extra_eids, ids[sel], "left")
+                cnt = np.searchsorted(self.extra_eids, ids[sel], "right") - lo
+                pos = np.repeat(lo - np.cumsum(cnt) + cnt, cnt) + np.arange(cnt.sum())
+                ch = np.concatenate((ch, self.extra_channels[pos]))
+                vals = np.concatenate((vals, vals[np.repeat(sel, cnt)]))
+        changed = (self._flat[ch] != vals).any(axis=1)
+        if changed.any():
+            self._dirty[ch[changed, 0] // 512] = True
+            self._flat[ch] = vals
+
+class DeltaOutput:
+    """
+    Choix des univers à émettre à chaque tick d'envoi:
+      - univers modifiés (dirty) → envoyés au tick suivant
+      - univers inchangés → ré-émis seulement toutes les `keepalive` secondes
+        (garde l'anti-flicker: le contrôleur reçoit toujours un état récent)
+    keepalive <= 0 → tout est envoyé à chaque tick (comportement historique).
+    Compte aussi les paquets réellement émis pour afficher le débit sur le fil.
+    owned: masque des univers émis par CE processus (sortie répartie en shards) ; None = tous.
+    """
+    def __init__(self, n_targets: int, keepalive: float = 1.0, report_every: float = 10.0,
+                 owned: Optional[np.ndarray] = None):
+        self.n = n_targets
+        self.owned = None if owned is None else np.asarray(owned, dtype=bool)
+        self.keepalive = float(keepalive)
+        self.report_every = float(report_every)
+        self.last_sent = np.full(n_targets, -np.inf)
+        self._packets = 0
+        self._ticks = 0
+        self._t_report = time.monotonic()
+
+    def due(self, dirty: np.ndarray, now: float) -> np.ndarray:
+        """Masque des univers à envoyer maintenant ; remet leur flag dirty à False."""
+        if self.keepalive > 0:
+            mask = dirty | ((now - self.last_sent) >= self.keepalive)
+        else:
+            mask = np.ones(self.n, dtype=bool)
+        if self.owned is not None:
+            mask &= self.owned
+        dirty[mask] = False
+        self.last_sent[mask] = now
+        self._packets += int(mask.sum())
+        self._ticks += 1
+        return mask
+
+    def report(self, now: float) -> Optional[str]:
+        """Ligne de stats (paquets/s sur le fil vs plein débit) toutes les `report_every` s."""
+        elapsed = now - self._t_report
+        if self.report_every <= 0 or elapsed < self.report_every:
+            return None
+        rate = self._packets / elapsed
+        n = self.n if self.owned is None else int(self.owned.sum())
+        full = n * self._ticks / elapsed
+        saved = 100.0 * (1.0 - rate / full) if full > 0 else 0.0
+        self._packets = 0
+        self._ticks = 0
+        self._t_report = now
+        return f"📶 ArtNet: {rate:.0f} paquets/s (plein débit {full:.0f}/s, économie {saved:.0f}%)"
@@ -0,0 +1,107 @@
+# receiver/frame_assembler.py
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from parser import Entities
+from udp_ingest import Sender
+
+Chunk = Tuple[int, Optional[Entities]]  # (univers eHuB = index de chunk côté fakers, entités ; None = doublon déjà appliqué)
+
+@dataclass
+class SourceStats:
+    frames: int = 0        # frames validées
+    partial: int = 0       # frames validées avec des chunks manquants
+    missing: int = 0       # chunks manquants (cumul)
+    out_of_order: int = 0  # chunks arrivés après un chunk d'index supérieur
+    timeouts: int = 0      # frames validées par timeout
+
+class _Pending:
+    def __init__(self):
+        self.chunks: Dict[int, Entities] = {}
+        self.t_first = 0.0
+        self.t_last = 0.0
+        self.last_index = -1
+        self.sizes: Deque[int] = deque(maxlen=8)  # nb de chunks des dernières frames
+        self.stats = SourceStats()
+
+    @property
+    def expected(self) -> int:
+        """Nb de chunks attendu par frame (appris sur les dernières frames, 0 = inconnu)."""
+        return max(self.sizes) if self.sizes else 0
+
+class FrameAssembler:
+    """
+    Regroupe les UPDATE découpés en chunks (image_player, stars_player: octet
+    `universe` = index de chunk 0..k-1) en frames complètes, par émetteur (IP, port):
+      - un chunk 0 (ou un index déjà reçu) ouvre une nouvelle frame et valide la précédente
+      - dès que les `expected` chunks sont là, la frame est validée sans attendre
+        (`expected` = taille max des 8 dernières frames → 1 UPDATE/frame = aucun délai) ;
+        une frame plus courte est validée au chunk 0 suivant. Les fakers du dépôt ne
+        réduisent jamais leur nb de chunks en cours de flux (UpdateEncoder) : une frame
+        plus longue n'arrive qu'à la hausse du découpage, le temps que `expected` l'apprenne
+      - frame incomplète depuis `timeout` s → validée telle quelle (poll())
+    `commit(chunks)` reçoit tous les chunks d'une frame d'un coup : le routeur les
+    applique sous une seule prise de verrou → le sender ne voit jamais un mur à moitié à jour.
+    Clé = (IP, port) : les fakers gardent une socket par flux (UdpTransport), deux
+    émetteurs d'une même machine (web UI + script send_update*, Unity + faker) ne se
+    coupent pas leurs frames. Un émetteur inactif depuis FORGET_AFTER s est oublié.
+    Optionnel (routeur : --assemble) : un émetteur eHuB qui envoie de vrais numéros
+    d'univers (Unity) ne commence pas à 0 → chaque frame attendrait le timeout.
+    """
+    FORGET_AFTER = 60.0  # s sans paquet avant d'oublier un émetteur (ports éphémères)
+
+    def __init__(self, commit: Callable[[List[Chunk]], None], timeout: float = 0.05):
+        self.commit = commit
+        self.timeout = float(timeout)
+        self._sources: Dict[Sender, _Pending] = {}
+
+    def push(self, src: Sender, universe: int, ents: Optional[Entities], now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        st = self._sources.get(src)
+        if st is None:
+            st = self._sources[src] = _Pending()
+        if st.chunks and (universe == 0 or universe in st.chunks):
+            # début de la frame suivante : la précédente est terminée
+            self._flush(st)
+        st.t_last = now
+        if not st.chunks:
+            st.t_first = now
+        elif universe < st.last_index:
+            st.stats.out_of_order += 1
+        st.chunks[universe] = ents
+        st.last_index = universe
+        n = st.expected
+        if n and len(st.chunks) >= n and all(i in st.chunks for i in range(n)):
+            self._flush(st)
+
+    def poll(self, now: Optional[float] = None):
+        """Valide les frames incomplètes plus vieilles que `timeout` (à appeler régulièrement)."""
+        now = time.monotonic() if now is None else now
+        for src, st in list(self._sources.items()):
+            if st.chunks and now - st.t_first >= self.timeout:
+                st.stats.timeouts += 1
+                self._flush(st)
+            elif not st.chunks and now - st.t_last >= self.FORGET_AFTER:
+                del self._sources[src]
+
+    def _flush(self, st: _Pending):
+        chunks = sorted(st.chunks.items())
+        missing = max(st.expected, chunks[-1][0] + 1) - len(chunks)
+        st.sizes.append(chunks[-1][0] + 1)  # taille apprise (index max + 1)
+        st.stats.frames += 1
+        if missing > 0:
+            st.stats.partial += 1
+            st.stats.missing += missing
+        st.chunks = {}
+        st.last_index = -1
+        self.commit(chunks)
+
+    def stats(self) -> Dict[Sender, SourceStats]:
+        return {src: st.stats for src, st in self._sources.items()}
+
+    def report(self) -> List[str]:
+        """Une ligne par source (compteurs cumulés depuis le démarrage)."""
+        return [f"🧱 frames {src[0]}:{src[1]}: {s.frames} ({s.partial} partielles, {s.missing} chunks manquants, "
+                f"{s.out_of_order} hors ordre, {s.timeouts} timeouts) — {st.expected or '?'} chunk(s)/frame"
+                for src, st in self._sources.items() for s in (st.stats,)]
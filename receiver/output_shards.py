@@ -0,0 +1,86 @@
+# receiver/output_shards.py
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+Target = Tuple[str, int]  # (ip, universe)
+
+def assign_shards(targets: Iterable[Target], n_shards: int) -> List[List[str]]:
+    """
+    Répartit les IP contrôleurs sur `n_shards` processus d'envoi : une IP (et tous
+    ses univers) appartient à un seul shard ; plus gros contrôleurs d'abord, chacun
+    sur le shard le moins chargé (en univers). Jamais plus de shards que d'IP.
+    """
+    counts = Counter(ip for ip, _ in targets)
+    shards: List[List[str]] = [[] for _ in range(max(1, min(int(n_shards), len(counts))))]
+    load = [0] * len(shards)
+    for ip, n in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0])):
+        k = load.index(min(load))
+        shards[k].append(ip)
+        load[k] += n
+    return shards
+
+class _Worker:
+    def __init__(self, name: str, target: Callable, args: tuple):
+        self.name = name
+        self.target = target
+        self.args = args
+        self.proc = None
+        self.restarts = 0
+        self.backoff = 0.0
+        self.t_dead: Optional[float] = None
+
+class WorkerSupervisor:
+    """
+    Superviseur des processus d'envoi : check() (à appeler régulièrement) relance
+    un worker mort après `restart_delay` s, délai doublé à chaque crash rapproché
+    (plafonné à `max_delay`) pour ne pas boucler sur un worker qui meurt au démarrage.
+    Un worker qui tient `stable_after` s remet son délai à zéro.
+    """
+    def __init__(self, ctx, restart_delay: float = 1.0, max_delay: float = 30.0, stable_after: float = 60.0):
+        self.ctx = ctx
+        self.restart_delay = float(restart_delay)
+        self.max_delay = float(max_delay)
+        self.stable_after = float(stable_after)
+        self.workers: Dict[str, _Worker] = {}
+        self._t_start: Dict[str, float] = {}
+
+    def add(self, name: str, target: Callable, args: tuple):
+        self.workers[name] = _Worker(name, target, args)
+
+    def _spawn(self, w: _Worker):
+        w.proc = self.ctx.Process(target=w.target, args=w.args, name=w.name, daemon=True)
+        w.proc.start()
+        w.t_dead = None
+        self._t_start[w.name] = time.monotonic()
+
+    def start(self):
+        for w in self.workers.values():
+            self._spawn(w)
+
+    def check(self) -> List[str]:
+        """Relance les workers morts dont le délai est écoulé ; retourne les messages à afficher."""
+        msgs: List[str] = []
+        now = time.monotonic()
+        for w in self.workers.values():
+            if w.proc.is_alive():
+                if w.backoff and now - self._t_start[w.name] >= self.stable_after:
+                    w.backoff = 0.0
+                continue
+            if w.t_dead is None:
+                w.t_dead = now
+                w.backoff = min(self.max_delay, w.backoff * 2 or self.restart_delay)
+                msgs.append(f"💥 {w.name} arrêté (code {w.proc.exitcode}) → relance dans {w.backoff:g} s")
+            elif now - w.t_dead >= w.backoff:
+                w.restarts += 1
+                self._spawn(w)
+                msgs.append(f"🔁 {w.name} relancé ({w.restarts} relance(s))")
+        return msgs
+
+    def stop(self):
+        for w in self.workers.values():
+            if w.proc is not None and w.proc.is_alive():
+                w.proc.terminate()
+        for w in self.workers.values():
+            if w.proc is not None:
+                w.proc.join()
@@ -1,9 +1,15 @@
-import struct, gzip
+import struct, zlib
 from dataclasses import dataclass
-from typing import List, Tuple, Optional, Union
+from typing import Iterator, List, Tuple, Optional, Union
+import numpy as np
 
 MAGIC = b"eHuB"
 
+# Entité UPDATE telle qu'elle est sur le fil : <HBBBB = (id, r, g, b, w), 6 octets
+ENTITY_DTYPE = np.dtype([("id", "<u2"), ("r", "u1"), ("g", "u1"), ("b", "u1"), ("w", "u1")])
+
+Entities = Union[List[Tuple[int,int,int,int,int]], np.ndarray]
+
 @dataclass
 class ConfigFrame:
     universe: int
@@ -12,24 +18,78 @@ class ConfigFrame:
 @dataclass
 class UpdateFrame:
     universe: int
-    entities: List[Tuple[int,int,int,int,int]]  # (id, r, g, b, w)
+    entities: Entities  # liste de (id, r, g, b, w) ou tableau structuré ENTITY_DTYPE
 
-def parse_packet(data: bytes) -> Tuple[Optional[Union[ConfigFrame, UpdateFrame]], Optional[str]]:
-    if len(data) < 10 or data[:4] != MAGIC:
-        return None, "bad_magic_or_too_short"
+def decode_entities(payload: bytes) -> np.ndarray:
+    """
+    Vue NumPy (sans copie) sur le payload UPDATE décompressé.
+    Colonnes: id, r, g, b, w. Un éventuel reliquat < 6 octets est ignoré.
+    """
+    n = len(payload) // ENTITY_DTYPE.itemsize
+    return np.frombuffer(payload, dtype=ENTITY_DTYPE, count=n)
+
+# décompresseur gzip (wbits=31 : entête + CRC32/ISIZE vérifiés par zlib) créé une fois ;
+# chaque paquet en prend une copie neuve (copy() évite la réinitialisation, sûr entre threads)
+_GUNZIP = zlib.decompressobj(31)
+
+def gunzip(comp) -> bytes:
+    """
+    Payload gzip d'un paquet → octets ; zlib.error si corrompu ou tronqué.
+    Plusieurs membres gzip concaténés sont tous décodés (comme gzip.decompress).
+    """
+    d = _GUNZIP.copy()
+    out = d.decompress(comp)
+    if not d.eof:
+        raise zlib.error("flux gzip tronqué")
+    while d.unused_data:  # membre suivant
+        rest = d.unused_data
+        d = _GUNZIP.copy()
+        out += d.decompress(rest)
+        if not d.eof:
+            raise zlib.error("flux gzip tronqué")
+    return out
+
+def iter_entities(ents: Entities) -> Iterator[Tuple[int,int,int,int,int]]:
+    """Itère (id, r, g, b, w) quel que soit le mode de décodage (liste ou tableau)."""
+    if isinstance(ents, np.ndarray):
+        return zip(ents["id"].tolist(), ents["r"].tolist(), ents["g"].tolist(),
+                   ents["b"].tolist(), ents["w"].tolist())
+    return iter(ents)
 
-    p = 4
-    pkt_type = data[p]; p += 1
-    universe  = data[p]; p += 1
-    count     = struct.unpack_from("<H", data, p)[0]; p += 2
-    comp_len  = struct.unpack_from("<H", data, p)[0]; p += 2
+HEADER_LEN = 10  # MAGIC + type + universe + count u16 + comp_len u16
 
-    if len(data) < p + comp_len:
+@dataclass
+class PacketHeader:
+    type: int        # 1 = CONFIG, 2 = UPDATE
+    universe: int
+    count: int
+    comp_len: int
+
+def parse_header(data: bytes) -> Tuple[Optional[PacketHeader], Optional[str]]:
+    """
+    Entête seul (10 octets, sans décompression) : permet de trier / dédupliquer
+    un paquet avant de payer gzip. Le payload compressé est data[HEADER_LEN:HEADER_LEN+comp_len].
+    """
+    if len(data) < HEADER_LEN or data[:4] != MAGIC:
+        return None, "bad_magic_or_too_short"
+    count, comp_len = struct.unpack_from("<HH", data, 6)
+    if len(data) < HEADER_LEN + comp_len:
         return None, "truncated_payload"
+    return PacketHeader(data[4], data[5], count, comp_len), None
+
+def parse_packet(data: bytes, as_array: bool = False) -> Tuple[Optional[Union[ConfigFrame, UpdateFrame]], Optional[str]]:
+    """
+    as_array=False : UPDATE.entities = liste de tuples (mode historique)
+    as_array=True  : UPDATE.entities = tableau structuré ENTITY_DTYPE (aucun objet par entité)
+    """
+    hdr, err = parse_header(data)
+    if err:
+        return None, err
+    pkt_type, universe = hdr.type, hdr.universe
 
-    comp_payload = data[p:p+comp_len]
+    comp_payload = data[HEADER_LEN:HEADER_LEN + hdr.comp_len]
     try:
-        payload = gzip.decompress(comp_payload)
+        payload = gunzip(comp_payload)
     except Exception as e:
         return None, f"gzip_error:{e}"
 
@@ -43,6 +103,8 @@ def parse_packet(data: bytes) -> Tuple[Optional[Union[ConfigFrame, UpdateFrame]]
         return ConfigFrame(universe, ranges), None
 
     elif pkt_type == 2:  # UPDATE
+        if as_array:
+            return UpdateFrame(universe, decode_entities(payload)), None
         ents = []
         off = 0
         while off + 6 <= len(payload):
@@ -1,15 +1,73 @@
 # receiver/patch_map.py
 from __future__ import annotations
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Sequence
 import csv, os
+import numpy as np
 
-# mapping: (ip, universe) -> { from_channel: [to_channels...] }
-PatchTable = Dict[Tuple[str, int], Dict[int, List[int]]]
+Target = Tuple[str, int]  # (ip, universe)
 
-def load_patch_csv(path: Optional[str]) -> PatchTable:
-    table: PatchTable = {}
+# règle: (ip, univers, canal source) -> (ip, univers, canal cible), canaux 1-indexés
+PatchRule = Tuple[str, int, int, str, int, int]
+
+class CompiledPatch:
+    """
+    Patch-map compilé pour un framebuffer (n_univers x 512) dont l'ordre des
+    lignes est `targets`. Les règles deviennent deux tableaux d'index absolus:
+      gather  = canaux source, scatter = canaux cible
+    appliqués EN PLACE dans le buffer de sortie (une lecture + une écriture
+    vectorisées, coût quasi constant quel que soit le nombre de règles).
+    Les sources sont toutes lues avant d'écrire : même résultat qu'une copie patchée.
+    """
+    def __init__(self, rules: Sequence[PatchRule], targets: Sequence[Target]):
+        index: Dict[Target, int] = {t: i for i, t in enumerate(targets)}
+        # regroupement par canal source (ordre de 1re apparition) : en cas de cibles
+        # en double, la dernière écriture gagne comme avec l'ancien apply_patch
+        by_src: Dict[Tuple[str, int, int], List[PatchRule]] = {}
+        for rule in rules:
+            by_src.setdefault(rule[:3], []).append(rule)
+        src: List[int] = []
+        dst: List[int] = []
+        self.ignored = 0
+        for ip, uni, s_ch, to_ip, to_uni, d_ch in (r for group in by_src.values() for r in group):
+            s_row = index.get((ip, uni))
+            d_row = index.get((to_ip, to_uni))
+            # DMX terrain = 1-indexé ; univers non alloués par le routeur → règle ignorée
+            if s_row is None or d_row is None or not (1 <= s_ch <= 512 and 1 <= d_ch <= 512):
+                self.ignored += 1
+                continue
+            src.append(s_row * 512 + s_ch - 1)
+            dst.append(d_row * 512 + d_ch - 1)
+        self.rules = len(src)
+        self.gather = np.array(src, dtype=np.intp)
+        self.scatter = np.array(dst, dtype=np.intp)
+
+        # dépendances inter-univers : si la source change, la cible doit repartir
+        pairs = {(s // 512, d // 512) for s, d in zip(src, dst) if s // 512 != d // 512}
+        self.dep_src = np.array([p[0] for p in pairs], dtype=np.intp)
+        self.dep_dst = np.array([p[1] for p in pairs], dtype=np.intp)
+
+    def __bool__(self) -> bool:
+        return self.rules > 0
+
+    def apply(self, frame: np.ndarray):
+        """Applique le patch en place dans `frame` (n_univers x 512, contigu)."""
+        if self.rules:
+            flat = frame.reshape(-1)
+            flat[self.scatter] = flat[self.gather]
+
+    def propagate_dirty(self, dirty: np.ndarray):
+        """Marque dirty les univers cibles dont un univers source a changé."""
+        if self.dep_src.size:
+            dirty[self.dep_dst[dirty[self.dep_src]]] = True
+
+def read_patch_csv(path: Optional[str]) -> List[PatchRule]:
+    """
+    Colonnes: ip,universe,from_channel,to_channel[,to_ip,to_universe]
+    to_ip / to_universe absents ou vides → même univers (patch historique).
+    """
+    rules: List[PatchRule] = []
     if not path or not os.path.isfile(path):
-        return table
+        return rules
     with open(path, newline="", encoding="utf-8") as f:
         rd = csv.DictReader(f)
         for row in rd:
@@ -17,24 +75,11 @@ def load_patch_csv(path: Optional[str]) -> PatchTable:
             uni = int(row["universe"])
             src = int(row["from_channel"])
             dst = int(row["to_channel"])
-            key = (ip, uni)
-            table.setdefault(key, {}).setdefault(src, []).append(dst)
-    return table
-
-def apply_patch(ip: str, uni: int, dmx: bytearray, patch: PatchTable) -> bytearray:
-    """Duplique les valeurs de channels source vers cibles. Retourne une copie patchée."""
-    if not patch:
-        return dmx
-    key = (ip, uni)
-    if key not in patch:
-        return dmx
-    out = bytearray(dmx)  # copie
-    for src_ch, dst_list in patch[key].items():
-        i = src_ch - 1  # DMX terrain = 1-indexé
-        if 0 <= i < 512:
-            val = dmx[i]
-            for dst in dst_list:
-                j = dst - 1
-                if 0 <= j < 512:
-                    out[j] = val
-    return out
+            to_ip = str(row.get("to_ip") or "").strip() or ip
+            to_uni = str(row.get("to_universe") or "").strip()
+            rules.append((ip, uni, src, to_ip, int(to_uni) if to_uni else uni, dst))
+    return rules
+
+def load_patch_csv(path: Optional[str], targets: Sequence[Target]) -> CompiledPatch:
+    """Lit patch.csv et le compile pour l'ordre d'univers `targets` du framebuffer."""
+    return CompiledPatch(read_patch_csv(path), targets)
@@ -1,41 +1,137 @@
 # receiver/router_all_bands.py
 import os, sys, socket
 from typing import Dict, Tuple, List
-import pandas as pd
+import numpy as np
 
 # Import artnet
 HERE = os.path.dirname(__file__)
 ARTNET_DIR = os.path.abspath(os.path.join(HERE, "..", "artnet"))
-if ARTNET_DIR not in sys.path:
-    sys.path.insert(0, ARTNET_DIR)
+COMMON_DIR = os.path.abspath(os.path.join(HERE, "..", "common"))
+for _d in (ARTNET_DIR, COMMON_DIR):
+    if _d not in sys.path:
+        sys.path.insert(0, _d)
 
-from parser import parse_packet, UpdateFrame, ConfigFrame
+from parser import parse_packet, iter_entities, UpdateFrame, ConfigFrame
 from artnet import ArtNetSender
+from mapping_cache import load_mapping
 
 MappingRow = Tuple[int,int,str,int]  # (entity_start, entity_end, ip, universe)
 
 def load_all_from_excel(xlsx_path: str) -> List[MappingRow]:
-    df = pd.read_excel(xlsx_path, sheet_name="eHuB")
-    df = df.rename(columns={
-        "Entity Start": "entity_start",
-        "Entity End": "entity_end",
-        "ArtNet IP": "ip",
-        "ArtNet Universe": "universe",
-        "Name": "name",
-    })
-    # Garder les univers LEDs 0..127 (ignorer le projecteur 200)
-    df = df[(df["universe"] >= 0) & (df["universe"] <= 127)].copy()
-    rows: List[MappingRow] = []
-    for _, r in df.iterrows():
-        rows.append((int(r["entity_start"]), int(r["entity_end"]), str(r["ip"]), int(r["universe"])))
+    # Univers LEDs 0..127 (projecteur 200 ignoré), lus depuis l'artefact mapping compilé
+    rows: List[MappingRow] = [(a, b, ip, uni) for _, a, b, ip, uni in load_mapping(xlsx_path).led_rows()]
     # Tri par entity_start pour des recherches plus propres
     rows.sort(key=lambda x: x[0])
     return rows
 
-def run_router_all_bands(excel_path: str, listen_ip="0.0.0.0", listen_port=50000):
+LEDS_PER_ROW = 170  # 512 canaux / 3 → entités au-delà ignorées (ch + 2 >= 512)
+
+class LinearIndex:
+    """Recherche historique: pour chaque entité, 1re ligne (triée par start) qui la contient. O(entités x lignes)."""
+    def __init__(self, mappings: List[MappingRow]):
+        self.mappings = mappings
+        self.targets: List[Tuple[str,int]] = list(dict.fromkeys((ip, uni) for _, _, ip, uni in mappings))
+        self._row = {t: i for i, t in enumerate(self.targets)}
+
+    def apply(self, ents, frame: np.ndarray) -> np.ndarray:
+        touched = np.zeros(len(self.targets), dtype=bool)
+        for (eid, r, g, b, w) in iter_entities(ents):
+            for (start, end, ip, uni) in self.mappings:
+                if start <= eid <= end:
+                    row = self._row[(ip, uni)]
+                    ch = (eid - start) * 3   # 3 canaux/entité (R,G,B)
+                    if ch + 2 < 512:
+                        frame[row, ch:ch+3] = (r, g, b)
+                        touched[row] = True
+                    break  # eid mappé → passe à l'entité suivante
+        return touched
+
+class RangeIndex:
+    """
+    Index d'intervalles précalculé (même résultat que LinearIndex):
+      - les bornes de toutes les plages découpent l'axe des ids en segments
+        élémentaires ; chaque segment appartient à la 1re ligne qui le couvre
+      - UPDATE aux ids croissants (cas des fakers) : découpé en morceaux contigus
+        (trous dans les ids + bornes de segment), une recherche et UNE copie de
+        tranche par morceau
+      - sinon : searchsorted vectorisé par entité (id → segment → ligne → canal) + scatter
+    Coût ~ O(entités + morceaux x log(lignes)) au lieu de O(entités x lignes).
+    """
+    def __init__(self, mappings: List[MappingRow]):
+        self.targets: List[Tuple[str,int]] = list(dict.fromkeys((ip, uni) for _, _, ip, uni in mappings))
+        index = {t: i for i, t in enumerate(self.targets)}
+        # plages start > end: jamais atteintes par start <= eid <= end (comme la recherche linéaire)
+        rows = [m for m in mappings if m[0] <= m[1]]
+        starts = np.array([m[0] for m in rows], dtype=np.int64)
+        ends = np.array([m[1] for m in rows], dtype=np.int64)
+        self.bounds = np.unique(np.concatenate((starts, ends + 1)))
+        owner = np.full(max(0, len(self.bounds) - 1), -1, dtype=np.int64)
+        # parcours inverse : la 1re ligne (start le plus petit) écrit en dernier → elle gagne
+        for i in range(len(rows) - 1, -1, -1):
+            lo, hi = np.searchsorted(self.bounds, (starts[i], ends[i] + 1))
+            owner[lo:hi] = i
+        self.owner = owner
+        self.row_start = starts
+        self.row_target = np.array([index[(ip, uni)] for _, _, ip, uni in rows], dtype=np.int64)
+
+    def locate(self, ids: np.ndarray):
+        """ids → (masque mappé, ligne Excel, canal absolu dans le framebuffer n_univers x 512)."""
+        ids = ids.astype(np.int64)
+        seg = np.searchsorted(self.bounds, ids, side="right") - 1
+        in_range = (seg >= 0) & (seg < len(self.owner))
+        row = np.where(in_range, self.owner[np.clip(seg, 0, len(self.owner) - 1)], -1)
+        safe = np.maximum(row, 0)
+        pos = ids - self.row_start[safe]
+        ok = (row >= 0) & (pos < LEDS_PER_ROW)
+        return ok, row, self.row_target[safe] * 512 + pos * 3
+
+    def apply(self, ents: np.ndarray, frame: np.ndarray) -> np.ndarray:
+        """Écrit un tableau ENTITY_DTYPE dans `frame` (persistant) ; retourne le masque des univers touchés."""
+        touched = np.zeros(len(self.targets), dtype=bool)
+        if len(ents) == 0 or len(self.owner) == 0:
+            return touched
+        ids = ents["id"].astype(np.int64)
+        rgb = np.stack((ents["r"], ents["g"], ents["b"]), axis=1)
+        step = np.diff(ids)
+        if not (step > 0).all():
+            # ids non triés : recherche par entité + scatter
+            ok, row, ch = self.locate(ids)
+            ch, rgb = ch[ok], rgb[ok]
+            flat = frame.reshape(-1)
+            flat[ch] = rgb[:, 0]
+            flat[ch + 1] = rgb[:, 1]
+            flat[ch + 2] = rgb[:, 2]
+            touched[self.row_target[np.unique(row[ok])]] = True
+            return touched
+
+        # ids croissants : coupures = trous dans les ids + franchissements de bornes de segment,
+        # puis UNE recherche par morceau (et non par entité) et une copie de tranche par morceau
+        n = len(ids)
+        cuts = np.union1d(np.flatnonzero(step != 1) + 1, np.searchsorted(ids, self.bounds))
+        cuts = cuts[(cuts > 0) & (cuts < n)]
+        first = np.concatenate(([0], cuts))
+        last = np.concatenate((cuts, [n]))
+        ok, row, ch = self.locate(ids[first])
+        pos = (ch % 512) // 3
+        length = np.minimum(last - first, LEDS_PER_ROW - pos)
+        ok &= length > 0
+        flat = frame.reshape(-1)
+        for i, c, k in zip(first[ok].tolist(), ch[ok].tolist(), length[ok].tolist()):
+            flat[c:c + 3 * k] = rgb[i:i + k].reshape(-1)
+        touched[self.row_target[row[ok]]] = True
+        return touched
+
+INDEXES = {"range": RangeIndex, "linear": LinearIndex}
+
+def run_router_all_bands(excel_path: str, listen_ip="0.0.0.0", listen_port=50000, index: str = "range"):
     mappings = load_all_from_excel(excel_path)
     print(f"🛰️ eHuB listening on {listen_ip}:{listen_port}")
-    print(f"🗺️  Loaded {len(mappings)} mapping rows from Excel")
+    print(f"🗺️  Loaded {len(mappings)} mapping rows from Excel (index={index})")
+
+    router = INDEXES[index](mappings)
+    # Buffers DMX persistants par (ip, universe) : un univers partiellement mis à jour garde le reste
+    frame = np.zeros((len(router.targets), 512), dtype=np.uint8)
+    views = [memoryview(frame[i]) for i in range(len(router.targets))]
 
     # Prépare un sender par IP (on réutilise pour éviter de recréer des sockets)
     senders: Dict[str, ArtNetSender] = {}
@@ -45,43 +141,26 @@ def run_router_all_bands(excel_path: str, listen_ip="0.0.0.0", listen_port=50000
 
     while True:
         data, addr = sock.recvfrom(65535)
-        frame, err = parse_packet(data)
+        frame_in, err = parse_packet(data, as_array=True)
         if err:
             continue
 
-        if isinstance(frame, ConfigFrame):
+        if isinstance(frame_in, ConfigFrame):
             # Info : la vraie reconstruction index→entity viendra plus tard si besoin
-            print(f"🧩 CONFIG u={frame.universe} ranges={len(frame.ranges)}")
+            print(f"🧩 CONFIG u={frame_in.universe} ranges={len(frame_in.ranges)}")
             continue
 
-        if isinstance(frame, UpdateFrame):
-            # Buffers DMX par (ip, universe)
-            dmx_by_target: Dict[Tuple[str,int], bytearray] = {}
-
-            # Parcours des entités reçues
-            for (eid, r, g, b, w) in frame.entities:
-                # Trouver la/les plages qui contiennent eid (normalement 1 seule)
-                # (Approche simple O(n); suffisant pour démarrer. On optimisera après.)
-                for (start, end, ip, uni) in mappings:
-                    if start <= eid <= end:
-                        key = (ip, uni)
-                        if key not in dmx_by_target:
-                            dmx_by_target[key] = bytearray(512)  # 512 canaux DMX
-                        dmx = dmx_by_target[key]
-                        idx = eid - start      # index 0-based dans cette plage
-                        ch = idx * 3           # 3 canaux/entité (R,G,B)
-                        if ch + 2 < 512:
-                            dmx[ch+0] = r
-                            dmx[ch+1] = g
-                            dmx[ch+2] = b
-                        break  # eid mappé → passe à l'entité suivante
+        if isinstance(frame_in, UpdateFrame):
+            touched = router.apply(frame_in.entities, frame)
 
             # Envoi ArtNet pour tous les univers touchés
-            for (ip, uni), dmx in dmx_by_target.items():
+            rows = np.flatnonzero(touched).tolist()
+            for i in rows:
+                ip, uni = router.targets[i]
                 if ip not in senders:
                     senders[ip] = ArtNetSender(ip)
-                senders[ip].send_dmx(uni, dmx)
+                senders[ip].send_dmx(uni, views[i])
 
-            if dmx_by_target:
-                touched = ", ".join([f"{ip}/u{uni}" for (ip, uni) in dmx_by_target.keys()])
-                print(f"📦 UPDATE → {touched} (entities={len(frame.entities)})")
+            if rows:
+                touched_txt = ", ".join([f"{router.targets[i][0]}/u{router.targets[i][1]}" for i in rows])
+                print(f"📦 UPDATE → {touched_txt} (entities={len(frame_in.entities)})")
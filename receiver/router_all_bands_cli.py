@@ -7,8 +7,10 @@ def main():
     ap.add_argument("--excel", default="faker/Ecran (2).xlsx")
     ap.add_argument("--listen_ip", default="0.0.0.0")
     ap.add_argument("--listen_port", type=int, default=50000)
+    ap.add_argument("--index", choices=["range", "linear"], default="range",
+                    help="Recherche entité → univers: index d'intervalles (défaut) ou parcours linéaire historique")
     args = ap.parse_args()
-    run_router_all_bands(args.excel, args.listen_ip, args.listen_port)
+    run_router_all_bands(args.excel, args.listen_ip, args.listen_port, args.index)
 
 if __name__ == "__main__":
     main()
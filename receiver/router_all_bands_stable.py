@@ -1,66 +1,115 @@
 # receiver/router_all_bands_stable.py
 import os, sys, socket, threading, time
 from typing import Dict, Tuple, List
-import pandas as pd
 
 # Import artnet
 HERE = os.path.dirname(__file__)
 ARTNET_DIR = os.path.abspath(os.path.join(HERE, "..", "artnet"))
-if ARTNET_DIR not in sys.path:
-    sys.path.insert(0, ARTNET_DIR)
+COMMON_DIR = os.path.abspath(os.path.join(HERE, "..", "common"))
+for _d in (ARTNET_DIR, COMMON_DIR):
+    if _d not in sys.path:
+        sys.path.insert(0, _d)
 
 from parser import parse_packet, UpdateFrame, ConfigFrame
-from artnet import ArtNetSender
+from artnet_batch import ArtNetTransmitter
+from frame_clock import FrameScheduler
+from mapping_cache import load_mapping
+from dmx_framebuffer import DmxFramebuffer, DeltaOutput
 
 Target = Tuple[str, int]  # (ip, universe)
 
 class StableRouter:
-    def __init__(self, excel_path: str, listen_ip="0.0.0.0", listen_port=50000, send_fps=40.0):
+    """
+    Routeur "stable": maintient le dernier état de chaque univers et le ré-émet à FPS fixe.
+    Positionnement COMPACT par ligne Excel (entité i de la ligne → canaux 3i..3i+2),
+    compilé une seule fois en table directe entité → canaux (DmxFramebuffer) :
+    un UPDATE = une écriture vectorisée, plus aucun dict reconstruit par paquet.
+    La table n'est recompilée que si l'Excel change (mtime surveillé), dans un
+    thread à part, puis échangée atomiquement sous le verrou. Un CONFIG eHuB
+    remplace seulement la table entité → canaux de son univers (DmxFramebuffer.configure).
+    """
+    def __init__(self, excel_path: str, listen_ip="0.0.0.0", listen_port=50000, send_fps=40.0,
+                 keepalive: float = 1.0, stats_every: float = 10.0, watch_every: float = 2.0):
+        self.excel_path = excel_path
         self.listen_ip = listen_ip
         self.listen_port = listen_port
         self.send_interval = 1.0 / max(1e-3, send_fps)
+        self.clock = FrameScheduler(send_fps, report_every=stats_every)
+        self.keepalive = keepalive
+        self.stats_every = stats_every
+        self.watch_every = float(watch_every)   # s entre 2 vérifications du mtime de l'Excel (0 = off)
 
         # Charge Excel et prépare l'index compacté (PAS de ch = (eid-start)*3)
         self.row_entities: Dict[Target, List[int]] = {}   # pour chaque (ip,uni) : [eid0,eid1,...] compactés
         self.targets: List[Target] = []
-        self._build_compact_index(excel_path)
-
-        # Dernier état DMX pour chaque cible
-        self.dmx_by_target: Dict[Target, bytearray] = {t: bytearray(512) for t in self.targets}
         self._lock = threading.Lock()
+        self.configs: Dict[int, list] = {}                # univers eHuB → plages du dernier CONFIG
+        self._install(self._build_compact_index(excel_path))
 
-        # ArtNet senders (un par IP)
-        self.senders: Dict[str, ArtNetSender] = {}
+        # émission ArtNet par frame sur un pool de sockets partagé
+        self.tx = ArtNetTransmitter()
 
-    def _build_compact_index(self, excel_path: str):
-        df = pd.read_excel(excel_path, sheet_name="eHuB")
-        df = df.rename(columns={
-            "Entity Start": "entity_start",
-            "Entity End": "entity_end",
-            "ArtNet IP": "ip",
-            "ArtNet Universe": "universe",
-            "Name": "name",
-        })
-        # garder seulement les univers 0..127 (LEDs), ignorer 200 (projecteur)
-        df = df[(df["universe"] >= 0) & (df["universe"] <= 127)].copy()
+    def _build_compact_index(self, excel_path: str) -> DmxFramebuffer:
+        self._excel_mtime = os.path.getmtime(excel_path)
+        row_entities: Dict[Target, List[int]] = {}
+        targets: List[Target] = []
         # IMPORTANT : on construit une liste COMPACTE d'entités par ligne (0,1,2,...)
-        for _, r in df.iterrows():
-            a, b = int(r["entity_start"]), int(r["entity_end"])
-            ip, uni = str(r["ip"]), int(r["universe"])
+        # lignes LEDs 0..127 (projecteur 200 ignoré) ; si start > end, on corrige
+        for _, a, b, ip, uni in load_mapping(excel_path).led_rows():
             target: Target = (ip, uni)
-
-            # si start > end, on corrige, puis on crée la plage CONTIGUË
-            if a <= b:
-                ids = list(range(a, b + 1))
-            else:
-                ids = list(range(b, a + 1))
-
-            self.row_entities[target] = ids
-            self.targets.append(target)
+            row_entities[target] = list(range(min(a, b), max(a, b) + 1))
+            targets.append(target)
 
         # dédoublonner l’ordre des cibles
-        self.targets = sorted(list(set(self.targets)), key=lambda t: (t[0], t[1]))
-        print(f"🗺️  Index prêt : {len(self.targets)} univers, compactage par ligne Excel activé.")
+        targets = sorted(list(set(targets)), key=lambda t: (t[0], t[1]))
+        # table directe entité → (univers, canal) ; une entité présente sur plusieurs lignes
+        # est écrite sur toutes ses cibles (1re = table principale, suivantes = `extra`)
+        lookup: Dict[int, Tuple[Target, int]] = {}
+        extra: List[Tuple[int, Tuple[Target, int]]] = []
+        for target, ids in row_entities.items():
+            for pos, eid in enumerate(ids):
+                if eid in lookup:
+                    extra.append((eid, (target, pos * 3)))
+                else:
+                    lookup[eid] = (target, pos * 3)  # RGB compacté
+        self.row_entities = row_entities
+        print(f"🗺️  Index prêt : {len(targets)} univers, {len(lookup)} entités, compactage par ligne Excel activé.")
+        if extra:
+            print(f"⚠️ {len({e for e, _ in extra})} entité(s) présente(s) sur plusieurs lignes Excel : "
+                  f"écrite(s) sur chacune de leurs {len(extra) + len({e for e, _ in extra})} cibles")
+        return DmxFramebuffer(targets, lookup, "RGB", extra)
+
+    def _install(self, fb: DmxFramebuffer):
+        """Échange atomique du mapping ; l'état des univers conservés est repris, tout repart au tick suivant."""
+        with self._lock:
+            old = getattr(self, "fb", None)
+            if old is not None:
+                for t, i in fb.index.items():
+                    j = old.index.get(t)
+                    if j is not None:
+                        fb.frame[i] = old.frame[j]
+            for universe, ranges in list(self.configs.items()):
+                fb.configure(universe, ranges)
+            fb.dirty[:] = True
+            self.fb = fb
+            self.targets = fb.targets
+            self.target_index = fb.index
+            self.views = fb.views()
+            self.output = DeltaOutput(len(fb.targets), self.keepalive, self.stats_every)
+
+    def _watch_loop(self):
+        # recompilation hors chemin critique: ni la réception ni l'envoi n'attendent la lecture de l'Excel
+        if self.watch_every <= 0:
+            return
+        while True:
+            time.sleep(self.watch_every)
+            try:
+                if os.path.getmtime(self.excel_path) == self._excel_mtime:
+                    continue
+                self._install(self._build_compact_index(self.excel_path))
+                print("🔁 mapping recompilé (Excel modifié)")
+            except Exception as e:
+                print(f"⚠️ recompilation du mapping impossible: {e}")
 
     def _receiver_loop(self):
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -68,56 +117,54 @@ class StableRouter:
         print(f"🛰️ eHuB listening on {self.listen_ip}:{self.listen_port}")
         while True:
             data, addr = sock.recvfrom(65535)
-            frame, err = parse_packet(data)
+            frame, err = parse_packet(data, as_array=True)
             if err:
                 continue
             if isinstance(frame, ConfigFrame):
-                # info utile
-                print(f"🧩 CONFIG u={frame.universe} ranges={len(frame.ranges)}")
+                # table de l'univers reconstruite à part puis échangée ; CONFIG répété = no-op.
+                # Sous le verrou : un rechargement (_install) ne peut ni le perdre ni l'appliquer à l'ancien fb
+                with self._lock:
+                    self.configs[frame.universe] = frame.ranges
+                    mapped = self.fb.configure(frame.universe, frame.ranges)
+                if mapped is not None:
+                    print(f"🧩 CONFIG u={frame.universe} ranges={len(frame.ranges)} → {mapped} entités mappées")
                 continue
             if isinstance(frame, UpdateFrame):
-                # applique les valeurs dans les buffers, en COMPACTANT par position
+                # applique les valeurs dans le back buffer, en COMPACTANT par position (table précompilée)
                 with self._lock:
-                    # on crée un lookup rapide : pour chaque target, dict eid->position
-                    # (optimisable en pré-calcul, mais suffisant pour démarrer)
-                    pos_cache: Dict[Target, Dict[int, int]] = {}
-                    for target, ids in self.row_entities.items():
-                        pos_cache[target] = {eid: i for i, eid in enumerate(ids)}
-
-                    for (eid, r, g, b, w) in frame.entities:
-                        for target, pos_map in pos_cache.items():
-                            pos = pos_map.get(eid)
-                            if pos is None:
-                                continue
-                            dmx = self.dmx_by_target[target]
-                            ch = pos * 3  # RGB compacté
-                            if ch + 2 < 512:
-                                dmx[ch+0] = r
-                                dmx[ch+1] = g
-                                dmx[ch+2] = b
-                    # pas d’envoi ici → l’envoi régulier est fait dans le sender_loop
+                    self.fb.apply(frame.entities, frame.universe)
+                # pas d’envoi ici → l’envoi régulier est fait dans le sender_loop
 
     def _sender_loop(self):
-        # ré-émettre EN CONTINU le dernier état (anti-flicker)
+        # ré-émettre le dernier état : univers modifiés + keepalive des autres (anti-flicker)
+        self.clock.start()
         while True:
-            t0 = time.time()
+            # sous verrou : flags + copie back → front ; sendto hors verrou
             with self._lock:
-                for (ip, uni), dmx in self.dmx_by_target.items():
-                    if ip not in self.senders:
-                        self.senders[ip] = ArtNetSender(ip)
-                    self.senders[ip].send_dmx(uni, dmx)
-            dt = self.send_interval - (time.time() - t0)
-            if dt > 0:
-                time.sleep(dt)
+                due = self.output.due(self.fb.dirty, time.monotonic())
+                self.fb.publish()
+                targets, views, output = self.targets, self.views, self.output
+            self.tx.send_frame([(ip, uni, views[(ip, uni)])
+                                for i, (ip, uni) in enumerate(targets) if due[i]])
+            stats = output.report(time.monotonic())
+            if stats:
+                print(f"{stats} — {self.tx.stats()}")
+            timing = self.clock.report()
+            if timing:
+                print(timing)
+            self.clock.wait()
 
     def run(self):
         rx = threading.Thread(target=self._receiver_loop, daemon=True)
         tx = threading.Thread(target=self._sender_loop, daemon=True)
+        watch = threading.Thread(target=self._watch_loop, daemon=True)
         rx.start()
         tx.start()
+        watch.start()
         print(f"🚀 stable send @ {1.0/self.send_interval:.1f} fps — maintien d’état activé (anti-flicker).")
         rx.join(); tx.join()
 
-def run_router_all_bands_stable(excel_path: str, listen_ip="0.0.0.0", listen_port=50000, send_fps=40.0):
-    router = StableRouter(excel_path, listen_ip, listen_port, send_fps)
+def run_router_all_bands_stable(excel_path: str, listen_ip="0.0.0.0", listen_port=50000, send_fps=40.0,
+                                keepalive: float = 1.0, stats_every: float = 10.0, watch_every: float = 2.0):
+    router = StableRouter(excel_path, listen_ip, listen_port, send_fps, keepalive, stats_every, watch_every)
     router.run()
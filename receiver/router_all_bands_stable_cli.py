@@ -8,5 +8,9 @@ if __name__ == "__main__":
     ap.add_argument("--fps", type=float, default=40.0)
     ap.add_argument("--listen_ip", default="0.0.0.0")
     ap.add_argument("--listen_port", type=int, default=50000)
+    ap.add_argument("--keepalive", type=float, default=1.0, help="ré-émission des univers inchangés (s, 0 = plein débit)")
+    ap.add_argument("--stats-every", type=float, default=10.0, help="stats débit ArtNet toutes les N s (0 = off)")
+    ap.add_argument("--watch-every", type=float, default=2.0, help="vérifie si l'Excel a changé toutes les N s (0 = off)")
     args = ap.parse_args()
-    run_router_all_bands_stable(args.excel, args.listen_ip, args.listen_port, args.fps)
+    run_router_all_bands_stable(args.excel, args.listen_ip, args.listen_port, args.fps,
+                                args.keepalive, args.stats_every, args.watch_every)
@@ -1,27 +1,74 @@
 # receiver/router_lookup.py
-import os, sys, socket, threading, time
+import os, signal, sys, threading, time
+import asyncio
+import multiprocessing as mp
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, Tuple, List, Optional
-import pandas as pd
 
 # Import ArtNet + parser
 HERE = os.path.dirname(__file__)
 ARTNET_DIR = os.path.abspath(os.path.join(HERE, "..", "artnet"))
-if ARTNET_DIR not in sys.path:
-    sys.path.insert(0, ARTNET_DIR)
+COMMON_DIR = os.path.abspath(os.path.join(HERE, "..", "common"))
+for _d in (ARTNET_DIR, COMMON_DIR):
+    if _d not in sys.path:
+        sys.path.insert(0, _d)
 
-from parser import parse_packet, UpdateFrame, ConfigFrame
-from artnet import ArtNetSender
-from patch_map import load_patch_csv, apply_patch  # <-- patch-map
+import numpy as np
+from parser import parse_packet, parse_header, HEADER_LEN, Entities, ENTITY_DTYPE, UpdateFrame, ConfigFrame
+from artnet_batch import ArtNetTransmitter
+from frame_clock import FrameScheduler
+from mapping_cache import load_mapping
+from dmx_framebuffer import DmxFramebuffer, DeltaOutput
+from patch_map import load_patch_csv, CompiledPatch  # <-- patch-map
+from frame_assembler import FrameAssembler, Chunk
+from update_dedup import UpdateDedup
+from udp_ingest import UdpIngest, Datagram, Sender
+from shm_framebuffer import SharedFramebuffer
+from output_shards import assign_shards, WorkerSupervisor
 
 Target = Tuple[str, int]  # (ip, universe)
 
+# "thread"  : réception + envoi = 2 threads d'un même interpréteur (verrou + double buffer)
+# "process" : réception (décodage) et envoi dans 2 processus, framebuffer en mémoire partagée (seqlock)
+# "asyncio" : une seule boucle d'événements (DatagramProtocol + coroutine d'envoi cadencée), sans thread
+ENGINES = ("thread", "process", "asyncio")
+
+RX_QUEUE_MAX = 4096  # moteur asyncio : datagrammes en attente de décodage au-delà → jetés (comptés)
+
+class _EhubProtocol(asyncio.DatagramProtocol):
+    """Réception eHuB du moteur asyncio : les datagrammes sont mis en file, décodés par lots par _rx_task."""
+    def __init__(self, queue: asyncio.Queue, ingest: UdpIngest):
+        self.queue = queue
+        self.ingest = ingest
+
+    def datagram_received(self, data: bytes, addr):
+        try:
+            self.queue.put_nowait((data, addr[:2]))
+        except asyncio.QueueFull:
+            self.ingest.dropped += 1
+
+    def error_received(self, exc):
+        pass  # ex: ICMP "port unreachable" remonté sur la socket, sans effet sur la réception
+
 class LookupRouter:
     """
     Routeur eHuB → ArtNet avec:
-      - table de correspondance entité → (IP, univers, offset DMX)
-      - envoi continu à FPS fixe (anti-flicker)
+      - table de correspondance entité → (IP, univers, offset DMX),
+        compilée en framebuffer contigu + index denses (scatter vectorisé)
+      - envoi à FPS fixe des univers modifiés + keepalive des autres (anti-flicker)
       - DMX monitor optionnel
-      - patch-map optionnel (duplication/reroutage de canaux)
+      - patch-map optionnel (duplication/reroutage de canaux, y compris entre univers)
+      - ArtSync optionnel par IP contrôleur (frame multi-univers sans déchirure)
+      - CONFIG eHuB: plages index ↔ entité par univers eHuB, appliquées à chaud
+        sur les emplacements physiques de l'Excel (re-layout Unity sans redémarrage)
+      - assemblage des UPDATE découpés en chunks: une frame entière appliquée d'un coup
+      - déduplication des UPDATE identiques avant gzip (scène fixe ≈ 0 CPU)
+      - réception par lots (file noyau vidée à chaque réveil, SO_RCVBUF réglable),
+        un lot entier appliqué sous une seule prise de verrou
+      - pool optionnel de threads de décompression entre réception et application
+      - moteur "process": réception et envoi dans deux processus (pas de GIL partagé),
+        envoi éventuellement réparti par IP contrôleur sur N processus supervisés
+      - moteur "asyncio": réception et envoi dans une seule boucle d'événements
     """
     def __init__(
         self,
@@ -33,11 +80,27 @@ class LookupRouter:
         monitor_enabled: bool = False,
         monitor_every: int = 20,
         monitor_channels: int = 12,
+        keepalive: float = 1.0,
+        stats_every: float = 10.0,
+        trim_dmx: bool = True,
+        tx_sockets: int = 2,
+        tx_sndbuf: int = 1 << 20,
+        artsync: Optional[List[str]] = None,
+        late_policy: str = "skip",
+        assemble_frames: bool = False,
+        frame_timeout: float = 0.05,
+        dedup: bool = True,
+        rcvbuf: int = 4 << 20,
+        rx_batch: int = 64,
+        decode_workers: int = 0,
     ):
         self.listen_ip = listen_ip
         self.listen_port = listen_port
         self.dt = 1.0 / max(1e-3, send_fps)
+        # cadence d'envoi : échéances monotones absolues (pas de dérive)
+        self.clock = FrameScheduler(send_fps, late_policy, report_every=stats_every)
         self.order = order.upper().strip()  # "RGB" ou "GRB"
+        self.trim_dmx = bool(trim_dmx)      # paquets DMX limités aux canaux utilisés
 
         # ---- DMX monitor ----
         self.monitor_enabled = bool(monitor_enabled)
@@ -47,21 +110,57 @@ class LookupRouter:
 
         # 1) lookup + buffers
         self.lookup: Dict[int, Tuple[Target, int]] = {}  # entity_id -> ((ip,univ), dmx_offset)
-        self.targets: Dict[Target, bytearray] = {}       # (ip,univ) -> DMX512
-        self.senders: Dict[str, ArtNetSender] = {}       # ip -> sender
+        self.targets: Dict[Target, memoryview] = {}      # (ip,univ) -> vue DMX512 (front buffer, côté envoi)
+        # émission ArtNet par frame (sendmmsg si dispo) sur un pool de sockets partagé
+        self.tx = ArtNetTransmitter(tx_sockets, tx_sndbuf)
+        # IP contrôleurs qui reçoivent un ArtSync après chaque frame ("*" = toutes)
+        if isinstance(artsync, str):
+            artsync = [artsync]
+        self.artsync = {str(ip).strip() for ip in (artsync or [])}
         self._build_lookup_from_excel(excel_path)
 
-        # 2) mutex
+        # 2) mutex + sélection des univers à émettre (dirty / keepalive)
         self._lock = threading.Lock()
+        self.output = DeltaOutput(len(self.fb.targets), keepalive, stats_every)
 
         # 3) patch-map (chargé via set_patch_table)
-        self.patch_table = {}
+        self.patch_table = CompiledPatch([], [])
         self._has_patch = False
 
+        # 4) assemblage des UPDATE découpés en chunks → frame appliquée d'un bloc (pas de mur à moitié à jour)
+        self.assembler = FrameAssembler(self._commit_frame, frame_timeout) if assemble_frames else None
+
+        # 5) UPDATE identique au dernier appliqué (même source, même chunk) → ni gzip ni apply
+        self.dedup = UpdateDedup() if dedup else None
+
+        # 6) réception par lots : socket créée par le thread de réception (UdpIngest)
+        self.rcvbuf = int(rcvbuf)
+        self.rx_batch = max(1, int(rx_batch))
+        self.ingest: Optional[UdpIngest] = None
+        self._rx_pending: List[Chunk] = []  # chunks décodés du lot en cours, appliqués d'un bloc
+
+        # 7) pool de décompression (0 = inline) : zlib relâche le GIL, les paquets d'un lot
+        #    sont décodés en parallèle puis repris dans l'ordre d'arrivée
+        self.decode_workers = max(0, int(decode_workers))
+        self.decode_pool = (ThreadPoolExecutor(self.decode_workers, thread_name_prefix="ehub-decode")
+                            if self.decode_workers else None)
+
+        # 8) moteur "process" : framebuffer partagé (écrit par la réception, lu par l'envoi)
+        self.shared: Optional[SharedFramebuffer] = None
+        # sortie répartie : IP émises par ce processus, grille de ticks commune, préfixe des logs
+        self.epoch_ns: Optional[int] = None
+        self.log_prefix = ""
+        self._stop = threading.Event()  # arrêt de la boucle d'envoi (avant de fermer le segment partagé)
+
+    def restrict_output(self, ips: List[str]):
+        """Ce processus n'émet (et ne compte / n'affiche) que les univers de ces IP contrôleurs."""
+        owned = np.array([ip in ips for ip, _ in self.fb.targets], dtype=bool)
+        self.output = DeltaOutput(len(self.fb.targets), self.output.keepalive, self.output.report_every, owned)
+
     # ---------- Construction du lookup depuis l’Excel ----------
     def _build_lookup_from_excel(self, excel_path: str):
         """
-        Lecture feuille eHuB → mapping direct entité->(ip,univ,offset DMX).
+        Lecture feuille eHuB (compilée par common/mapping_cache.py) → mapping direct entité->(ip,univ,offset DMX).
         Hypothèse LAPS:
           - chaque bande physique = 2 univers consécutifs (U, U+1)
           - 1 ligne Excel par univers (entity_start..entity_end)
@@ -69,151 +168,381 @@ class LookupRouter:
           indices 0..169  -> univers U,   offsets DMX 0..(170*3-1)
           indices 170..   -> univers U+1, offsets DMX 0..((len-170)*3-1)
         """
-        df = pd.read_excel(excel_path, sheet_name="eHuB")
-        df = df.rename(columns={
-            "Entity Start": "entity_start",
-            "Entity End": "entity_end",
-            "ArtNet IP": "ip",
-            "ArtNet Universe": "universe",
-            "Name": "name",
-        })
-        # garder les univers LEDs 0..127 (ignorer 200 = projecteur)
-        df = df[(df["universe"] >= 0) & (df["universe"] <= 127)].copy()
-        df = df.sort_values(["ip", "universe"]).reset_index(drop=True)
-
-        def ensure_target(ip: str, uni: int):
-            key = (ip, uni)
-            if key not in self.targets:
-                self.targets[key] = bytearray(512)
-
-        # grouper par IP et traiter par paires (U, U+1)
-        for ip, g in df.groupby("ip"):
-            g = g.sort_values("universe")
-            universes = list(g["universe"].astype(int))
-            for u in universes:
-                if u % 2 != 0:
-                    continue
-                rowA = g[g["universe"] == u]
-                if rowA.empty:
-                    continue
-                rowA = rowA.iloc[0]
-
-                rowB: Optional[pd.Series] = None
-                if (u + 1) in universes:
-                    rB = g[g["universe"] == (u + 1)]
-                    if not rB.empty:
-                        rowB = rB.iloc[0]
-
-                # entités U
-                a0, a1 = int(rowA["entity_start"]), int(rowA["entity_end"])
-                listA = list(range(min(a0, a1), max(a0, a1) + 1))
-
-                # entités U+1 (si présent)
-                listB: List[int] = []
-                if rowB is not None:
-                    b0, b1 = int(rowB["entity_start"]), int(rowB["entity_end"])
-                    listB = list(range(min(b0, b1), max(b0, b1) + 1))
-
-                band_entities = listA + listB  # ~259 ids
-                head = band_entities[:170]
-                tail = band_entities[170:]
-
-                ensure_target(ip, u)
-                if tail:
-                    ensure_target(ip, u + 1)
-
-                # indexation compacte: offset = index*3 (3 canaux par LED)
-                for idx, eid in enumerate(head):
-                    self.lookup[eid] = ((ip, u), idx * 3)
-                for idx, eid in enumerate(tail):
-                    self.lookup[eid] = ((ip, u + 1), idx * 3)
+        mapping = load_mapping(excel_path)  # artefact compilé (.npz), Excel relu seulement s'il a changé
+        self.lookup = mapping.lookup()
+        target_order: List[Target] = mapping.targets()
+
+        # compilation: framebuffer contigu + index entité → canaux (ordre couleurs inclus)
+        self.fb = DmxFramebuffer(target_order, self.lookup, self.order)
+        self.targets = self.fb.views(self.trim_dmx)
 
         print(f"🗺️ lookup construit : {len(self.lookup)} entités, {len(self.targets)} univers DMX alloués.")
 
     # ---------- Patch-map ----------
     def set_patch_table(self, path: Optional[str]):
-        self.patch_table = load_patch_csv(path)
+        self.patch_table = load_patch_csv(path, self.fb.targets)
         self._has_patch = bool(self.patch_table)
+        # les canaux cibles du patch doivent faire partie des paquets envoyés
+        self.fb.require(self.patch_table.scatter)
+        self.targets = self.fb.views(self.trim_dmx)
         if self._has_patch:
-            rules = sum(len(v) for v in self.patch_table.values())
-            print(f"🩹 Patch-map chargé ({rules} règle(s)).")
+            print(f"🩹 Patch-map chargé ({self.patch_table.rules} règle(s)).")
+        if self.patch_table.ignored:
+            print(f"⚠️ Patch-map: {self.patch_table.ignored} règle(s) ignorée(s) (univers non alloué ou canal hors 1..512).")
 
     # ---------- Application d'un UPDATE dans les buffers DMX ----------
-    def _apply_update(self, ents: List[Tuple[int,int,int,int,int]]):
-        order = self.order
+    def _apply_update(self, ents: Entities, universe: Optional[int] = None):
+        # ents: tableau structuré (parse_packet(..., as_array=True)) ou liste de tuples
+        if not isinstance(ents, np.ndarray):
+            ents = np.array(ents, dtype=ENTITY_DTYPE)
+        with self._lock:
+            self.fb.apply(ents, universe)
+
+    def _commit_frame(self, chunks: List[Chunk]):
+        # frame complète → file du lot en cours (chunks None = doublons déjà dans le framebuffer)
+        self._rx_pending.extend((u, ents) for u, ents in chunks if ents is not None)
+
+    def _flush_pending(self):
+        # tout le lot sous UNE prise de verrou : le sender publie avant ou après une frame, jamais entre
+        # (lot vide ou entièrement dupliqué → pas de verrou)
+        if not self._rx_pending:
+            return
         with self._lock:
-            for (eid, r, g, b, w) in ents:
-                hit = self.lookup.get(eid)
-                if not hit:
-                    continue
-                (ip, uni), off = hit
-                dmx = self.targets[(ip, uni)]
-                if off + 2 >= 512:
-                    continue
-                if order == "RGB":
-                    dmx[off+0] = r; dmx[off+1] = g; dmx[off+2] = b
-                elif order == "GRB":
-                    dmx[off+0] = g; dmx[off+1] = r; dmx[off+2] = b
-                else:
-                    dmx[off+0] = r; dmx[off+1] = g; dmx[off+2] = b
+            for universe, ents in self._rx_pending:
+                self.fb.apply(ents, universe)
+        self._rx_pending.clear()
+        if self.shared is not None:
+            # moteur "process" : univers modifiés publiés vers le processus d'envoi (seqlock)
+            self.shared.write(self.fb.frame, self.fb.dirty)
+
+    def _rx_report(self) -> List[str]:
+        """Stats côté réception (assemblage, dédup, file UDP)."""
+        lines = self.assembler.report() if self.assembler is not None else []
+        if self.dedup is not None:
+            lines.append(self.dedup.report())
+        if self.ingest is not None:
+            lines.append(self.ingest.report())
+        return lines
+
+    # ---------- CONFIG eHuB → table entité → canaux de l'univers ----------
+    def _apply_config(self, frame: ConfigFrame):
+        # table construite hors verrou (le sender ne la lit jamais), puis échangée d'un bloc ;
+        # un CONFIG identique au précédent (renvoi périodique) ne coûte qu'une comparaison
+        self._flush_pending()  # les UPDATE reçus avant ce CONFIG gardent l'ancien mapping
+        mapped = self.fb.configure(frame.universe, frame.ranges)
+        if mapped is not None:
+            if self.dedup is not None:
+                self.dedup.clear()  # mêmes payloads, autres canaux : tout réappliquer
+            print(f"🧩 CONFIG u={frame.universe} ranges={len(frame.ranges)} → {mapped} entités mappées")
 
     # ---------- Thread de réception eHuB ----------
+    def _screen(self, data, src: Sender) -> Tuple[Optional[UpdateFrame], Optional[str]]:
+        """
+        Étape avant gzip, dans l'ordre d'arrivée (thread de réception) :
+          (UpdateFrame(u, None), None) = doublon déjà appliqué, (None, err) = rejeté,
+          (None, None) = à décoder (parse_packet, éventuellement dans le pool).
+        """
+        if self.dedup is None:
+            return None, None
+        hdr, err = parse_header(data)
+        if err:
+            return None, err
+        if hdr.type == 2 and self.dedup.seen(src[0], hdr.universe,
+                                             memoryview(data)[HEADER_LEN:HEADER_LEN + hdr.comp_len]):
+            return UpdateFrame(hdr.universe, None), None
+        return None, None
+
+    def _dispatch(self, data, src: Sender, frame, err: Optional[str]):
+        """Paquet décodé (dans l'ordre d'arrivée) → CONFIG appliqué / UPDATE dans le lot en cours."""
+        if err:
+            if self.dedup is not None and len(data) > 5 and data[4] == 2:
+                self.dedup.forget(src[0], data[5])  # jamais appliqué : ne pas le traiter en doublon
+            return
+        if isinstance(frame, ConfigFrame):
+            self._apply_config(frame)
+        elif isinstance(frame, UpdateFrame):
+            if self.assembler is not None:
+                # doublon (entities None) compris : l'assembleur doit voir passer le chunk
+                self.assembler.push(src, frame.universe, frame.entities)
+            elif frame.entities is not None:
+                self._rx_pending.append((frame.universe, frame.entities))
+
+    def _handle_packet(self, data, src: Sender):
+        """
+        Un datagramme eHuB reçu de `src` (IP, port) : dédup (par IP) → gzip → CONFIG / UPDATE.
+        Les UPDATE s'accumulent dans le lot en cours, appliqué par _flush_pending().
+        """
+        frame, err = self._screen(data, src)
+        if frame is None and err is None:
+            frame, err = parse_packet(data, as_array=True)
+        self._dispatch(data, src, frame, err)
+
+    def _process_batch(self, batch: List[Datagram]):
+        """Un lot reçu : décodage inline, ou en parallèle dans le pool (résultats repris dans l'ordre)."""
+        pool = self.decode_pool
+        if pool is None:
+            for data, src in batch:
+                self._handle_packet(data, src)
+            return
+        # ordre d'arrivée conservé (donc ordre par source) : l'assembleur et le lot voient la même séquence
+        for data, src, res in self._submit_batch(batch):
+            frame, err = res.result() if isinstance(res, Future) else res
+            self._dispatch(data, src, frame, err)
+
+    def _submit_batch(self, batch: List[Datagram]) -> List[Tuple]:
+        """Dédup dans l'ordre d'arrivée puis décodage soumis au pool : [(data, src, Future | (frame, err))]."""
+        jobs = []
+        for data, src in batch:
+            frame, err = self._screen(data, src)
+            if frame is None and err is None:
+                data = bytes(data)  # l'anneau de réception est réutilisé au lot suivant
+                jobs.append((data, src, self.decode_pool.submit(parse_packet, data, True)))
+            else:
+                jobs.append((data, src, (frame, err)))
+        return jobs
+
+    def _open_ingest(self, ring: int) -> UdpIngest:
+        self.ingest = ingest = UdpIngest(self.listen_ip, self.listen_port, self.rcvbuf, ring)
+        print(f"🛰️ eHuB listening on {self.listen_ip}:{self.listen_port} (rcvbuf={ingest.rcvbuf // 1024} Ko)")
+        if ingest.rcvbuf < self.rcvbuf:
+            print(f"⚠️ SO_RCVBUF plafonné à {ingest.rcvbuf} octets (demandé {self.rcvbuf}) : "
+                  f"augmenter net.core.rmem_max")
+        return ingest
+
     def _receiver_loop(self):
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.bind((self.listen_ip, self.listen_port))
-        print(f"🛰️ eHuB listening on {self.listen_ip}:{self.listen_port}")
+        ingest = self._open_ingest(self.rx_batch)
+        asm = self.assembler
+        # réveil régulier même sans trafic : les frames incomplètes partent au timeout
+        wait = max(0.005, asm.timeout / 2) if asm is not None else None
+        # moteur "process" : ce processus affiche lui-même ses stats de réception
+        report_every = self.output.report_every if self.shared is not None else 0.0
+        t_report = time.monotonic()
         while True:
-            data, addr = sock.recvfrom(65535)
-            frame, err = parse_packet(data)
-            if err:
-                continue
-            if isinstance(frame, ConfigFrame):
-                print(f"🧩 CONFIG u={frame.universe} ranges={len(frame.ranges)}")
-            elif isinstance(frame, UpdateFrame):
-                self._apply_update(frame.entities)
+            self._process_batch(ingest.recv_batch(wait))
+            if asm is not None:
+                asm.poll()
+            self._flush_pending()
+            if report_every > 0 and time.monotonic() - t_report >= report_every:
+                t_report = time.monotonic()
+                for line in self._rx_report():
+                    print(line)
 
     # ---------- Thread d'envoi ArtNet + DMX monitor ----------
+    def _due(self) -> np.ndarray:
+        if self._has_patch:
+            self.patch_table.propagate_dirty(self.fb.dirty)
+        return self.output.due(self.fb.dirty, time.monotonic())
+
     def _sender_loop(self):
-        while True:
-            t0 = time.time()
-            self._frame_count += 1
-            lines_to_print: List[str] = []
+        self.clock.start(self.epoch_ns)
+        while not self._stop.is_set():
+            self._send_tick()
+            self.clock.wait()
+
+    def _send_tick(self):
+        """Un tick d'envoi : instantané du framebuffer, univers dus → ArtNet, monitor et stats."""
+        owned = self.output.owned
+        self._frame_count += 1
+        lines_to_print: List[str] = []
+        show = self.monitor_enabled and (self._frame_count % self.monitor_every == 0)
 
+        # section critique minimale : flags dirty + copie back → front.
+        # patch, sendto et monitor travaillent ensuite sur le front buffer, hors verrou.
+        if self.shared is not None:
+            # moteur "process" : instantané cohérent du framebuffer partagé, sans verrou, tel
+            # que publié à l'échéance de ce tick → tous les shards envoient la même frame
+            self.shared.read(self.fb.front, self.fb.dirty, self.clock.deadline_ns)
+            due = self._due()
+        else:
             with self._lock:
-                for (ip, uni), dmx in self.targets.items():
-                    # appliquer patch (si présent) avant envoi
-                    buf = dmx
-                    if self._has_patch:
-                        buf = apply_patch(ip, uni, dmx, self.patch_table)
-
-                    if ip not in self.senders:
-                        self.senders[ip] = ArtNetSender(ip)
-                    self.senders[ip].send_dmx(uni, buf)
-
-                    # DMX monitor (aperçu)
-                    if self.monitor_enabled and (self._frame_count % self.monitor_every == 0):
-                        N = self.monitor_channels
-                        head = buf[:N]
-                        preview = " ".join(f"{v:3d}" for v in head)
-                        lines_to_print.append(f"u{uni:03d}@{ip}  ch1..{N}: {preview}")
-
-            if lines_to_print:
-                print("🔎 DMX monitor:")
-                for line in lines_to_print:
-                    print("   " + line)
-
-            dt = self.dt - (time.time() - t0)
-            if dt > 0:
-                time.sleep(dt)
+                due = self._due()
+                self.fb.publish()
+        # patch compilé, appliqué en place dans le front buffer (jamais dans le back)
+        if self._has_patch:
+            self.patch_table.apply(self.fb.front)
+
+        batch = []
+        for i, ((ip, uni), dmx) in enumerate(self.targets.items()):
+            if not (due[i] or (show and (owned is None or owned[i]))):
+                continue
+            if due[i]:
+                batch.append((ip, uni, dmx))
+
+            # DMX monitor (aperçu)
+            if show:
+                N = self.monitor_channels
+                head = dmx[:N]
+                preview = " ".join(f"{v:3d}" for v in head)
+                lines_to_print.append(f"u{uni:03d}@{ip}  ch1..{N}: {preview}")
+        sync_ips = sorted({ip for ip, _, _ in batch if "*" in self.artsync or ip in self.artsync})
+        self.tx.send_frame(batch, sync_ips)
+
+        pre = self.log_prefix
+        if lines_to_print:
+            print(f"{pre}🔎 DMX monitor:")
+            for line in lines_to_print:
+                print("   " + line)
+        stats = self.output.report(time.monotonic())
+        if stats:
+            print(f"{pre}{stats} — {self.tx.stats()}")
+            for line in (self._rx_report() if self.shared is None else [self.shared.stats()]):
+                print(pre + line)
+        timing = self.clock.report()
+        if timing:
+            print(pre + timing)
+
+    # ---------- Moteur asyncio ----------
+    async def _rx_task(self, queue: asyncio.Queue):
+        """Vide la file de datagrammes par lots (au plus rx_batch) : dédup/gzip/assemblage puis apply d'un bloc."""
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.rx_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            self.ingest.account(batch)
+            if self.decode_pool is None:
+                self._process_batch(batch)
+            else:
+                # décodage dans le pool sans bloquer la boucle ; résultats repris dans l'ordre d'arrivée
+                for data, src, res in self._submit_batch(batch):
+                    frame, err = (await asyncio.wrap_future(res)) if isinstance(res, Future) else res
+                    self._dispatch(data, src, frame, err)
+            if self.assembler is not None:
+                self.assembler.poll()
+            self._flush_pending()
+
+    async def _poll_task(self):
+        """Frames incomplètes validées au timeout, même sans trafic."""
+        while True:
+            await asyncio.sleep(max(0.005, self.assembler.timeout / 2))
+            self.assembler.poll()
+            self._flush_pending()
+
+    async def _send_task(self):
+        """Envoi cadencé sur la grille du FrameScheduler (attente par asyncio.sleep, pas de spin)."""
+        clock = self.clock
+        clock.start(self.epoch_ns)
+        while True:
+            self._send_tick()
+            delay = clock.delay()
+            while delay > 0:
+                await asyncio.sleep(delay)
+                delay = clock.delay()
+            clock.tick()
+
+    async def _main_async(self):
+        loop = asyncio.get_running_loop()
+        ingest = self._open_ingest(1)  # socket seule (SO_RCVBUF, non bloquante) : asyncio lit lui-même
+        queue: asyncio.Queue = asyncio.Queue(RX_QUEUE_MAX)
+        transport, _ = await loop.create_datagram_endpoint(lambda: _EhubProtocol(queue, ingest), sock=ingest.sock)
+        tasks = [self._rx_task(queue), self._send_task()]
+        if self.assembler is not None:
+            tasks.append(self._poll_task())
+        self._banner("asyncio")
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            transport.close()
+
+    def run_asyncio(self):
+        asyncio.run(self._main_async())
 
     # ---------- Lancement ----------
+    def _banner(self, engine: str):
+        ka = f"{self.output.keepalive:g}s" if self.output.keepalive > 0 else "OFF"
+        sync = ",".join(sorted(self.artsync)) or "OFF"
+        print(f"🚀 maintien d’état @ {1.0/self.dt:.1f} fps — engine={engine}, order={self.order}, late={self.clock.late_policy}, decode={self.decode_workers or 'inline'}, keepalive={ka}, artsync={sync}, monitor={'ON' if self.monitor_enabled else 'OFF'}")
+
     def run(self):
         rx = threading.Thread(target=self._receiver_loop, daemon=True)
         tx = threading.Thread(target=self._sender_loop, daemon=True)
         rx.start(); tx.start()
-        print(f"🚀 maintien d’état @ {1.0/self.dt:.1f} fps — order={self.order}, monitor={'ON' if self.monitor_enabled else 'OFF'}")
+        self._banner("thread")
         rx.join(); tx.join()
 
+    def run_processes(self, params: Dict, patch_csv: Optional[str] = None, output_shards: int = 0):
+        """
+        Moteur "process" : un processus fils construit son propre routeur avec `params`
+        (mêmes arguments que ce routeur), reçoit/décode l'eHuB et publie dans le
+        framebuffer partagé.
+          output_shards = 0 → ce processus émet (envoi ArtNet, patch, monitor)
+          output_shards = N → N processus d'envoi, chacun propriétaire d'un groupe d'IP
+            contrôleurs, tous calés sur la même grille de ticks ; ce processus les
+            supervise (relance des shards arrêtés)
+        """
+        self.shared = SharedFramebuffer(len(self.fb.targets))
+        ctx = mp.get_context("spawn")  # fils neuf : ni sockets ni threads hérités
+        rx = ctx.Process(target=_ingest_process, args=(params, self.shared.name),
+                         name="ehub-ingest", daemon=True)
+        sup = None
+        tx = None
+        if output_shards > 0:
+            epoch_ns = time.monotonic_ns()  # origine commune des ticks de tous les shards
+            shards = assign_shards(self.fb.targets, output_shards)
+            sup = WorkerSupervisor(ctx)
+            for k, ips in enumerate(shards):
+                name = f"sortie {k + 1}/{len(shards)}"
+                sup.add(name, _output_shard, (params, patch_csv, self.shared.name, ips, epoch_ns, name))
+                print(f"🧩 {name}: {', '.join(ips)}")
+        # SIGTERM → SystemExit : le finally ci-dessous s'exécute (sinon segment partagé jamais supprimé)
+        prev_term = None
+        if threading.current_thread() is threading.main_thread():
+            prev_term = signal.signal(signal.SIGTERM, _raise_exit)
+        try:
+            rx.start()
+            if sup is not None:
+                sup.start()
+            else:
+                tx = threading.Thread(target=self._sender_loop, daemon=True)
+                tx.start()
+            self._banner("process" if sup is None else f"process x{len(sup.workers)} sorties")
+            while rx.is_alive():
+                rx.join(0.5)
+                for msg in (sup.check() if sup is not None else []):
+                    print(msg)
+            print(f"❌ processus de réception terminé (code {rx.exitcode})")
+        finally:
+            if rx.is_alive():
+                rx.terminate()
+                rx.join()
+            if sup is not None:
+                sup.stop()
+            if tx is not None:
+                # le thread d'envoi lit le segment (vues NumPy) : arrêté avant de le démapper
+                self._stop.set()
+                tx.join()
+            self.shared.close()
+            if prev_term is not None:
+                signal.signal(signal.SIGTERM, prev_term)
+
+
+def _raise_exit(signum, frame):
+    raise SystemExit(128 + signum)
+
+
+def _ingest_process(params: Dict, shm_name: str):
+    """Processus de réception du moteur "process" : eHuB → framebuffer partagé."""
+    router = LookupRouter(**params)
+    router.shared = SharedFramebuffer(len(router.fb.targets), shm_name)
+    try:
+        router._receiver_loop()
+    except KeyboardInterrupt:
+        pass
+
+
+def _output_shard(params: Dict, patch_csv: Optional[str], shm_name: str, ips: List[str],
+                  epoch_ns: int, name: str):
+    """Processus d'envoi d'un shard : framebuffer partagé → ArtNet pour ses IP contrôleurs."""
+    router = LookupRouter(**params)
+    router.set_patch_table(patch_csv)  # patch appliqué au mur entier (règles inter-IP possibles)
+    router.shared = SharedFramebuffer(len(router.fb.targets), shm_name)
+    router.restrict_output(ips)
+    router.epoch_ns = epoch_ns
+    router.log_prefix = f"[{name}] "
+    try:
+        router._sender_loop()
+    except KeyboardInterrupt:
+        pass
+
 
 def run_router_lookup(
     excel_path: str,
@@ -225,16 +554,54 @@ def run_router_lookup(
     monitor_every: int = 20,
     monitor_channels: int = 12,
     patch_csv: Optional[str] = None,
+    keepalive: float = 1.0,
+    stats_every: float = 10.0,
+    trim_dmx: bool = True,
+    tx_sockets: int = 2,
+    tx_sndbuf: int = 1 << 20,
+    artsync: Optional[List[str]] = None,
+    late_policy: str = "skip",
+    assemble_frames: bool = False,
+    frame_timeout: float = 0.05,
+    dedup: bool = True,
+    rcvbuf: int = 4 << 20,
+    rx_batch: int = 64,
+    decode_workers: int = 0,
+    engine: str = "thread",
+    output_shards: int = 0,
 ):
-    router = LookupRouter(
-        excel_path,
-        listen_ip,
-        listen_port,
-        send_fps,
-        order,
+    if engine not in ENGINES:
+        raise ValueError(f"engine doit être l'un de {ENGINES}")
+    if output_shards and engine != "process":
+        raise ValueError("output_shards nécessite engine='process'")
+    params = dict(
+        excel_path=excel_path,
+        listen_ip=listen_ip,
+        listen_port=listen_port,
+        send_fps=send_fps,
+        order=order,
         monitor_enabled=monitor_enabled,
         monitor_every=monitor_every,
         monitor_channels=monitor_channels,
+        keepalive=keepalive,
+        stats_every=stats_every,
+        trim_dmx=trim_dmx,
+        tx_sockets=tx_sockets,
+        tx_sndbuf=tx_sndbuf,
+        artsync=artsync,
+        late_policy=late_policy,
+        assemble_frames=assemble_frames,
+        frame_timeout=frame_timeout,
+        dedup=dedup,
+        rcvbuf=rcvbuf,
+        rx_batch=rx_batch,
+        decode_workers=decode_workers,
     )
+    router = LookupRouter(**params)
     router.set_patch_table(patch_csv)
-    router.run()
+    if engine == "process":
+        router.run_processes(params, patch_csv, output_shards)
+    elif engine == "asyncio":
+        router.run_asyncio()
+    else:
+        router.run()
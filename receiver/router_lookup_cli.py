@@ -1,6 +1,6 @@
 # receiver/router_lookup_cli.py
 import argparse
-from router_lookup import run_router_lookup
+from router_lookup import run_router_lookup, ENGINES
 from config_yaml import load_config
 
 if __name__ == "__main__":
@@ -17,6 +17,20 @@ if __name__ == "__main__":
     ap.add_argument("--monitor-every", type=int, help="Afficher toutes les N frames")
     ap.add_argument("--monitor-channels", type=int, help="Nombre de canaux à afficher")
     ap.add_argument("--patch", help="patch.csv (optionnel)")
+    ap.add_argument("--keepalive", type=float, help="Ré-émission des univers inchangés toutes les N s (0 = plein débit)")
+    ap.add_argument("--stats-every", type=float, help="Stats débit ArtNet toutes les N s (0 = off)")
+    ap.add_argument("--full-dmx", action="store_true", help="Toujours envoyer 512 canaux (pas de paquets DMX raccourcis)")
+    ap.add_argument("--artsync", nargs="+", metavar="IP", help="ArtSync après chaque frame vers ces IP (* = toutes)")
+    ap.add_argument("--late-policy", choices=["skip","catchup"], help="Frame d'envoi en retard: sauter les ticks manqués ou les rattraper")
+    ap.add_argument("--assemble", action="store_true",
+                    help="Regrouper les chunks UPDATE d'une frame avant de les appliquer (sources dont l'octet universe = index de chunk 0..k-1, ex. les fakers)")
+    ap.add_argument("--frame-timeout", type=float, help="Frame incomplète appliquée après N s")
+    ap.add_argument("--rcvbuf", type=int, help="SO_RCVBUF de la socket eHuB (octets)")
+    ap.add_argument("--rx-batch", type=int, help="Datagrammes max lus par réveil du thread de réception")
+    ap.add_argument("--decode-workers", type=int, help="Threads de décompression gzip (0 = dans le thread de réception)")
+    ap.add_argument("--engine", choices=list(ENGINES), help="thread: réception+envoi dans 1 processus ; process: 2 processus + mémoire partagée ; asyncio: 1 boucle d'événements")
+    ap.add_argument("--output-shards", type=int, help="Envoi ArtNet réparti par IP contrôleur sur N processus (avec --engine process)")
+    ap.add_argument("--no-dedup", action="store_true", help="Décompresser/appliquer aussi les UPDATE identiques au précédent")
     args = ap.parse_args()
 
     cfg = load_config(args.config)
@@ -31,6 +45,19 @@ if __name__ == "__main__":
     if args.monitor_every is not None: cfg["monitor_every"] = args.monitor_every
     if args.monitor_channels is not None: cfg["monitor_channels"] = args.monitor_channels
     if args.patch: cfg["patch_csv"] = args.patch
+    if args.keepalive is not None: cfg["keepalive"] = args.keepalive
+    if args.stats_every is not None: cfg["stats_every"] = args.stats_every
+    if args.full_dmx: cfg["trim_dmx"] = False
+    if args.artsync: cfg["artsync"] = args.artsync
+    if args.late_policy: cfg["late_policy"] = args.late_policy
+    if args.assemble: cfg["assemble_frames"] = True
+    if args.frame_timeout is not None: cfg["frame_timeout"] = args.frame_timeout
+    if args.no_dedup: cfg["dedup"] = False
+    if args.rcvbuf is not None: cfg["rcvbuf"] = args.rcvbuf
+    if args.rx_batch is not None: cfg["rx_batch"] = args.rx_batch
+    if args.decode_workers is not None: cfg["decode_workers"] = args.decode_workers
+    if args.engine: cfg["engine"] = args.engine
+    if args.output_shards is not None: cfg["output_shards"] = args.output_shards
 
     run_router_lookup(
         cfg["excel"],
@@ -42,4 +69,19 @@ if __name__ == "__main__":
         monitor_every=cfg["monitor_every"],
         monitor_channels=cfg["monitor_channels"],
         patch_csv=cfg["patch_csv"],
+        keepalive=cfg["keepalive"],
+        stats_every=cfg["stats_every"],
+        trim_dmx=cfg["trim_dmx"],
+        tx_sockets=cfg["tx_sockets"],
+        tx_sndbuf=cfg["tx_sndbuf"],
+        artsync=cfg["artsync"],
+        late_policy=cfg["late_policy"],
+        assemble_frames=cfg["assemble_frames"],
+        frame_timeout=cfg["frame_timeout"],
+        dedup=cfg["dedup"],
+        rcvbuf=cfg["rcvbuf"],
+        rx_batch=cfg["rx_batch"],
+        decode_workers=cfg["decode_workers"],
+        engine=cfg["engine"],
+        output_shards=cfg["output_shards"],
     )
@@ -1,6 +1,7 @@
 # receiver/router_one_band.py
 import os, sys, socket
 from typing import Tuple
+import numpy as np
 
 # importer artnet/artnet.py
 HERE = os.path.dirname(__file__)
@@ -33,7 +34,7 @@ def run_router_one_band(excel_path: str, target_universe: int, listen_ip="0.0.0.
 
     while True:
         data, addr = sock.recvfrom(65535)
-        frame, err = parse_packet(data)
+        frame, err = parse_packet(data, as_array=True)
         if err: 
             continue
 
@@ -46,14 +47,16 @@ def run_router_one_band(excel_path: str, target_universe: int, listen_ip="0.0.0.
             # Construire un DMX512 en RGB, start_channel = 1
             dmx = bytearray(512)
             # Pour chaque entité reçue, si elle est dans [e_start..e_end], on mappe
-            for (eid, r, g, b, w) in frame.entities:
-                if e_start <= eid <= e_end:
-                    idx = eid - e_start  # index 0-based dans la bande
-                    ch = idx * 3         # 3 canaux par entité (R,G,B)
-                    if ch + 2 < 512:
-                        dmx[ch + 0] = r
-                        dmx[ch + 1] = g
-                        dmx[ch + 2] = b
+            # (sélection vectorisée sur le tableau décodé, pas de boucle Python)
+            ents = frame.entities
+            ids = ents["id"].astype(np.int32)
+            ch = (ids - e_start) * 3     # 3 canaux par entité (R,G,B)
+            m = (ids >= e_start) & (ids <= e_end) & (ch + 2 < 512)
+            ch = ch[m]
+            out = np.frombuffer(dmx, dtype=np.uint8)
+            out[ch + 0] = ents["r"][m]
+            out[ch + 1] = ents["g"][m]
+            out[ch + 2] = ents["b"][m]
             # Envoi ArtNet
             sender.send_dmx(out_uni, dmx)
             # Log léger (toutes les ~20 updates si besoin : ici on affiche un bref message)
@@ -10,7 +10,7 @@ ARTNET_DIR = os.path.abspath(os.path.join(HERE, "..", "artnet"))
 if ARTNET_DIR not in sys.path:
     sys.path.insert(0, ARTNET_DIR)
 
-from parser import parse_packet, UpdateFrame, ConfigFrame  # réutilise ton parser existant
+from parser import parse_packet, iter_entities, UpdateFrame, ConfigFrame  # réutilise ton parser existant
 from artnet import ArtNetSender
 
 PROJECTOR_IP = "192.168.1.45"
@@ -28,7 +28,7 @@ def run_router_projector(listen_ip: str = "0.0.0.0", listen_port: int = 50000):
 
     while True:
         data, addr = sock.recvfrom(65535)
-        frame, err = parse_packet(data)
+        frame, err = parse_packet(data, as_array=True)
         if err:
             # on ignore ce qui n'est pas eHuB
             continue
@@ -40,9 +40,9 @@ def run_router_projector(listen_ip: str = "0.0.0.0", listen_port: int = 50000):
 
         if isinstance(frame, UpdateFrame):
             # prendre la 1ʳᵉ entité seulement (test simple)
-            if not frame.entities:
+            if len(frame.entities) == 0:
                 continue
-            eid, r, g, b, w = frame.entities[0]
+            eid, r, g, b, w = next(iter_entities(frame.entities[:1]))
 
             # fabriquer un DMX512 avec ch1=R, ch2=G, ch3=B
             dmx = bytearray(512)
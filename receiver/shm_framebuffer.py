@@ -0,0 +1,142 @@
+# receiver/shm_framebuffer.py
+import time
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+import numpy as np
+
+_LINE = 64   # en-têtes chacun sur sa propre ligne de cache
+SLOTS = 8    # instantanés conservés (anneau) : un shard en retard retrouve encore celui de son tick
+
+class SharedFramebuffer:
+    """
+    Framebuffer DMX (n_univers x 512) en mémoire partagée entre le processus de
+    réception (UN écrivain) et les processus d'envoi (lecteurs), en anneau de SLOTS
+    instantanés horodatés, chacun protégé par un seqlock:
+      - écrivain: slot suivant de l'anneau, seq impair → copie des univers modifiés
+        (depuis la dernière écriture de CE slot) + versions + horodatage → seq pair
+      - lecteur : choisit l'instantané le plus récent publié au plus tard à l'échéance
+        de son tick (`as_of_ns`), le copie, relit seq ; différent → recommence
+    Tous les shards calés sur la même grille de ticks envoient donc le MÊME état pour
+    un tick donné, même si l'écrivain publie entre le réveil de l'un et celui de l'autre.
+    Aucun verrou inter-processus : l'écrivain ne bloque jamais, le lecteur obtient
+    toujours un instantané cohérent (jamais une frame à moitié écrite). Si l'écrivain a
+    publié SLOTS fois depuis l'échéance (lecteur très en retard), l'instantané du tick est
+    perdu : le plus ancien est envoyé et compté dans `overruns`.
+    Les flags dirty traversent le seqlock sous forme de compteurs de version par
+    univers (le lecteur n'écrit rien en mémoire partagée).
+    Layout: [publications u64 | pad] SLOTS x ([seq u64, t_ns i64 | pad] [versions u32 x n | pad] [frame u8 x n x 512])
+    """
+    def __init__(self, n_targets: int, name: Optional[str] = None):
+        self.n = int(n_targets)
+        ver_size = -(-4 * self.n // _LINE) * _LINE
+        slot_size = _LINE + ver_size + 512 * self.n
+        size = _LINE + SLOTS * slot_size
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+        buf = self.shm.buf
+        self.published = np.ndarray((1,), dtype=np.uint64, buffer=buf, offset=0)
+        self.seq, self.t_ns, self.versions, self.frames = [], [], [], []
+        for s in range(SLOTS):
+            off = _LINE + s * slot_size
+            self.seq.append(np.ndarray((1,), dtype=np.uint64, buffer=buf, offset=off))
+            self.t_ns.append(np.ndarray((1,), dtype=np.int64, buffer=buf, offset=off + 8))
+            self.versions.append(np.ndarray((self.n,), dtype=np.uint32, buffer=buf, offset=off + _LINE))
+            self.frames.append(np.ndarray((self.n, 512), dtype=np.uint8, buffer=buf,
+                                          offset=off + _LINE + ver_size))
+        if self.owner:
+            self.shm.buf[:size] = bytes(size)
+
+        # côté écrivain : univers à recopier dans chaque slot (modifiés depuis sa dernière écriture)
+        self._stale = np.ones((SLOTS, self.n), dtype=bool)
+        self._wver = np.zeros(self.n, dtype=np.uint32)
+        self._next = 0
+        # côté lecteur
+        self._seen = np.zeros(self.n, dtype=np.uint32)
+        self._ver = np.zeros(self.n, dtype=np.uint32)
+        self.writes = 0
+        self.reads = 0
+        self.retries = 0   # lectures recommencées (écriture concurrente)
+        self.overruns = 0  # instantané du tick déjà écrasé (lecteur en retard de SLOTS publications)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    # ---------- écrivain (réception) ----------
+    def write(self, frame: np.ndarray, dirty: np.ndarray):
+        """Publie `frame` (back buffer local, univers `dirty` modifiés) puis remet les flags à False."""
+        if not dirty.any():
+            return
+        s = self._next
+        rows = np.flatnonzero(dirty | self._stale[s])
+        self._wver[dirty] += 1
+        self.seq[s][0] += 1                    # impair : écriture en cours
+        self.frames[s][rows] = frame[rows]
+        np.copyto(self.versions[s], self._wver)
+        self.t_ns[s][0] = time.monotonic_ns()  # horodaté APRÈS le passage à impair (cf. read)
+        self.seq[s][0] += 1                    # pair : instantané cohérent
+        self._stale[s] = False
+        self._stale[np.arange(SLOTS) != s] |= dirty
+        self._next = (s + 1) % SLOTS
+        self.published[0] += 1
+        dirty[:] = False
+        self.writes += 1
+
+    # ---------- lecteur (envoi) ----------
+    def _pick(self, as_of_ns: Optional[int]) -> Optional[Tuple[int, int]]:
+        """(slot à lire, son seq au moment du choix) ; None : un slot est en cours d'écriture, réessayer."""
+        best = oldest = None
+        for s in range(SLOTS):
+            seq = int(self.seq[s][0])
+            if seq & 1:
+                # l'horodatage à venir peut être <= as_of_ns : attendre la fin de l'écriture
+                return None
+            t = int(self.t_ns[s][0])
+            if (as_of_ns is None or t <= as_of_ns) and (best is None or t > best[2]):
+                best = (s, seq, t)
+            if oldest is None or t < oldest[2]:
+                oldest = (s, seq, t)
+        if best is None:
+            self.overruns += 1
+            best = oldest
+        return best[:2]
+
+    def read(self, front: np.ndarray, dirty: np.ndarray, as_of_ns: Optional[int] = None):
+        """
+        Copie dans `front` l'instantané publié au plus tard à `as_of_ns`
+        (time.monotonic_ns() de l'échéance du tick ; None → le plus récent) et lève
+        `dirty` pour les univers modifiés depuis la lecture précédente.
+        """
+        while True:
+            picked = self._pick(as_of_ns)
+            if picked is None:
+                self.retries += 1
+                time.sleep(0)                  # écrivain au milieu d'une copie (~µs)
+                continue
+            s, s1 = picked
+            np.copyto(front, self.frames[s])
+            np.copyto(self._ver, self.versions[s])
+            # seq inchangé depuis le choix : ni réécrit pendant la copie, ni remplacé par un plus récent
+            if int(self.seq[s][0]) == s1:
+                break
+            self.retries += 1
+        changed = self._ver != self._seen
+        dirty |= changed
+        self._seen[changed] = self._ver[changed]
+        self.reads += 1
+
+    def stats(self) -> str:
+        # écritures comptées en mémoire partagée (l'écrivain est dans l'autre processus)
+        line = (f"🧠 shm: {int(self.published[0])} écritures, {self.reads} lectures, "
+                f"{self.retries} relectures (seqlock)")
+        if self.overruns:
+            line += f", {self.overruns} instantanés de tick perdus"
+        return line
+
+    def close(self):
+        # les vues NumPy retiennent le buffer : les lâcher avant de fermer le segment
+        self.published = None
+        self.seq = self.t_ns = self.versions = self.frames = []
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
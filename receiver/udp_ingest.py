@@ -0,0 +1,123 @@
+# receiver/udp_ingest.py
+import errno, os, select, socket
+from typing import List, Optional, Tuple
+
+Sender = Tuple[str, int]            # (IP, port) source : une socket d'émetteur
+Datagram = Tuple[memoryview, Sender]  # (octets reçus, émetteur)
+UNFRAGMENTED_MAX = 1472  # charge UDP max sans fragmentation IP sur Ethernet (MTU 1500 - 20 IP - 8 UDP)
+
+def udp_socket_stats(sock: socket.socket) -> Optional[Tuple[int, int]]:
+    """
+    (octets en attente dans la file de réception, datagrammes perdus par le noyau)
+    lus dans /proc/net/udp pour CETTE socket (repérée par son inode) ; None hors Linux.
+    """
+    try:
+        inode = str(os.fstat(sock.fileno()).st_ino)
+        with open("/proc/net/udp", "r") as f:
+            next(f)  # entête
+            for line in f:
+                cols = line.split()
+                # sl local rem st tx:rx tr:tm retrnsmt uid timeout inode ref pointer drops
+                if len(cols) >= 13 and cols[9] == inode:
+                    return int(cols[4].split(":")[1], 16), int(cols[12])
+    except (OSError, ValueError, StopIteration):
+        pass
+    return None
+
+class UdpIngest:
+    """
+    Réception eHuB par lots:
+      - socket non bloquante, SO_RCVBUF réglable (les fakers envoient 6..8 chunks d'affilée :
+        le buffer par défaut (~200 Ko) déborde en silence)
+      - recv_batch(): attend le 1er datagramme (select, avec timeout), puis VIDE la file
+        du noyau par recvfrom_into dans un anneau de buffers préalloués (aucune allocation
+        par paquet) jusqu'à EAGAIN ou `ring` datagrammes
+      - pertes noyau lues dans /proc/net/udp (compteur "drops" de la socket)
+      - datagrammes > UNFRAGMENTED_MAX comptés : arrivés fragmentés en IP (un fragment
+        perdu = tout le chunk perdu) quand la source n'est pas en local
+    Les vues retournées pointent dans l'anneau : elles ne sont valides que jusqu'au
+    recv_batch() suivant (le parseur en extrait des copies : gzip, tuples de CONFIG).
+    """
+    def __init__(self, listen_ip: str, listen_port: int, rcvbuf: int = 4 << 20,
+                 ring: int = 64, bufsize: int = 65535):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.rcvbuf_requested = int(rcvbuf)
+        if rcvbuf:
+            try:
+                self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, int(rcvbuf))
+            except OSError:
+                pass
+        # valeur effective (Linux double la demande, plafonnée par net.core.rmem_max)
+        self.rcvbuf = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+        self.sock.bind((listen_ip, listen_port))
+        self.sock.setblocking(False)
+
+        self._bufs = [bytearray(bufsize) for _ in range(max(1, int(ring)))]
+        self._views = [memoryview(b) for b in self._bufs]
+
+        self.packets = 0
+        self.batches = 0
+        self.max_batch = 0
+        self.truncated = 0  # datagrammes plus grands que bufsize (tronqués → rejetés au parse)
+        self.dropped = 0    # datagrammes jetés côté application (file du moteur asyncio pleine)
+        self.oversize = 0   # datagrammes > UNFRAGMENTED_MAX (fragmentés sur le réseau)
+        self._oversize_report = 0
+        self._packets_report = 0
+        self._batches_report = 0
+        self._drops_report = 0
+
+    def recv_batch(self, timeout: Optional[float] = None) -> List[Datagram]:
+        """Tous les datagrammes en attente (au plus `ring`) ; [] si rien reçu pendant `timeout` s."""
+        out: List[Datagram] = []
+        ready, _, _ = select.select([self.sock], [], [], timeout)
+        if not ready:
+            return out
+        recv_into = self.sock.recvfrom_into
+        for view in self._views:
+            try:
+                n, addr = recv_into(view)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                continue  # ex: ECONNREFUSED remonté par ICMP, on passe au suivant
+            if n == len(view):
+                self.truncated += 1
+            out.append((view[:n], addr[:2]))
+        self.account(out)
+        return out
+
+    def account(self, batch: List[Datagram]):
+        """Compte un lot de datagrammes (appelé aussi par le moteur asyncio, qui lit la socket lui-même)."""
+        n = len(batch)
+        if n:
+            self.batches += 1
+            self.packets += n
+            self.max_batch = max(self.max_batch, n)
+            self.oversize += sum(len(data) > UNFRAGMENTED_MAX for data, _ in batch)
+
+    def kernel_stats(self) -> Optional[Tuple[int, int]]:
+        return udp_socket_stats(self.sock)
+
+    def report(self) -> str:
+        """Paquets / lots depuis le dernier report(), taille de lot max, pertes noyau."""
+        p = self.packets - self._packets_report
+        b = self.batches - self._batches_report
+        big = self.oversize - self._oversize_report
+        self._packets_report, self._batches_report, self._oversize_report = self.packets, self.batches, self.oversize
+        line = (f"📥 réception: {p} paquets en {b} lots (moy {p / b if b else 0:.1f}, max {self.max_batch}), "
+                f"> {UNFRAGMENTED_MAX} o (fragmentés)={100.0 * big / p if p else 0:.0f}%, rcvbuf={self.rcvbuf // 1024} Ko")
+        k = self.kernel_stats()
+        if k is not None:
+            queued, drops = k
+            line += f", file={queued // 1024} Ko, pertes noyau={drops - self._drops_report} (cumul {drops})"
+            self._drops_report = drops
+        if self.truncated:
+            line += f", tronqués={self.truncated}"
+        if self.dropped:
+            line += f", jetés (file pleine)={self.dropped}"
+        return line
+
+    def close(self):
+        self.sock.close()
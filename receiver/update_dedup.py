@@ -0,0 +1,57 @@
+# receiver/update_dedup.py
+import hashlib
+from typing import Dict, Tuple
+
+Key = Tuple[str, int]  # (IP source, univers eHuB = index de chunk côté fakers)
+
+class UpdateDedup:
+    """
+    Déduplication des UPDATE en tête de la réception, AVANT gzip:
+      - clé (IP source, univers) → empreinte blake2b 64 bits du payload compressé
+      - payload identique au dernier appliqué pour cette clé → paquet ignoré
+        (ni décompression ni apply : son contenu est déjà dans le framebuffer)
+    image_player / stream_image_to_ehub renvoient la même image en boucle : une scène
+    fixe ne coûte plus qu'un hash par paquet.
+    Clé = IP seule (pas le port) : les fakers ouvrent une socket par paquet.
+    Limite assumée: si deux sources écrivent les mêmes entités, le renvoi identique
+    de l'une n'écrase plus ce que l'autre a écrit entre-temps.
+    """
+    def __init__(self):
+        self._last: Dict[Key, bytes] = {}
+        self.hits = 0
+        self.misses = 0
+        self.bytes_skipped = 0   # octets compressés non décompressés
+        self._hits_report = 0
+        self._misses_report = 0
+
+    def seen(self, src: str, universe: int, comp) -> bool:
+        """True si `comp` est identique au dernier payload de (src, universe) ; sinon le mémorise."""
+        digest = hashlib.blake2b(comp, digest_size=8).digest()
+        key = (src, universe)
+        if self._last.get(key) == digest:
+            self.hits += 1
+            self.bytes_skipped += len(comp)
+            return True
+        self._last[key] = digest
+        self.misses += 1
+        return False
+
+    def forget(self, src: str, universe: int):
+        """Paquet mémorisé mais finalement rejeté (gzip invalide) : ne pas le considérer comme appliqué."""
+        self._last.pop((src, universe), None)
+
+    def clear(self):
+        """Mapping modifié (CONFIG) : un payload identique produit d'autres canaux → tout réappliquer."""
+        self._last.clear()
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def report(self) -> str:
+        """Taux de paquets ignorés depuis le dernier report() et en cumulé."""
+        h, m = self.hits - self._hits_report, self.misses - self._misses_report
+        self._hits_report, self._misses_report = self.hits, self.misses
+        recent = 100.0 * h / (h + m) if h + m else 0.0
+        return (f"♻️ dédup UPDATE: {recent:.1f}% ignorés ({h}/{h + m}), "
+                f"cumul {100.0 * self.hit_rate():.1f}%, {self.bytes_skipped / 1e6:.1f} Mo non décompressés")
@@ -45,6 +45,7 @@ def api_start():
     color2 = data.get("color2", "0,0,255")
     density = str(data.get("density", 0.01))  # pour stars
     bg = data.get("bg", "4,8,16")
+    pace = str(data.get("pace", 0.5))        # étalement des paquets d'une frame avant le tick suivant
 
     if mode == "stars":
         cmd = [
@@ -52,7 +53,8 @@ def api_start():
             "--excel", EXCEL_PATH,
             "--host", ROUTER_HOST, "--port", ROUTER_PORT,
             "--seconds", seconds, "--fps", fps,
-            "--density", density, "--bg", bg
+            "--density", density, "--bg", bg,
+            "--pace", pace
         ]
 
     elif mode == "image":
@@ -61,17 +63,26 @@ def api_start():
         brightness = str(data.get("brightness", 0.7))
         gamma = str(data.get("gamma", 2.0))
         flipy = data.get("flipY", False)
+        images = img if isinstance(img, list) else [img]   # plusieurs chemins = playlist
+        images = [str(p).strip() for p in images if str(p).strip()]
+        if not images:
+            return jsonify({"ok": False, "msg": "Chemin d'image ou d'animation vide."}), 400
         cmd = [
             PYTHON, "faker/image_player_cli.py",
-            "--image", img,
+            "--image", *images,
             "--excel", EXCEL_PATH,
             "--host", ROUTER_HOST, "--port", ROUTER_PORT,
             "--seconds", seconds, "--fps", fps,
             "--brightness", brightness, "--gamma", gamma,
-            "--fit", fit
+            "--fit", fit,
+            "--pace", pace
         ]
         if flipy:
             cmd.append("--flip-y")
+        if "seqFps" in data:                   # GIF sans durées / dossier d'images
+            cmd += ["--seq-fps", str(data["seqFps"])]
+        if "cycles" in data:
+            cmd += ["--cycles", str(data["cycles"])]
 
     else:
         # modes animator: blink/chase/wave/gradient/solid
@@ -81,7 +92,8 @@ def api_start():
             "--excel", EXCEL_PATH,
             "--host", ROUTER_HOST, "--port", ROUTER_PORT,
             "--seconds", seconds, "--fps", fps,
-            "--color1", color1, "--color2", color2
+            "--color1", color1, "--color2", color2,
+            "--pace", pace
         ]
 
     ok, msg = _start_process(cmd)